@@ -0,0 +1,65 @@
+"""
+Memory footprint of 100k workspaces held as decoded JSON, tuples and models.
+
+Run from the repository root with ``python -m benchmarks.models_memory [count]``.
+"""
+
+import gc
+import json
+import sys
+import tracemalloc
+import uuid
+from typing import Any, Callable, Dict, List
+from fabric_cli.models import Workspace
+
+
+def make_payloads(count: int) -> List[Dict[str, Any]]:
+    """Workspaces shaped like the items of a Fabric list response."""
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "displayName": f"Workspace {i}",
+            "description": f"Data products of team {i % 100}",
+            "type": "Workspace",
+            "capacityId": str(uuid.uuid4()),
+            "capacityAssignmentProgress": "Completed",
+            "workspaceIdentity": {
+                "applicationId": str(uuid.uuid4()),
+                "servicePrincipalId": str(uuid.uuid4()),
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def measure(build: Callable[[], Any]) -> int:
+    """Bytes still allocated by the result of ``build``."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main(count: int = 100_000):
+    # Keep the response as text, the way it arrives, so each variant decodes it itself
+    body = json.dumps(make_payloads(count))
+
+    results = {
+        "dicts (response.json())": measure(lambda: json.loads(body)),
+        "tuples (id, name, capacity)": measure(
+            lambda: [(w["id"], w["displayName"], w.get("capacityId")) for w in json.loads(body)]
+        ),
+        "models": measure(lambda: [Workspace.from_payload(w) for w in json.loads(body)]),
+    }
+
+    print(f"{count} workspaces")
+    for name, size in results.items():
+        print(f"  {name:30} {size / 1024 / 1024:8.1f} MB  {size / count:6.0f} B/item")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
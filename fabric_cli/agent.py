@@ -0,0 +1,142 @@
+import json
+import os
+import socket
+import socketserver
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+AGENT_SOCKET = Path(os.getenv("FABRIC_AGENT_SOCK", os.path.expanduser("~/.fabric/agent.sock")))
+
+# Seconds a CLI invocation waits for the agent before falling back to in-process auth
+AGENT_TIMEOUT = 2.0
+
+
+def agent_available(socket_path: Optional[Path] = None) -> bool:
+    """Check if a token agent socket exists on this host."""
+    return hasattr(socket, "AF_UNIX") and Path(socket_path or AGENT_SOCKET).exists()
+
+
+def _is_listening(socket_path: Path) -> bool:
+    """Check if something accepts connections on a Unix socket."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(AGENT_TIMEOUT)
+            sock.connect(str(socket_path))
+        return True
+    except OSError:
+        return False
+
+
+def request_token(
+    provider: str, socket_path: Optional[Path] = None, profile: Optional[str] = None
+) -> Optional[Tuple[str, datetime]]:
+    """
+    Ask the token agent for an access token.
+
+    Args:
+        provider: The token provider, "fabric" or "management".
+        socket_path: The agent socket, defaults to FABRIC_AGENT_SOCK or ~/.fabric/agent.sock.
+        profile: The auth profile, defaults to the agent's active profile.
+
+    Returns:
+        The token and its expiry, or None if no agent is running or it could not help.
+    """
+    socket_path = Path(socket_path or AGENT_SOCKET)
+    if not agent_available(socket_path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(AGENT_TIMEOUT)
+            sock.connect(str(socket_path))
+            request = {"provider": provider, "profile": profile}
+            sock.sendall(json.dumps(request).encode() + b"\n")
+            with sock.makefile("rb") as f:
+                response = json.loads(f.readline())
+    except (OSError, ValueError) as e:
+        logger.debug(f"Token agent at {socket_path} not usable: {e}")
+        return None
+
+    if "error" in response:
+        logger.warning(f"Token agent could not provide a {provider} token: {response['error']}")
+        return None
+    logger.debug(f"Got {provider} token from agent")
+    return response["token"], datetime.fromtimestamp(response["expires_on"])
+
+
+class _TokenRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        from .auth import Auth
+
+        try:
+            request = json.loads(self.rfile.readline())
+            provider = request["provider"]
+            auth = Auth(request.get("profile"))
+            token = auth.get_access_token(provider)
+            response = {
+                "token": token,
+                "expires_on": auth._token_expiry(provider).timestamp(),
+            }
+        except Exception as e:
+            logger.error(f"Token agent request failed: {e}")
+            response = {"error": str(e)}
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+
+    class _AgentServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+
+def serve(socket_path: Optional[Path] = None, refresh_interval: float = 30.0):
+    """
+    Run the token agent in the foreground until interrupted.
+
+    The agent holds the MSAL and DefaultAzureCredential state of this user, keeps the
+    tokens fresh with the background refresher, and hands them out over a Unix socket
+    that only the current user can access.
+
+    Args:
+        socket_path: The agent socket, defaults to FABRIC_AGENT_SOCK or ~/.fabric/agent.sock.
+        refresh_interval: Seconds between token expiry checks.
+
+    Raises:
+        RuntimeError: If Unix domain sockets are not supported on this platform.
+    """
+    from .auth import Auth
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("The token agent requires Unix domain sockets")
+
+    socket_path = Path(socket_path or AGENT_SOCKET)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        if _is_listening(socket_path):
+            raise RuntimeError(f"A token agent is already running at {socket_path}")
+        socket_path.unlink()
+
+    # The agent is the one place that talks to AAD, it must not ask itself for tokens
+    Auth.use_agent = False
+    auth = Auth()
+    auth.start_background_refresh(interval=refresh_interval)
+
+    old_umask = os.umask(0o177)
+    try:
+        server = _AgentServer(str(socket_path), _TokenRequestHandler)
+    finally:
+        os.umask(old_umask)
+    logger.info(f"Token agent listening on {socket_path}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        auth.stop_background_refresh()
+        try:
+            socket_path.unlink()
+        except FileNotFoundError:
+            pass
+        logger.info("Token agent stopped")
@@ -0,0 +1,357 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple
+from urllib.parse import urlparse
+import logging
+import requests
+from . import circuit_breaker, http2, operations, rate_limit, retry, transport
+from .auth import REFRESH_AHEAD, Auth, token_expiry
+from .capacity_management import API_VERSION
+from .models import Capacity, Lakehouse, Warehouse, Workspace
+from .operations import Operation
+from .pagination import next_page_url
+
+try:
+    import httpx
+except ImportError as e:  # pragma: no cover - depends on the installed extras
+    raise ImportError(
+        "The asyncio client needs httpx, install it with: pip install FabricCLI[async]"
+    ) from e
+
+logger = logging.getLogger(__name__)
+
+FABRIC_API = "https://api.fabric.microsoft.com/v1"
+ARM_API = "https://management.azure.com"
+
+# Concurrent connections of one client, across all hosts
+MAX_CONNECTIONS = 100
+
+
+class AsyncClient:
+    """
+    asyncio client with coroutine versions of the resource module functions.
+
+    Tokens come from the same Auth profile as the blocking functions, and requests go
+    through the same rate limit, retry policy and per-host cool-down. Use it as an async
+    context manager, or call ``aclose`` when done.
+
+    Example:
+        async with AsyncClient(auth) as client:
+            workspaces = await client.get_workspaces()
+            lakehouses = await asyncio.gather(
+                *(client.get_lakehouses(ws_id) for ws_id, _, _ in workspaces)
+            )
+    """
+
+    def __init__(
+        self,
+        auth: Optional[Auth] = None,
+        max_connections: int = MAX_CONNECTIONS,
+        policy: Optional[retry.RetryPolicy] = None,
+        **client_kwargs,
+    ):
+        """
+        Args:
+            auth: Authentication instance, defaults to the active profile.
+            max_connections: Concurrent connections; further requests queue for one.
+            policy: The retry policy, defaults to RetryPolicy().
+            **client_kwargs: Passed on to httpx.AsyncClient, such as ``http2``.
+        """
+        self.auth = auth or Auth()
+        self.policy = policy or retry.RetryPolicy()
+        client_kwargs.setdefault("timeout", transport.TIMEOUT)
+        client_kwargs.setdefault("http2", transport.HTTP_TRANSPORT == "http2" and http2.available())
+        client_kwargs.setdefault(
+            "limits",
+            httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+        )
+        self._client = httpx.AsyncClient(**client_kwargs)
+        self._headers: Dict[str, Tuple[Mapping[str, str], float]] = {}
+        self._header_locks: Dict[str, asyncio.Lock] = {}
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Close the connections of the client."""
+        await self._client.aclose()
+
+    async def get_headers(self, provider: str) -> Mapping[str, str]:
+        """
+        Get headers with a valid access token without blocking the event loop.
+
+        The token is fetched in a worker thread once and reused by every coroutine until it
+        is about to expire.
+
+        Args:
+            provider: The token provider, ``fabric`` or ``management``.
+        """
+        cached = self._headers.get(provider)
+        if cached and cached[1] > time.time():
+            return cached[0]
+
+        lock = self._header_locks.setdefault(provider, asyncio.Lock())
+        async with lock:
+            cached = self._headers.get(provider)
+            if cached and cached[1] > time.time():
+                return cached[0]
+            loop = asyncio.get_running_loop()
+            headers = await loop.run_in_executor(None, self.auth.get_headers, provider)
+            token = headers["Authorization"].split(" ", 1)[-1]
+            refresh_at = (token_expiry(token) - REFRESH_AHEAD).timestamp()
+            self._headers[provider] = (headers, refresh_at)
+            return headers
+
+    async def request(
+        self, method: str, url: str, provider: str = "fabric", retry_safe: bool = False, **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request, with the rate limit and retries of the blocking transport.
+
+        Args:
+            method: The HTTP method.
+            url: The URL to request.
+            provider: The token provider for the endpoint.
+            retry_safe: Also retry a non-idempotent request.
+            **kwargs: Passed on to httpx, such as ``json``.
+
+        Returns:
+            httpx.Response: The response, with a 2xx status.
+
+        Raises:
+            requests.exceptions.HTTPError: If the response has an error status.
+            requests.exceptions.Timeout: If the last attempt timed out.
+            requests.exceptions.ConnectionError: If the last attempt failed to connect.
+            circuit_breaker.CircuitOpenError: If the circuit breaker of the host is open.
+        """
+        host = urlparse(url).netloc
+        retryable = retry.is_retryable(method, retry_safe)
+        start = time.monotonic()
+        attempt = 0
+        loop = asyncio.get_running_loop()
+
+        while True:
+            attempt += 1
+            await asyncio.sleep(retry.cooldown.remaining(host))
+            if rate_limit.ENABLED:
+                # The bucket file lock blocks, so take the token in a worker thread
+                await asyncio.sleep(await loop.run_in_executor(None, rate_limit.reserve, url))
+            headers = await self.get_headers(provider)
+
+            # Checked right before sending, so a half-open probe slot is always reported back
+            breaker = circuit_breaker.get_breaker(url) if circuit_breaker.ENABLED else None
+            if breaker:
+                breaker.allow()
+            response = None
+            try:
+                response = await self._client.request(method, url, headers=headers, **kwargs)
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                error = e
+                if breaker:
+                    breaker.record(False)
+            except BaseException:
+                # Cancelled or failed otherwise: free the probe slot before giving up
+                if breaker:
+                    breaker.record(False)
+                raise
+            else:
+                error = None
+                if breaker:
+                    breaker.record(response.status_code < 500)
+                if response.status_code not in retry.RETRY_STATUSES:
+                    return self._raise_for_status(response)
+
+            delay = retry.next_delay(self.policy, attempt, start, retryable, host, response)
+            if delay is None:
+                if isinstance(error, httpx.TimeoutException):
+                    raise requests.exceptions.Timeout(str(error)) from error
+                if error is not None:
+                    raise requests.exceptions.ConnectionError(str(error)) from error
+                return self._raise_for_status(response)
+
+            reason = error or f"status {response.status_code}"
+            logger.warning(f"{method} {url} failed ({reason}), retry in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _raise_for_status(response: httpx.Response) -> httpx.Response:
+        # Raise the same exception as the blocking functions, with a requests response
+        if response.is_error:
+            raise requests.exceptions.HTTPError(
+                f"{response.status_code} Error: {response.reason_phrase} for url: "
+                f"{response.url}\nResponse: {response.text}",
+                response=http2.to_requests_response(response),
+            )
+        return response
+
+    async def iter_items(self, url: str, provider: str = "fabric") -> AsyncIterator[Dict[str, Any]]:
+        """
+        Lazily fetch all items of a list endpoint, following continuation tokens.
+
+        Args:
+            url: The URL of the first page.
+            provider: The token provider for the endpoint.
+
+        Yields:
+            Each item of the ``value`` lists.
+        """
+        while url:
+            body = (await self.request("GET", url, provider)).json()
+            for item in body.get("value", []):
+                yield item
+            url = next_page_url(url, body)
+
+    async def wait(self, operation: Operation) -> Any:
+        """
+        Wait for a long-running operation.
+
+        Args:
+            operation: The operation, from ``operations.from_response``.
+
+        Returns:
+            The result of the operation.
+
+        Raises:
+            requests.exceptions.HTTPError: If the operation failed.
+            TimeoutError: If the operation did not finish before its timeout.
+        """
+        while True:
+            await asyncio.sleep(operation.interval)
+            response = await self.request("GET", operation.url, operation.provider)
+            if operation.update(response):
+                break
+            if time.monotonic() + operation.interval > operation.deadline:
+                raise TimeoutError(f"Operation {operation.url} did not finish in time")
+
+        if operation.result_url:
+            result = await self.request("GET", operation.result_url, operation.provider)
+            operation.result = result.json()
+        return operation.result
+
+    async def _start(self, response: httpx.Response, wait: bool, fetch_result: bool = False):
+        operation = operations.from_response(response, self.auth, fetch_result=fetch_result)
+        if operation is None:
+            return response.json() if response.content else None
+        if not wait:
+            logger.debug(f"Not waiting for operation {operation.url}")
+            return None
+        return await self.wait(operation)
+
+    # Workspaces
+
+    async def create_workspace(self, display_name: str, capacity_id: Optional[str] = None) -> str:
+        """Coroutine version of workspaces.create_workspace."""
+        json_payload = {"displayName": display_name}
+        if capacity_id:
+            json_payload["capacityId"] = capacity_id
+        response = await self.request("POST", f"{FABRIC_API}/workspaces/", json=json_payload)
+        location_header = response.headers.get("Location")
+        if not location_header:
+            raise ValueError("No Location header in response")
+        return urlparse(location_header).path.split("/")[-1]
+
+    async def iter_workspaces(self) -> AsyncIterator[Workspace]:
+        """Coroutine version of workspaces.iter_workspaces."""
+        async for ws in self.iter_items(f"{FABRIC_API}/workspaces"):
+            yield Workspace.from_payload(ws)
+
+    async def get_workspaces(self) -> List[Workspace]:
+        """Coroutine version of workspaces.get_workspaces."""
+        return [ws async for ws in self.iter_workspaces()]
+
+    async def provision_workspace_identity(self, workspace_id: str, wait: bool = True) -> bool:
+        """Coroutine version of workspaces.provision_workspace_identity."""
+        url = f"{FABRIC_API}/workspaces/{workspace_id}/provisionIdentity"
+        await self._start(await self.request("POST", url), wait)
+        return True
+
+    async def assign_workspace_to_capacity(self, workspace_id: str, capacity_id: str) -> bool:
+        """Coroutine version of workspaces.assign_workspace_to_capacity."""
+        url = f"{FABRIC_API}/workspaces/{workspace_id}/assignToCapacity"
+        await self.request("POST", url, json={"capacityId": capacity_id}, retry_safe=True)
+        return True
+
+    # Items
+
+    async def _create_item(
+        self, workspace_id: str, kind: str, display_name: str, wait: bool
+    ) -> Optional[str]:
+        url = f"{FABRIC_API}/workspaces/{workspace_id}/{kind}"
+        response = await self.request("POST", url, json={"displayName": display_name})
+        item = await self._start(response, wait, fetch_result=True)
+        return item["id"] if item else None
+
+    async def create_lakehouse(
+        self, workspace_id: str, display_name: str, wait: bool = True
+    ) -> Optional[str]:
+        """Coroutine version of lakehouses.create_lakehouse."""
+        return await self._create_item(workspace_id, "lakehouses", display_name, wait)
+
+    async def get_lakehouses(self, workspace_id: str) -> List[Lakehouse]:
+        """Coroutine version of lakehouses.get_lakehouses."""
+        url = f"{FABRIC_API}/workspaces/{workspace_id}/lakehouses"
+        return [Lakehouse.from_payload(lh) async for lh in self.iter_items(url)]
+
+    async def create_warehouse(
+        self, workspace_id: str, display_name: str, wait: bool = True
+    ) -> Optional[str]:
+        """Coroutine version of warehouses.create_warehouse."""
+        return await self._create_item(workspace_id, "warehouses", display_name, wait)
+
+    async def get_warehouses(self, workspace_id: str) -> List[Warehouse]:
+        """Coroutine version of warehouses.get_warehouses."""
+        url = f"{FABRIC_API}/workspaces/{workspace_id}/warehouses"
+        return [Warehouse.from_payload(wh) async for wh in self.iter_items(url)]
+
+    # Capacities and git
+
+    async def get_capacities(self) -> List[Capacity]:
+        """Coroutine version of capacity.get_capacities."""
+        url = f"{FABRIC_API}/capacities"
+        return [Capacity.from_payload(c) async for c in self.iter_items(url)]
+
+    async def connect_git_repository(
+        self, workspace_id: str, git_provider_details: Dict[str, str]
+    ) -> None:
+        """Coroutine version of git.connect_git_repository."""
+        url = f"{FABRIC_API}/workspaces/{workspace_id}/git/connect"
+        await self.request("POST", url, json={"gitProviderDetails": git_provider_details})
+
+    async def _capacity_action(
+        self, subscription_id: str, resource_group_name: str, name: str, action: str, wait: bool
+    ) -> Optional[Dict]:
+        url = (
+            f"{ARM_API}/subscriptions/{subscription_id}/resourceGroups/{resource_group_name}/"
+            f"providers/Microsoft.Fabric/capacities/{name}/{action}?api-version={API_VERSION}"
+        )
+        response = await self.request("POST", url, "management", retry_safe=True)
+        return await self._start(response, wait)
+
+    async def suspend_capacity(
+        self,
+        subscription_id: str,
+        resource_group_name: str,
+        dedicated_capacity_name: str,
+        wait: bool = False,
+    ) -> Optional[Dict]:
+        """Coroutine version of capacity_management.suspend_capacity."""
+        return await self._capacity_action(
+            subscription_id, resource_group_name, dedicated_capacity_name, "suspend", wait
+        )
+
+    async def resume_capacity(
+        self,
+        subscription_id: str,
+        resource_group_name: str,
+        dedicated_capacity_name: str,
+        wait: bool = False,
+    ) -> Optional[Dict]:
+        """Coroutine version of capacity_management.resume_capacity."""
+        return await self._capacity_action(
+            subscription_id, resource_group_name, dedicated_capacity_name, "resume", wait
+        )
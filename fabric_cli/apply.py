@@ -0,0 +1,280 @@
+import os
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set
+import logging
+from .auth import Auth
+from .git import connect_git_repository
+from .lakehouses import create_lakehouse
+from .plan import Snapshot, take_snapshot
+from .spec import Spec
+from .warehouses import create_warehouse
+from .workspaces import (
+    assign_workspace_to_capacity,
+    create_workspace,
+    provision_workspace_identity,
+)
+
+logger = logging.getLogger(__name__)
+
+# Steps run at the same time
+APPLY_WORKERS = int(os.getenv("FABRIC_APPLY_WORKERS", "8"))
+
+
+@dataclass
+class Task:
+    """
+    One step of a rollout.
+
+    ``action`` gets the results of all finished tasks by key, so it can read the IDs
+    created by the tasks it depends on.
+    """
+
+    key: str
+    description: str
+    action: Callable[[Dict[str, Any]], Any]
+    depends_on: Sequence[str] = ()
+
+
+@dataclass
+class ApplyResult:
+    results: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, BaseException] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        """True if every task succeeded"""
+        return not self.errors and not self.skipped
+
+
+def _check_graph(tasks: Sequence[Task]):
+    keys = [task.key for task in tasks]
+    if len(set(keys)) != len(keys):
+        raise ValueError("Task keys must be unique")
+    known = set(keys)
+    for task in tasks:
+        missing = [dep for dep in task.depends_on if dep not in known]
+        if missing:
+            raise ValueError(f"Task {task.key} depends on unknown tasks: {', '.join(missing)}")
+
+    # Kahn's algorithm: every task is reachable in dependency order unless there is a cycle
+    remaining = {task.key: set(task.depends_on) for task in tasks}
+    while remaining:
+        ready = [key for key, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Tasks depend on each other: {', '.join(sorted(remaining))}")
+        for key in ready:
+            del remaining[key]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+
+def run_tasks(
+    tasks: Sequence[Task],
+    max_workers: int = APPLY_WORKERS,
+    on_done: Optional[Callable[[Task, Any, Optional[BaseException]], None]] = None,
+) -> ApplyResult:
+    """
+    Run tasks in dependency order, with independent tasks in parallel.
+
+    A failed task does not stop the others, but the tasks that depend on it, directly or
+    not, are skipped.
+
+    Args:
+        tasks: The tasks.
+        max_workers: Tasks run at the same time.
+        on_done: Called in the calling thread with each finished task, its result and its
+            error.
+
+    Returns:
+        ApplyResult: The results and errors by task key, and the skipped tasks.
+
+    Raises:
+        ValueError: If a task depends on an unknown task, or tasks depend on each other.
+    """
+    _check_graph(tasks)
+    by_key = {task.key: task for task in tasks}
+    waiting: Dict[str, Set[str]] = {task.key: set(task.depends_on) for task in tasks}
+    dependents: Dict[str, List[str]] = defaultdict(list)
+    for task in tasks:
+        for dep in task.depends_on:
+            dependents[dep].append(task.key)
+
+    result = ApplyResult()
+
+    def skip(key: str):
+        for dependent in dependents[key]:
+            if dependent in waiting:
+                del waiting[dependent]
+                result.skipped.append(dependent)
+                logger.debug(f"Skipping {dependent}, {key} did not succeed")
+                skip(dependent)
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        running: Dict[Future, Task] = {}
+
+        def submit_ready():
+            for key in [key for key, deps in waiting.items() if not deps]:
+                del waiting[key]
+                logger.debug(f"Starting {key}")
+                running[executor.submit(by_key[key].action, dict(result.results))] = by_key[key]
+
+        submit_ready()
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                error = future.exception()
+                if error is None:
+                    result.results[task.key] = future.result()
+                    for dependent in dependents[task.key]:
+                        if dependent in waiting:
+                            waiting[dependent].discard(task.key)
+                else:
+                    logger.error(f"{task.description} failed: {error}")
+                    result.errors[task.key] = error
+                    skip(task.key)
+                if on_done:
+                    on_done(task, result.results.get(task.key), error)
+            submit_ready()
+
+    return result
+
+
+def build_tasks(spec: Spec, auth: Auth, snapshot: Optional[Snapshot] = None) -> List[Task]:
+    """
+    Turn a spec into the tasks that create it.
+
+    Per workspace: create it on its capacity, then provision its identity, create its
+    lakehouses and warehouses and connect it to Git, which all need the workspace.
+    Tasks of different workspaces do not depend on each other.
+
+    With a snapshot, only what the live state lacks gets a task: existing workspaces are
+    not created, but assigned first when they are on another capacity, and existing
+    lakehouses, warehouses and Git connections are left alone. Identities are only
+    provisioned for new workspaces. The tasks are then the plan of the spec.
+
+    Args:
+        spec: The spec.
+        auth: Authentication instance for the API calls.
+        snapshot: The live state, from plan.take_snapshot; None creates everything.
+
+    Returns:
+        The tasks, keyed like ``workspace:<name>`` and ``lakehouse:<workspace>/<name>``.
+    """
+    tasks: List[Task] = []
+    for ws in spec.workspaces:
+        live = snapshot.workspaces.get(ws.name) if snapshot else None
+        ws_key = f"workspace:{ws.name}"
+        if live is None:
+            tasks.append(
+                Task(
+                    ws_key,
+                    f"Create workspace '{ws.name}'",
+                    lambda results, ws=ws: create_workspace(ws.name, auth, ws.capacity_id),
+                )
+            )
+
+        def workspace_id(results: Dict[str, Any], ws_key=ws_key, live=live) -> str:
+            return live.id if live else results[ws_key]
+
+        # Items, identities and Git need the workspace to be on a capacity. A new
+        # workspace is created on it, an existing one may need to be moved
+        ready = [] if live else [ws_key]
+        on_capacity = live and (live.capacity_id or "").lower() == (ws.capacity_id or "").lower()
+        if ws.capacity_id and live is not None and not on_capacity:
+            capacity_key = f"capacity:{ws.name}"
+            tasks.append(
+                Task(
+                    capacity_key,
+                    f"Assign workspace '{ws.name}' to capacity {ws.capacity_id}",
+                    lambda results, ws=ws, workspace_id=workspace_id: (
+                        assign_workspace_to_capacity(workspace_id(results), ws.capacity_id, auth)
+                    ),
+                    list(ready),
+                )
+            )
+            ready.append(capacity_key)
+
+        if ws.provision_identity and live is None:
+            tasks.append(
+                Task(
+                    f"identity:{ws.name}",
+                    f"Provision identity for workspace '{ws.name}'",
+                    lambda results, workspace_id=workspace_id: provision_workspace_identity(
+                        workspace_id(results), auth
+                    ),
+                    ready,
+                )
+            )
+        existing = snapshot.lakehouses.get(live.id, set()) if live else set()
+        for name in ws.lakehouses:
+            if name in existing:
+                continue
+            tasks.append(
+                Task(
+                    f"lakehouse:{ws.name}/{name}",
+                    f"Create lakehouse '{name}' in workspace '{ws.name}'",
+                    lambda results, name=name, workspace_id=workspace_id: create_lakehouse(
+                        workspace_id(results), name, auth
+                    ),
+                    ready,
+                )
+            )
+        existing = snapshot.warehouses.get(live.id, set()) if live else set()
+        for name in ws.warehouses:
+            if name in existing:
+                continue
+            tasks.append(
+                Task(
+                    f"warehouse:{ws.name}/{name}",
+                    f"Create warehouse '{name}' in workspace '{ws.name}'",
+                    lambda results, name=name, workspace_id=workspace_id: create_warehouse(
+                        workspace_id(results), name, auth
+                    ),
+                    ready,
+                )
+            )
+        if ws.git and not (live and snapshot.git_connected(live.id)):
+            tasks.append(
+                Task(
+                    f"git:{ws.name}",
+                    f"Connect workspace '{ws.name}' to Git",
+                    lambda results, ws=ws, workspace_id=workspace_id: connect_git_repository(
+                        workspace_id(results), ws.git.provider_details, auth
+                    ),
+                    ready,
+                )
+            )
+    return tasks
+
+
+def apply_spec(
+    spec: Spec,
+    auth: Auth,
+    max_workers: int = APPLY_WORKERS,
+    on_done: Optional[Callable[[Task, Any, Optional[BaseException]], None]] = None,
+    snapshot: Optional[Snapshot] = None,
+) -> ApplyResult:
+    """
+    Create the workspaces, lakehouses, warehouses and Git connections of a spec that do
+    not exist yet.
+
+    Args:
+        spec: The spec.
+        auth: Authentication instance for the API calls.
+        max_workers: API calls run at the same time.
+        on_done: Called with each finished task, see run_tasks.
+        snapshot: The live state the plan was made from, so it is not read again; taken
+            here if not given.
+
+    Returns:
+        ApplyResult: The outcome per task.
+    """
+    if snapshot is None:
+        snapshot = take_snapshot(spec, auth, max_workers)
+    tasks = build_tasks(spec, auth, snapshot)
+    logger.info(f"Applying {len(tasks)} tasks with {max_workers} workers")
+    return run_tasks(tasks, max_workers, on_done)
@@ -1,15 +1,76 @@
+import base64
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Callable, Optional, Dict, Iterable, List, Mapping, Tuple
 from pathlib import Path
 import logging
-from dataclasses import dataclass
-from azure.identity import DefaultAzureCredential
-import msal
+from dataclasses import asdict, dataclass
 import os
+from . import agent, transport
+from .locking import atomic_write, file_lock, file_stamp
+from .singleflight import SingleFlight
+from .token_cache import get_http_cache, get_token_cache, save_token_cache
+
+if TYPE_CHECKING:
+    import msal
 
 logger = logging.getLogger(__name__)
 
+SCOPES = {
+    "fabric": "https://api.fabric.microsoft.com/.default",
+    "management": "https://management.azure.com/.default",
+}
+
+# Lifetime assumed for tokens whose expiry cannot be determined
+DEFAULT_TOKEN_LIFETIME = timedelta(hours=1)
+
+DEFAULT_PROFILE = "default"
+
+# Number of profiles kept in the token store before the least recently used is evicted
+MAX_PROFILES = int(os.getenv("FABRIC_MAX_PROFILES", "64"))
+
+# Tokens are refreshed this long before they expire
+REFRESH_AHEAD = timedelta(seconds=int(os.getenv("FABRIC_TOKEN_REFRESH_AHEAD", "300")))
+
+# azure.identity credentials tried in order without an SPN, like DefaultAzureCredential
+# with the interactive browser enabled
+DEFAULT_CREDENTIALS = (
+    "EnvironmentCredential",
+    "WorkloadIdentityCredential",
+    "ManagedIdentityCredential",
+    "SharedTokenCacheCredential",
+    "AzureCliCredential",
+    "AzurePowerShellCredential",
+    "AzureDeveloperCliCredential",
+    "InteractiveBrowserCredential",
+)
+
+
+def token_expiry(token: str) -> datetime:
+    """
+    Read the expiry of an access token from its ``exp`` claim.
+
+    The signature is not verified; the claim is only used to schedule refreshes.
+
+    Args:
+        token: The JWT access token.
+
+    Returns:
+        datetime: The local expiry time, or one hour from now if the token is not a JWT.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return datetime.fromtimestamp(int(claims["exp"]))
+    except Exception:
+        logger.debug("Could not read token expiry, assuming default lifetime")
+        return datetime.now() + DEFAULT_TOKEN_LIFETIME
+
 
 @dataclass
 class SPNConfig:
@@ -30,6 +91,124 @@ class AuthState:
     management_token: Optional[str] = None
     management_token_expiry: Optional[datetime] = None
     spn_config: Optional[Dict] = None
+    default_credential: Optional[str] = None
+
+    def to_dict(self) -> Dict:
+        """Convert the state to a JSON serializable dictionary"""
+        data = asdict(self)
+        for key in ("fabric_token_expiry", "management_token_expiry"):
+            data[key] = data[key].isoformat() if data[key] else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "AuthState":
+        """Create a state from a dictionary written by to_dict"""
+        return cls(
+            fabric_token=data.get("fabric_token"),
+            fabric_token_expiry=(
+                datetime.fromisoformat(data["fabric_token_expiry"])
+                if data.get("fabric_token_expiry")
+                else None
+            ),
+            management_token=data.get("management_token"),
+            management_token_expiry=(
+                datetime.fromisoformat(data["management_token_expiry"])
+                if data.get("management_token_expiry")
+                else None
+            ),
+            spn_config=data.get("spn_config"),
+            default_credential=data.get("default_credential"),
+        )
+
+
+class TokenStore:
+    """
+    Named auth profiles, each with its own tenant, client and tokens.
+
+    The store is bounded; when it is full the least recently used profile is evicted.
+    """
+
+    def __init__(self, max_profiles: int = MAX_PROFILES):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, AuthState]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, name: str) -> Optional[AuthState]:
+        """Get a profile and mark it as most recently used, or None if it is not stored"""
+        with self._lock:
+            if name not in self._profiles:
+                return None
+            self._profiles.move_to_end(name)
+            return self._profiles[name]
+
+    def put(self, name: str, state: AuthState):
+        """Store a profile as most recently used, evicting the least recently used if full"""
+        with self._lock:
+            self._profiles[name] = state
+            self._profiles.move_to_end(name)
+            while len(self._profiles) > self.max_profiles:
+                evicted, _ = self._profiles.popitem(last=False)
+                logger.debug(f"Evicted least recently used auth profile {evicted}")
+
+    def remove(self, name: str):
+        """Remove a profile if it exists"""
+        with self._lock:
+            self._profiles.pop(name, None)
+
+    def names(self) -> List[str]:
+        """Get the profile names, least recently used first"""
+        with self._lock:
+            return list(self._profiles)
+
+    def to_dict(self) -> Dict:
+        """Convert the store to a JSON serializable dictionary, keeping the LRU order"""
+        with self._lock:
+            return {"profiles": {name: state.to_dict() for name, state in self._profiles.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict, max_profiles: int = MAX_PROFILES) -> "TokenStore":
+        """Create a store from a dictionary, reading the single-profile format as default"""
+        store = cls(max_profiles)
+        profiles = data.get("profiles", {DEFAULT_PROFILE: data})
+        for name, state in profiles.items():
+            store.put(name, AuthState.from_dict(state))
+        return store
+
+
+# One MSAL application per (authority, client), so authority discovery runs once per process
+_msal_apps: Dict[Tuple[str, str], Tuple[Optional[str], "msal.ConfidentialClientApplication"]] = {}
+_msal_apps_lock = threading.Lock()
+
+
+def get_msal_app(config: SPNConfig) -> "msal.ConfidentialClientApplication":
+    """
+    Get the shared MSAL confidential client for a service principal.
+
+    Args:
+        config: The service principal configuration.
+
+    Returns:
+        msal.ConfidentialClientApplication: The application, built on first use.
+    """
+    # Imported here so CLI calls served by the token agent never load MSAL
+    import msal
+
+    key = (config.authority_url, config.client_id)
+    with _msal_apps_lock:
+        secret, app = _msal_apps.get(key, (None, None))
+        if app is None or secret != config.client_secret:
+            # Initialize MSAL confidential client backed by the persistent token cache
+            app = msal.ConfidentialClientApplication(
+                client_id=config.client_id,
+                client_credential=config.client_secret,
+                authority=config.authority_url,
+                token_cache=get_token_cache(),
+                http_cache=get_http_cache(),
+                http_client=transport.get_session(),
+            )
+            _msal_apps[key] = (config.client_secret, app)
+            logger.debug("MSAL ConfidentialClientApplication initialized")
+        return app
 
 
 class FabricClient:
@@ -38,20 +217,15 @@ class FabricClient:
         self.scope = scope
         self.base_url = "https://api.fabric.microsoft.com/v1/"
         self._token: Optional[str] = None
-
-        # Initialize MSAL confidential client
-        self.app = msal.ConfidentialClientApplication(
-            client_id=config.client_id,
-            client_credential=config.client_secret,
-            authority=config.authority_url,
-        )
-        logger.debug("MSAL ConfidentialClientApplication initialized")
+        self.expires_on: Optional[datetime] = None
+        self.app = get_msal_app(config)
 
     def get_token(self) -> str:
-        """Get token using client credentials flow"""
+        """Get token using client credentials flow, served from the token cache when valid"""
         if not self._token:
             logger.debug(f"Requesting token with scope: {self.scope}")
             result = self.app.acquire_token_for_client(scopes=[self.scope])
+            save_token_cache()
             if "access_token" not in result:
                 error_msg = (
                     f"Failed to get token: {result.get('error_description', 'Unknown error')}"
@@ -59,146 +233,282 @@ class FabricClient:
                 logger.error(error_msg)
                 raise ValueError(error_msg)
             self._token = result["access_token"]
-            logger.debug(f"Token acquired successfully: {self._token[:10]}...")
+            self.expires_on = datetime.now() + timedelta(seconds=int(result["expires_in"]))
+            source = result.get("token_source", "identity_provider")
+            logger.debug(f"Token acquired successfully from {source}: {self._token[:10]}...")
             logger.info(f"Access token: {self._token}")
         return self._token
 
 
+def acquire_tokens(config: SPNConfig, scopes: Iterable[str]) -> Dict[str, FabricClient]:
+    """
+    Acquire tokens for several scopes concurrently with one shared MSAL application.
+
+    Args:
+        config: The service principal configuration.
+        scopes: The scopes to acquire tokens for.
+
+    Returns:
+        Dict mapping each scope to a FabricClient holding its token and expiry.
+
+    Raises:
+        ValueError: If a token could not be acquired.
+    """
+    clients = {scope: FabricClient(config, scope) for scope in scopes}
+    if len(clients) == 1:
+        next(iter(clients.values())).get_token()
+        return clients
+
+    with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+        # list() re-raises the first failure
+        list(executor.map(lambda client: client.get_token(), clients.values()))
+    return clients
+
+
+def build_credential(name: str):
+    """
+    Create an azure.identity credential from its class name, with default arguments.
+
+    Args:
+        name: The class name, such as ``AzureCliCredential``.
+
+    Returns:
+        The credential, or None if the installed azure-identity does not have it or it is
+        not configured (such as WorkloadIdentityCredential outside Kubernetes).
+    """
+    import azure.identity
+
+    credential_class = getattr(azure.identity, name, None)
+    if credential_class is None:
+        return None
+    try:
+        return credential_class()
+    except Exception as e:
+        logger.debug(f"Skipping {name}: {e}")
+        return None
+
+
+class _ChainLink:
+    """A credential of the default chain that reports when it returned a token"""
+
+    def __init__(self, name: str, credential, on_token: Callable[[str, object], None]):
+        self.name = name
+        self.credential = credential
+        self.on_token = on_token
+
+    def get_token(self, *scopes: str, **kwargs):
+        token = self.credential.get_token(*scopes, **kwargs)
+        self.on_token(self.name, self.credential)
+        return token
+
+
 class Auth:
-    _instance = None
-    _state = AuthState()
+    """
+    Token provider for one auth profile.
+
+    ``Auth()`` returns the instance for the active profile (``--profile`` or FABRIC_PROFILE)
+    and ``Auth("name")`` the instance for a named profile, so module functions can be
+    called for different tenants side by side.
+    """
+
+    _instances: Dict[str, "Auth"] = {}
+    _instances_lock = threading.Lock()
+    _store = TokenStore()
     _state_file = Path(os.path.expanduser("~/.fabric/auth_state.json"))
+    _state_stamp = None
+    _agent_tokens: Dict[Tuple[str, str], Tuple[str, datetime]] = {}
+    _credentials: Dict[str, object] = {}
+    # Concurrent refreshes of the same token share one call
+    _refreshes = SingleFlight()
+    default_profile = os.getenv("FABRIC_PROFILE", DEFAULT_PROFILE)
+    use_agent = os.getenv("FABRIC_AGENT", "1") != "0"
+
+    def __new__(cls, profile: Optional[str] = None):
+        profile = profile or cls.default_profile
+        with cls._instances_lock:
+            if profile not in cls._instances:
+                instance = super().__new__(cls)
+                instance.profile = profile
+                instance._client_secret = None
+                instance._refresher = None
+                instance._refresher_stop = None
+                instance._headers = {}
+                instance._unsaved = None
+                cls._instances[profile] = instance
+                cls._load_state()
+            return cls._instances[profile]
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._load_state()
-        return cls._instance
+    @property
+    def _state(self) -> AuthState:
+        state = Auth._store.get(self.profile)
+        if state is None:
+            # Kept out of the store until something is saved, so looking up a profile
+            # that does not exist never adds it
+            if self._unsaved is None:
+                self._unsaved = AuthState()
+            state = self._unsaved
+        return state
 
     @classmethod
     def _load_state(cls):
-        """Load authentication state from file"""
+        """Load authentication state from file, unless it is unchanged since the last load"""
         try:
-            if cls._state_file.exists():
+            stamp = file_stamp(cls._state_file)
+            if stamp is not None and stamp != cls._state_stamp:
+                # The file is replaced atomically, so it can be read without the lock
                 with open(cls._state_file) as f:
                     data = json.load(f)
-                    cls._state = AuthState(
-                        fabric_token=data.get("fabric_token"),
-                        fabric_token_expiry=(
-                            datetime.fromisoformat(data["fabric_token_expiry"])
-                            if data.get("fabric_token_expiry")
-                            else None
-                        ),
-                        management_token=data.get("management_token"),
-                        management_token_expiry=(
-                            datetime.fromisoformat(data["management_token_expiry"])
-                            if data.get("management_token_expiry")
-                            else None
-                        ),
-                        spn_config=data.get("spn_config"),
-                    )
-                logger.debug(f"Loaded auth state: {cls._state}")
+                    cls._store = TokenStore.from_dict(data, cls._store.max_profiles)
+                cls._state_stamp = stamp
+                logger.debug(f"Loaded auth profiles: {cls._store.names()}")
         except Exception as e:
             logger.warning(f"Failed to load auth state: {e}")
 
-    @classmethod
-    def _save_state(cls):
-        """Save authentication state to file"""
+    def _save_state(self):
+        """Save the state of this profile to file, keeping the other profiles on disk"""
         try:
-            cls._state_file.parent.mkdir(parents=True, exist_ok=True)
-            state_dict = {
-                "fabric_token": cls._state.fabric_token,
-                "fabric_token_expiry": (
-                    cls._state.fabric_token_expiry.isoformat()
-                    if cls._state.fabric_token_expiry
-                    else None
-                ),
-                "management_token": cls._state.management_token,
-                "management_token_expiry": (
-                    cls._state.management_token_expiry.isoformat()
-                    if cls._state.management_token_expiry
-                    else None
-                ),
-                "spn_config": cls._state.spn_config,
-            }
-            with open(cls._state_file, "w") as f:
-                json.dump(state_dict, f)
-            logger.debug("Saved auth state")
+            state = self._state
+            with file_lock(self._state_file):
+                # Another process may have changed other profiles since we loaded the file
+                self._load_state()
+                Auth._store.put(self.profile, state)
+                self._unsaved = None
+                atomic_write(self._state_file, json.dumps(Auth._store.to_dict()).encode())
+                Auth._state_stamp = file_stamp(self._state_file)
+            logger.debug(f"Saved auth state for profile {self.profile}")
         except Exception as e:
             logger.warning(f"Failed to save auth state: {e}")
 
     @classmethod
-    def set_token(cls, token: str, provider: str):
-        """Set a token manually with a default expiry of 1 hour"""
+    def list_profiles(cls) -> List[str]:
+        """List the stored auth profiles, least recently used first"""
+        cls._load_state()
+        return cls._store.names()
+
+    def set_token(self, token: str, provider: str, expires_on: Optional[datetime] = None):
+        """Set a token manually, taking the expiry from the token unless given"""
         logger.debug(f"Setting token manually for {provider}...")
+        token = token.strip()
+        expiry = expires_on or token_expiry(token)
+        state = self._state
         if provider == "fabric":
-            cls._state.fabric_token = token.strip()
-            cls._state.fabric_token_expiry = datetime.now() + timedelta(hours=1)
+            state.fabric_token = token
+            state.fabric_token_expiry = expiry
         elif provider == "management":
-            cls._state.management_token = token.strip()
-            cls._state.management_token_expiry = datetime.now() + timedelta(hours=1)
-        cls._save_state()
+            state.management_token = token
+            state.management_token_expiry = expiry
+        self._save_state()
 
-    @classmethod
-    def set_spn_config(cls, config: SPNConfig):
+    def set_spn_config(self, config: SPNConfig):
         """Configure service principal authentication"""
         logger.debug("Setting SPN config...")
-        cls._state.spn_config = {
+        state = self._state
+        state.spn_config = {
             "client_id": config.client_id,
             "tenant_id": config.tenant_id,
             "authority": config.authority,
         }
-        cls._save_state()
+        self._client_secret = config.client_secret
+        self._save_state()
 
-        # Create new client and fetch initial tokens
-        fabric_client = FabricClient(config, "https://api.fabric.microsoft.com/.default")
-        fabric_token = fabric_client.get_token()
-        cls._state.fabric_token = fabric_token
-        cls._state.fabric_token_expiry = datetime.now() + timedelta(hours=1)
+        # Fetch the initial fabric and management tokens in parallel
+        clients = acquire_tokens(config, [SCOPES["fabric"], SCOPES["management"]])
+        fabric_client = clients[SCOPES["fabric"]]
+        state.fabric_token = fabric_client.get_token()
+        state.fabric_token_expiry = fabric_client.expires_on
 
-        management_client = FabricClient(config, "https://management.azure.com/.default")
-        management_token = management_client.get_token()
-        cls._state.management_token = management_token
-        cls._state.management_token_expiry = datetime.now() + timedelta(hours=1)
+        management_client = clients[SCOPES["management"]]
+        state.management_token = management_client.get_token()
+        state.management_token_expiry = management_client.expires_on
 
-        cls._save_state()
+        self._save_state()
         logger.debug(f"SPN client configured with client_id: {config.client_id}")
 
-    @classmethod
-    def authenticate_with_default_credential(cls, scope: str):
-        """Authenticate using DefaultAzureCredential and set the token"""
+    def authenticate_with_default_credential(self, scope: str, provider: str = "fabric"):
+        """
+        Authenticate with the DEFAULT_CREDENTIALS chain and set the token.
+
+        The credential type that succeeded is remembered in the auth state and used directly
+        next time, which skips probing the rest of the chain (such as IMDS timeouts).
+        """
+        import azure.identity
+
         try:
-            credential = DefaultAzureCredential(exclude_interactive_browser_credential=False)
-            token = credential.get_token(scope)
-            cls.set_token(token.token, "fabric")
-            logger.info(f"Authenticated with DefaultAzureCredential. Token: {token.token[:10]}...")
+            token = None
+            name = self._state.default_credential
+            if name:
+                try:
+                    if name not in Auth._credentials:
+                        Auth._credentials[name] = getattr(azure.identity, name)()
+                    token = Auth._credentials[name].get_token(scope)
+                    logger.debug(f"Authenticated with remembered credential {name}")
+                except Exception as e:
+                    logger.info(f"Remembered credential {name} failed, probing all: {e}")
+                    Auth._credentials.pop(name, None)
+                    self._state.default_credential = None
+                    # Saved now, in case the whole chain fails too
+                    self._save_state()
+
+            if token is None:
+                links = []
+                for link_name in DEFAULT_CREDENTIALS:
+                    credential = build_credential(link_name)
+                    if credential is not None:
+                        links.append(_ChainLink(link_name, credential, self._remember_credential))
+                token = azure.identity.ChainedTokenCredential(*links).get_token(scope)
+
+            self.set_token(token.token, provider, datetime.fromtimestamp(token.expires_on))
+            logger.info(f"Authenticated with the default credentials. Token: {token.token[:10]}...")
         except Exception as e:
-            logger.error(f"Failed to authenticate with DefaultAzureCredential: {e}")
+            logger.error(f"Failed to authenticate with the default credentials: {e}")
             raise
 
+    def _remember_credential(self, name: str, credential):
+        """Remember which credential of the default chain returned the token"""
+        Auth._credentials[name] = credential
+        self._state.default_credential = name
+        logger.debug(f"Remembering successful credential {name}")
+
+    def _get_client_secret(self) -> Optional[str]:
+        """Get the SPN secret given at login, or from AZURE_CLIENT_SECRET[_<PROFILE>]"""
+        if self._client_secret:
+            return self._client_secret
+        profile_var = "AZURE_CLIENT_SECRET_" + "".join(
+            c if c.isalnum() else "_" for c in self.profile.upper()
+        )
+        return os.getenv(profile_var) or os.getenv("AZURE_CLIENT_SECRET")
+
     def _refresh_token(self, provider: str):
         """Internal method to refresh the token using SPN config"""
-        if not self._state.spn_config:
+        state = self._state
+        if not state.spn_config:
             raise ValueError("No SPN configuration available")
 
         config = SPNConfig(
-            client_id=self._state.spn_config["client_id"],
-            client_secret=os.getenv("AZURE_CLIENT_SECRET"),
-            tenant_id=self._state.spn_config["tenant_id"],
-            authority=self._state.spn_config["authority"],
+            client_id=state.spn_config["client_id"],
+            client_secret=self._get_client_secret(),
+            tenant_id=state.spn_config["tenant_id"],
+            authority=state.spn_config["authority"],
         )
         if provider == "fabric":
-            client = FabricClient(config, "https://api.fabric.microsoft.com/.default")
-            self._state.fabric_token = client.get_token()
-            self._state.fabric_token_expiry = datetime.now() + timedelta(hours=1)
+            client = FabricClient(config, SCOPES["fabric"])
+            state.fabric_token = client.get_token()
+            state.fabric_token_expiry = client.expires_on
         elif provider == "management":
-            client = FabricClient(config, "https://management.azure.com/.default")
-            self._state.management_token = client.get_token()
-            self._state.management_token_expiry = datetime.now() + timedelta(hours=1)
+            client = FabricClient(config, SCOPES["management"])
+            state.management_token = client.get_token()
+            state.management_token_expiry = client.expires_on
         self._save_state()
 
-    def _is_token_valid(self, provider: str) -> bool:
-        """Check if the current token is valid"""
+    def _refresh(self, provider: str):
+        """Refresh the token for a provider using SPN config or DefaultAzureCredential"""
+        if self._state.spn_config:
+            self._refresh_token(provider)
+        else:
+            self.authenticate_with_default_credential(scope=SCOPES[provider], provider=provider)
+
+    def _token_expiry(self, provider: str) -> Optional[datetime]:
+        """Get the expiry of the current token, or None if there is no token"""
         if provider == "fabric":
             token = self._state.fabric_token
             expiry = self._state.fabric_token_expiry
@@ -206,51 +516,165 @@ class Auth:
             token = self._state.management_token
             expiry = self._state.management_token_expiry
         else:
-            return False
+            return None
+        return expiry if token else None
 
-        if not token or not expiry:
+    def _is_token_valid(self, provider: str) -> bool:
+        """Check if the current token is valid"""
+        expiry = self._token_expiry(provider)
+        if not expiry:
             return False
         return datetime.now() < expiry
 
+    def _needs_refresh(self, provider: str) -> bool:
+        """Check if the current token is missing or within the refresh-ahead window"""
+        expiry = self._token_expiry(provider)
+        if not expiry:
+            return True
+        return datetime.now() >= expiry - REFRESH_AHEAD
+
+    def _refresh_unless_done(self, provider: str, needed: Callable[[str], bool]):
+        """
+        Refresh under the state file lock, unless another thread or process already did.
+
+        Threads that ask while a refresh of the same token is running wait for it and share
+        its outcome, so only one of them talks to AAD and writes the state file.
+        """
+        Auth._refreshes.do((self.profile, provider), self._refresh_under_lock, provider, needed)
+
+    def _refresh_under_lock(self, provider: str, needed: Callable[[str], bool]):
+        with file_lock(self._state_file):
+            self._load_state()
+            if needed(provider):
+                self._refresh(provider)
+            else:
+                logger.debug(f"Token for {provider} was refreshed by another process")
+
+    def _token_from_agent(self, provider: str) -> Optional[str]:
+        """Get a token from the token agent, or None if no agent can provide one"""
+        cached = Auth._agent_tokens.get((self.profile, provider))
+        if cached and datetime.now() < cached[1] - REFRESH_AHEAD:
+            return cached[0]
+        result = Auth._refreshes.do(
+            ("agent", self.profile, provider),
+            agent.request_token,
+            provider,
+            profile=self.profile,
+        )
+        if result is None:
+            return None
+        Auth._agent_tokens[(self.profile, provider)] = result
+        return result[0]
+
     def get_access_token(self, provider: str) -> str:
         """Get a valid access token, refreshing if necessary"""
         logger.debug(f"Getting access token for {provider}...")
 
+        # A running token agent saves both the AAD round trip and loading MSAL
+        if self.use_agent and agent.agent_available():
+            token = self._token_from_agent(provider)
+            if token:
+                return token
+
+        # Pick up tokens refreshed by other processes; a no-op if the file is unchanged
+        self._load_state()
+
         # Check if we need to refresh the token
         if not self._is_token_valid(provider):
             logger.debug(f"Token expired or missing for {provider}, refreshing...")
-            if self._state.spn_config:
-                self._refresh_token(provider)
-            else:
-                self.authenticate_with_default_credential(
-                    scope="https://api.fabric.microsoft.com/.default"
-                )
-
-        token = self._state.fabric_token if provider == "fabric" else self._state.management_token
-        logger.debug(f"Using token for {provider}: {token[:10]}...")
+            self._refresh_unless_done(provider, lambda p: not self._is_token_valid(p))
+        elif self._needs_refresh(provider) and not self.is_background_refresh_running():
+            # The token is still usable, so a failed early refresh is not fatal
+            logger.debug(f"Token for {provider} expires soon, refreshing ahead...")
+            try:
+                self._refresh_unless_done(provider, self._needs_refresh)
+            except Exception as e:
+                logger.warning(f"Early token refresh for {provider} failed: {e}")
+
+        state = self._state
+        token = state.fabric_token if provider == "fabric" else state.management_token
+        logger.debug(f"Using token for {provider} in profile {self.profile}: {token[:10]}...")
         return token
 
-    def get_headers(self, provider: str) -> Dict[str, str]:
-        """Get headers with a valid access token"""
+    def start_background_refresh(self, interval: float = 30.0):
+        """
+        Start a daemon thread that refreshes tokens before they expire.
+
+        Only providers that already hold a token are refreshed, so get_access_token in a
+        long-running process never has to wait on AAD once the first token is acquired.
+
+        Args:
+            interval: Seconds between expiry checks.
+        """
+        if self.is_background_refresh_running():
+            return
+        self._refresher_stop = threading.Event()
+        self._refresher = threading.Thread(
+            target=self._background_refresh_loop,
+            args=(self._refresher_stop, interval),
+            name=f"fabric-token-refresher-{self.profile}",
+            daemon=True,
+        )
+        self._refresher.start()
+        logger.debug(f"Started background token refresher for profile {self.profile}")
+
+    def stop_background_refresh(self):
+        """Stop the background token refresher if it is running"""
+        if self._refresher_stop is not None:
+            self._refresher_stop.set()
+        if self._refresher is not None:
+            self._refresher.join()
+        self._refresher = None
+        self._refresher_stop = None
+        logger.debug(f"Stopped background token refresher for profile {self.profile}")
+
+    def is_background_refresh_running(self) -> bool:
+        """Check if the background token refresher is running"""
+        return self._refresher is not None and self._refresher.is_alive()
+
+    def _background_refresh_loop(self, stop: threading.Event, interval: float):
+        """Refresh tokens that entered the refresh-ahead window until stopped"""
+        while not stop.wait(interval):
+            for provider in SCOPES:
+                if self._token_expiry(provider) and self._needs_refresh(provider):
+                    try:
+                        logger.debug(f"Background refresh of {provider} token...")
+                        self._refresh_unless_done(provider, self._needs_refresh)
+                    except Exception as e:
+                        logger.warning(f"Background refresh of {provider} token failed: {e}")
+
+    def get_headers(self, provider: str) -> Mapping[str, str]:
+        """
+        Get headers with a valid access token.
+
+        The headers are an immutable mapping that is reused until the token changes, so it
+        can be shared between threads.
+        """
         token = self.get_access_token(provider)
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-        }
+        cached = self._headers.get(provider)
+        if cached and cached[0] == token:
+            return cached[1]
+
+        headers = MappingProxyType(
+            {
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json",
+            }
+        )
+        self._headers[provider] = (token, headers)
         logger.debug(f"Generated headers with valid token for {provider}")
         logger.debug(headers)
         return headers
 
     def __str__(self):
         return (
-            f"Auth(fabric_token={self._state.fabric_token}, "
+            f"Auth(profile={self.profile}, fabric_token={self._state.fabric_token}, "
             f"management_token={self._state.management_token})"
         )
 
     def __repr__(self):
         return self.__str__()
 
-    @classmethod
-    def get_state(cls):
-        """Get the current state of the Auth class"""
-        return cls._state
+    def get_state(self) -> AuthState:
+        """Get the current state of this profile"""
+        return self._state
@@ -1,37 +1,73 @@
-import requests
-from typing import List, Tuple
+from typing import Iterator, List, Optional
+from . import metadata_cache
 from .auth import Auth
+from .models import Capacity
+from .pagination import iter_items
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def get_capacities(auth: Auth) -> List[Tuple[str, str]]:
+def iter_capacities(
+    auth: Auth,
+    prefetch: bool = False,
+    cache: bool = False,
+    max_age: Optional[float] = None,
+    stream: bool = False,
+    hedge: bool = False,
+) -> Iterator[Capacity]:
     """
-    Get all capacities.
+    Lazily get all capacities, page by page.
 
     Args:
         auth: Authentication instance for getting headers.
+        prefetch: Fetch the next page while the current one is consumed.
+        cache: Answer from, and revalidate against, the on-disk HTTP cache.
+        max_age: Serve the list from the metadata cache if it was stored at most this many
+            seconds ago; 0 fetches and stores it again, None leaves the metadata cache alone.
+        stream: Decode large responses as they arrive, instead of all at once.
+        hedge: Send a slow list request again and use the first answer, to cut tail latency.
 
-    Returns:
-        List of tuples containing capacity IDs and display names.
+    Yields:
+        Capacities, which unpack to capacity IDs and display names.
 
     Raises:
         requests.exceptions.HTTPError: If the API request fails.
     """
     url = "https://api.fabric.microsoft.com/v1/capacities"
     logger.debug("Fetching capacities")
-    response = requests.get(url, headers=auth.get_headers("fabric"))
-    response.raise_for_status()
 
-    response_data = response.json()
-    capacity_list = []
+    capacities = metadata_cache.cached_items(
+        "capacity",
+        auth,
+        "",
+        lambda: iter_items(url, auth, prefetch=prefetch, cache=cache, stream=stream, hedge=hedge),
+        max_age,
+    )
+    for capacity in capacities:
+        if capacity.get("id") and capacity.get("displayName"):
+            yield Capacity.from_payload(capacity)
 
-    for capacity in response_data.get("value", []):
-        capacity_id = capacity.get("id")
-        display_name = capacity.get("displayName")
-        if capacity_id and display_name:
-            capacity_list.append((capacity_id, display_name))
 
+def get_capacities(
+    auth: Auth, cache: bool = False, max_age: Optional[float] = None, hedge: bool = False
+) -> List[Capacity]:
+    """
+    Get all capacities.
+
+    Args:
+        auth: Authentication instance for getting headers.
+        cache: Answer from, and revalidate against, the on-disk HTTP cache.
+        max_age: Serve the list from the metadata cache if it was stored at most this many
+            seconds ago; 0 fetches and stores it again, None leaves the metadata cache alone.
+        hedge: Send a slow list request again and use the first answer, to cut tail latency.
+
+    Returns:
+        List of capacities, which unpack to capacity IDs and display names.
+
+    Raises:
+        requests.exceptions.HTTPError: If the API request fails.
+    """
+    capacity_list = list(iter_capacities(auth, cache=cache, max_age=max_age, hedge=hedge))
     logger.debug(f"Fetched capacities: {capacity_list}")
     return capacity_list
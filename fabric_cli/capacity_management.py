@@ -1,5 +1,6 @@
 import requests
-from typing import Dict
+from . import operations, transport
+from typing import Dict, Optional
 import logging
 from .auth import Auth
 
@@ -9,8 +10,12 @@ API_VERSION = "2022-07-01-preview"
 
 
 def suspend_capacity(
-    subscription_id: str, resource_group_name: str, dedicated_capacity_name: str
-) -> Dict:
+    subscription_id: str,
+    resource_group_name: str,
+    dedicated_capacity_name: str,
+    auth: Optional[Auth] = None,
+    wait: bool = False,
+) -> Optional[Dict]:
     """
     Suspend a dedicated capacity.
 
@@ -18,12 +23,15 @@ def suspend_capacity(
         subscription_id (str): The subscription ID.
         resource_group_name (str): The resource group name.
         dedicated_capacity_name (str): The dedicated capacity name.
+        auth (Auth): Authentication instance, defaults to the active profile.
+        wait (bool): Wait for the operation to finish when it runs asynchronously.
 
     Returns:
-        Dict: The response from the API.
+        Dict: The response from the API, or the result of the finished operation.
 
     Raises:
-        requests.exceptions.HTTPError: If the API request fails.
+        requests.exceptions.HTTPError: If the API request or the operation fails.
+        TimeoutError: If ``wait`` is set and the operation does not finish in time.
     """
     url = (
         f"https://management.azure.com/subscriptions/{subscription_id}/resourceGroups/"
@@ -36,15 +44,15 @@ def suspend_capacity(
         logger.info(f"Attempting to suspend capacity from URL: {url}")
 
         # Get and log headers (without exposing full token)
-        auth = Auth()
+        auth = auth or Auth()
         headers = auth.get_headers("management")
         masked_headers = {
             k: (v[:10] + "..." if k == "Authorization" else v) for k, v in headers.items()
         }
         logger.debug(f"Request headers: {masked_headers}")
 
-        # Make the API request
-        response = requests.post(url, headers=headers)
+        # Make the API request, suspend and resume are safe to repeat
+        response = transport.post(url, headers=headers, retry_safe=True)
 
         # Log response status and basic details
         logger.debug(f"Response received. Status Code: {response.status_code}")
@@ -54,7 +62,10 @@ def suspend_capacity(
         # Raise an exception for bad status codes
         response.raise_for_status()
 
-        # Handle empty response for 202 Accepted
+        # Handle 202 Accepted, the operation continues asynchronously
+        operation = operations.from_response(response, auth)
+        if operation and wait:
+            return operations.wait(operation)
         if response.status_code == 202:
             return logger.debug("Request accepted and is being processed asynchronously.")
 
@@ -73,8 +84,12 @@ def suspend_capacity(
 
 
 def resume_capacity(
-    subscription_id: str, resource_group_name: str, dedicated_capacity_name: str
-) -> Dict:
+    subscription_id: str,
+    resource_group_name: str,
+    dedicated_capacity_name: str,
+    auth: Optional[Auth] = None,
+    wait: bool = False,
+) -> Optional[Dict]:
     """
     Resume a dedicated capacity.
 
@@ -82,12 +97,15 @@ def resume_capacity(
         subscription_id (str): The subscription ID.
         resource_group_name (str): The resource group name.
         dedicated_capacity_name (str): The dedicated capacity name.
+        auth (Auth): Authentication instance, defaults to the active profile.
+        wait (bool): Wait for the operation to finish when it runs asynchronously.
 
     Returns:
-        Dict: The response from the API.
+        Dict: The response from the API, or the result of the finished operation.
 
     Raises:
-        requests.exceptions.HTTPError: If the API request fails.
+        requests.exceptions.HTTPError: If the API request or the operation fails.
+        TimeoutError: If ``wait`` is set and the operation does not finish in time.
     """
     url = (
         f"https://management.azure.com/subscriptions/{subscription_id}/resourceGroups/"
@@ -100,15 +118,15 @@ def resume_capacity(
         logger.info(f"Attempting to resume capacity from URL: {url}")
 
         # Get and log headers (without exposing full token)
-        auth = Auth()
+        auth = auth or Auth()
         headers = auth.get_headers("management")
         masked_headers = {
             k: (v[:10] + "..." if k == "Authorization" else v) for k, v in headers.items()
         }
         logger.debug(f"Request headers: {masked_headers}")
 
-        # Make the API request
-        response = requests.post(url, headers=headers)
+        # Make the API request, suspend and resume are safe to repeat
+        response = transport.post(url, headers=headers, retry_safe=True)
 
         # Log response status and basic details
         logger.debug(f"Response received. Status Code: {response.status_code}")
@@ -118,7 +136,10 @@ def resume_capacity(
         # Raise an exception for bad status codes
         response.raise_for_status()
 
-        # Handle empty response for 202 Accepted
+        # Handle 202 Accepted, the operation continues asynchronously
+        operation = operations.from_response(response, auth)
+        if operation and wait:
+            return operations.wait(operation)
         if response.status_code == 202:
             return logger.debug("Request accepted and is being processed asynchronously.")
 
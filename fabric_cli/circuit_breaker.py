@@ -0,0 +1,226 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from urllib.parse import urlparse
+import logging
+import requests
+from .rate_limit import endpoint_family
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("FABRIC_CIRCUIT_BREAKER", "1") != "0"
+
+# Open the circuit when at least this share of the requests in the window failed...
+ERROR_RATE = float(os.getenv("FABRIC_CIRCUIT_ERROR_RATE", "0.5"))
+# ...and the window has at least this many requests
+MIN_REQUESTS = int(os.getenv("FABRIC_CIRCUIT_MIN_REQUESTS", "10"))
+# Seconds of requests the error rate is computed over
+WINDOW = float(os.getenv("FABRIC_CIRCUIT_WINDOW", "60"))
+# Seconds requests fail fast before a probe request is let through
+OPEN_SECONDS = float(os.getenv("FABRIC_CIRCUIT_OPEN_SECONDS", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request to a host and endpoint family that is failing."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one host and endpoint family.
+
+    Closed, requests are sent and their outcome is recorded. When the share of failed
+    requests (connection errors, timeouts and 5xx responses) in the last ``window``
+    seconds reaches ``error_rate``, the circuit opens and requests fail with
+    CircuitOpenError without being sent. After ``open_seconds`` it is half-open: one
+    probe request is sent, and its outcome closes or opens the circuit again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        error_rate: float = ERROR_RATE,
+        min_requests: int = MIN_REQUESTS,
+        window: float = WINDOW,
+        open_seconds: float = OPEN_SECONDS,
+    ):
+        self.name = name
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.window = window
+        self.open_seconds = open_seconds
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+
+    def _trim(self, now: float):
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+
+    def _open(self, now: float):
+        self._state = OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+
+    @property
+    def state(self) -> str:
+        """The current state: closed, open or half-open"""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self):
+        """
+        Check if a request may be sent.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a probe in flight.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._state == CLOSED:
+                return
+            if self._state == OPEN:
+                remaining = self._opened_at + self.open_seconds - now
+                if remaining > 0:
+                    raise CircuitOpenError(
+                        f"Circuit for {self.name} is open after repeated failures, "
+                        f"retry in {remaining:.0f}s"
+                    )
+                self._state = HALF_OPEN
+                self._probe_started = None
+            # Half-open: one probe at a time, another one if a probe never reported back
+            if self._probe_started is not None and now - self._probe_started < self.open_seconds:
+                raise CircuitOpenError(f"Circuit for {self.name} is half-open, waiting for a probe")
+            self._probe_started = now
+            logger.info(f"Circuit for {self.name} is half-open, sending a probe request")
+
+    def record(self, ok: bool):
+        """
+        Record the outcome of a sent request.
+
+        Args:
+            ok: False for a connection error, timeout or 5xx response.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._state == HALF_OPEN:
+                if ok:
+                    logger.warning(f"Circuit for {self.name} closed, the probe request succeeded")
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    logger.warning(f"Circuit for {self.name} opened again, the probe failed")
+                    self._open(now)
+                return
+            if self._state == OPEN:
+                # A request that was sent before the circuit opened
+                return
+
+            self._outcomes.append((now, ok))
+            self._trim(now)
+            failures = sum(1 for _, outcome in self._outcomes if not outcome)
+            total = len(self._outcomes)
+            if total >= self.min_requests and failures / total >= self.error_rate:
+                logger.warning(
+                    f"Circuit for {self.name} opened: {failures} of {total} requests failed "
+                    f"in {self.window:.0f}s, failing fast for {self.open_seconds:.0f}s"
+                )
+                self._open(now)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Get the state of the circuit.
+
+        Returns:
+            Dict with the ``state``, the ``requests`` and ``failures`` in the window, and
+            ``retry_in``, the seconds until an open circuit lets a probe through.
+        """
+        state = self.state
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            failures = sum(1 for _, outcome in self._outcomes if not outcome)
+            retry_in = 0.0
+            if state == OPEN:
+                retry_in = max(0.0, self._opened_at + self.open_seconds - now)
+            return {
+                "state": state,
+                "requests": len(self._outcomes),
+                "failures": failures,
+                "retry_in": retry_in,
+            }
+
+
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(url: str) -> CircuitBreaker:
+    """
+    Get the circuit breaker of the host and endpoint family of a URL.
+
+    Args:
+        url: The request URL.
+
+    Returns:
+        CircuitBreaker: The process-wide breaker for the host and family.
+    """
+    key = (urlparse(url).netloc, endpoint_family(url))
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(
+                f"{key[0]} ({key[1]})", ERROR_RATE, MIN_REQUESTS, WINDOW, OPEN_SECONDS
+            )
+        return breaker
+
+
+def states() -> Dict[str, Dict[str, Any]]:
+    """Get the report of every circuit breaker in use, by name"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.report() for breaker in breakers}
+
+
+def reset():
+    """Forget all circuit breakers, closing their circuits."""
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def call(url: str, send: Callable[[], requests.Response]) -> requests.Response:
+    """
+    Send a request through the circuit breaker of its host and endpoint family.
+
+    Args:
+        url: The request URL.
+        send: Sends the request once.
+
+    Returns:
+        requests.Response: The response.
+
+    Raises:
+        CircuitOpenError: If the circuit is open; the request is not sent.
+        requests.exceptions.RequestException: If sending failed.
+    """
+    if not ENABLED:
+        return send()
+    breaker = get_breaker(url)
+    breaker.allow()
+    try:
+        response = send()
+    except BaseException:
+        # Any error, so a half-open probe slot is never left taken
+        breaker.record(False)
+        raise
+    breaker.record(response.status_code < 500)
+    return response
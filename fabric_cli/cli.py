@@ -1,17 +1,24 @@
+import os
 import click
+from typing import Optional
 import logging
-from .auth import Auth, SPNConfig
+from . import metadata_cache, transport
+from .agent import serve as serve_agent
+from .auth import DEFAULT_PROFILE, Auth, SPNConfig
 from .workspaces import (
     create_workspace,
-    get_workspaces,
+    iter_workspaces,
     assign_workspace_to_capacity,
     provision_workspace_identity,
 )
-from .lakehouses import create_lakehouse, get_lakehouses
-from .warehouses import create_warehouse, get_warehouses
+from .lakehouses import create_lakehouse, iter_lakehouses
+from .warehouses import create_warehouse, iter_warehouses
 from .git import connect_git_repository
 from .capacity_management import suspend_capacity, resume_capacity
-from .capacity import get_capacities
+from .capacity import iter_capacities
+from .apply import APPLY_WORKERS, apply_spec, build_tasks
+from .plan import conflicts, take_snapshot
+from .spec import load_spec
 from .logging_config import setup_logging
 
 # Configure logging
@@ -21,6 +28,22 @@ logger = logging.getLogger(__name__)
 # Create a single instance of Auth
 auth = Auth()
 
+LOGIN_URL = "https://login.microsoftonline.com/"
+FABRIC_URL = "https://api.fabric.microsoft.com/"
+MANAGEMENT_URL = "https://management.azure.com/"
+
+# Hosts each command group talks to, connected to while the command loads its token
+PREWARM_URLS = {
+    "login": (LOGIN_URL,),
+    "agent": (LOGIN_URL,),
+    "create": (LOGIN_URL, FABRIC_URL),
+    "display": (LOGIN_URL, FABRIC_URL),
+    "git": (LOGIN_URL, FABRIC_URL),
+    "capacity": (LOGIN_URL, MANAGEMENT_URL),
+    "apply": (LOGIN_URL, FABRIC_URL),
+    "plan": (LOGIN_URL, FABRIC_URL),
+}
+
 
 def handle_login_success(message: str):
     """Handle login success"""
@@ -44,7 +67,15 @@ def execute_command(command_func, *args, **kwargs):
 
 
 @click.group()
-def main():
+@click.option(
+    "--profile",
+    envvar="FABRIC_PROFILE",
+    default=DEFAULT_PROFILE,
+    show_default=True,
+    help="Auth profile (tenant and client) to use",
+)
+@click.pass_context
+def main(ctx, profile):
     """🟠☁️   Welcome to the Fabric CLI Tool! 🟠☁️
 
     Manage your Microsoft Fabric resources with ease!
@@ -53,7 +84,12 @@ def main():
 
     www.Rubicon.nl
     """  # I know strange outlining, but otherwise Click will not show the text
-    pass
+    global auth
+    if not ctx.resilient_parsing:
+        transport.prewarm(PREWARM_URLS.get(ctx.invoked_subcommand, ()))
+    Auth.default_profile = profile
+    auth = Auth(profile)
+    logger.debug(f"Using auth profile {profile}")
 
 
 @main.group(name="login")
@@ -90,6 +126,17 @@ def default():
     handle_login_success("Successfully logged in with DefaultAzureCredential")
 
 
+@main.command(name="agent")
+@click.option("--socket", "socket_path", type=click.Path(), help="Path of the agent socket")
+def agent(socket_path):
+    """Run a token agent that serves tokens to other fabric commands"""
+    click.echo("🔑 Token agent running, press Ctrl+C to stop")
+    try:
+        execute_command(serve_agent, socket_path)
+    except KeyboardInterrupt:
+        click.echo("✅ Token agent stopped")
+
+
 @main.group(name="create")
 def create():
     """Create Fabric resources"""
@@ -102,7 +149,13 @@ def create():
 @click.option(
     "--provision-identity", is_flag=True, help="Provision identity for the workspace after creation"
 )
-def workspace(name, capacity_id, provision_identity):
+@click.option(
+    "--wait/--no-wait",
+    default=True,
+    show_default=True,
+    help="Wait for the identity provisioning to finish",
+)
+def workspace(name, capacity_id, provision_identity, wait):
     """Create a new workspace"""
 
     def command_logic():
@@ -119,8 +172,11 @@ def workspace(name, capacity_id, provision_identity):
 
         # Provision identity if requested
         if provision_identity:
-            provision_workspace_identity(workspace_id, auth)
-            click.echo(f"✅ Successfully provisioned identity for workspace '{name}'")
+            provision_workspace_identity(workspace_id, auth, wait=wait)
+            if wait:
+                click.echo(f"✅ Successfully provisioned identity for workspace '{name}'")
+            else:
+                click.echo(f"⏳ Started provisioning identity for workspace '{name}'")
             logger.debug(f"Provisioned identity for workspace '{name}'")
 
     execute_command(command_logic)
@@ -129,11 +185,20 @@ def workspace(name, capacity_id, provision_identity):
 @create.command()
 @click.argument("name")
 @click.option("--workspace-id", required=True, help="Workspace ID where to create the lakehouse")
-def lakehouse(name, workspace_id):
+@click.option(
+    "--wait/--no-wait",
+    default=True,
+    show_default=True,
+    help="Wait for the service to finish creating it",
+)
+def lakehouse(name, workspace_id, wait):
     """Create a new lakehouse in a workspace"""
 
     def command_logic():
-        lakehouse_id = create_lakehouse(workspace_id, name, auth)
+        lakehouse_id = create_lakehouse(workspace_id, name, auth, wait=wait)
+        if lakehouse_id is None:
+            click.echo(f"⏳ Creation of lakehouse '{name}' accepted, not waiting for it")
+            return None
         click.echo(f"✅ Created lakehouse '{name}' with ID: {lakehouse_id}")
         logger.debug(f"Lakehouse created with ID: {lakehouse_id}")
         return lakehouse_id
@@ -144,11 +209,20 @@ def lakehouse(name, workspace_id):
 @create.command()
 @click.argument("name")
 @click.option("--workspace-id", required=True, help="Workspace ID where to create the warehouse")
-def warehouse(name, workspace_id):
+@click.option(
+    "--wait/--no-wait",
+    default=True,
+    show_default=True,
+    help="Wait for the service to finish creating it",
+)
+def warehouse(name, workspace_id, wait):
     """Create a new warehouse in a workspace"""
 
     def command_logic():
-        warehouse_id = create_warehouse(workspace_id, name, auth)
+        warehouse_id = create_warehouse(workspace_id, name, auth, wait=wait)
+        if warehouse_id is None:
+            click.echo(f"⏳ Creation of warehouse '{name}' accepted, not waiting for it")
+            return None
         click.echo(f"✅ Created warehouse '{name}' with ID: {warehouse_id}")
         logger.debug(f"Warehouse created with ID: {warehouse_id}")
         return warehouse_id
@@ -156,76 +230,179 @@ def warehouse(name, workspace_id):
     execute_command(command_logic)
 
 
+def _max_age(kind: str, refresh: bool, cache_ttl: Optional[float]) -> Optional[float]:
+    """
+    Get how old a list in the metadata cache may be for a display command.
+
+    The cache is only used with --cache-ttl or FABRIC_CACHE_TTL_<KIND>, so by default
+    the live lists are shown.
+    """
+    if refresh:
+        return 0.0
+    if cache_ttl is None and os.getenv(f"FABRIC_CACHE_TTL_{kind.upper()}"):
+        return metadata_cache.ttl(kind)
+    return cache_ttl
+
+
 @main.group()
 def display():
     """Display Microsoft Fabric resources"""
     pass
 
 
-@display.command(name="workspaces")
-def list_workspaces():
-    """Display all workspaces"""
+@display.command(name="profiles")
+def list_profiles():
+    """Display all stored auth profiles"""
 
     def command_logic():
-        spaces = get_workspaces(auth)
-        if not spaces:
-            click.echo("⚠️ No workspaces found")
+        profiles = Auth.list_profiles()
+        if not profiles:
+            click.echo("⚠️ No profiles found")
             return
 
-        for workspace_id, display_name, capacity_id in spaces:
+        for name in reversed(profiles):
+            spn_config = Auth(name).get_state().spn_config or {}
+            tenant_info = f" (Tenant ID: {spn_config['tenant_id']})" if spn_config else ""
+            active = " *" if name == auth.profile else ""
+            click.echo(f"  • {name}{tenant_info}{active}")
+
+    execute_command(command_logic)
+
+
+@display.command(name="workspaces")
+@click.option(
+    "--cache",
+    is_flag=True,
+    envvar="FABRIC_HTTP_CACHE",
+    help="Reuse cached responses, revalidated with the service (ETag/Last-Modified)",
+)
+@click.option("--refresh", is_flag=True, help="Fetch the list and store it in the metadata cache")
+@click.option(
+    "--cache-ttl",
+    type=float,
+    help="Show the list from the metadata cache if it was stored at most this many "
+    "seconds ago, instead of fetching it",
+)
+def list_workspaces(cache, refresh, cache_ttl):
+    """Display all workspaces"""
+
+    max_age = _max_age("workspace", refresh, cache_ttl)
+
+    def command_logic():
+        # Print each page as it arrives while the next one is fetched
+        count = 0
+        for workspace_id, display_name, capacity_id in iter_workspaces(
+            auth, prefetch=True, cache=cache, max_age=max_age, stream=True
+        ):
             capacity_info = f" (Capacity ID: {capacity_id})" if capacity_id else ""
             click.echo(f"  • {display_name} (ID: {workspace_id}){capacity_info}")
-        logger.debug(f"Listed workspaces: {spaces}")
+            count += 1
+
+        if not count:
+            click.echo("⚠️ No workspaces found")
+        logger.debug(f"Listed {count} workspaces")
 
     execute_command(command_logic)
 
 
 @display.command(name="lakehouses")
 @click.option("--workspace-id", required=True, help="Workspace ID to list lakehouses from")
-def list_lakehouses(workspace_id):
+@click.option(
+    "--cache",
+    is_flag=True,
+    envvar="FABRIC_HTTP_CACHE",
+    help="Reuse cached responses, revalidated with the service (ETag/Last-Modified)",
+)
+@click.option("--refresh", is_flag=True, help="Fetch the list and store it in the metadata cache")
+@click.option(
+    "--cache-ttl",
+    type=float,
+    help="Show the list from the metadata cache if it was stored at most this many "
+    "seconds ago, instead of fetching it",
+)
+def list_lakehouses(workspace_id, cache, refresh, cache_ttl):
     """Display all lakehouses in a workspace"""
 
-    def command_logic():
-        lakehouses = get_lakehouses(workspace_id, auth)
-        if not lakehouses:
-            click.echo(f"⚠️ No lakehouses found in workspace {workspace_id}")
-            return
+    max_age = _max_age("lakehouse", refresh, cache_ttl)
 
-        click.echo(f"\nLakehouses in workspace {workspace_id}:")
-        for lakehouse_id, display_name in lakehouses:
+    def command_logic():
+        count = 0
+        for lakehouse_id, display_name in iter_lakehouses(
+            workspace_id, auth, prefetch=True, cache=cache, max_age=max_age, stream=True
+        ):
+            if not count:
+                click.echo(f"\nLakehouses in workspace {workspace_id}:")
             click.echo(f"  • {display_name} (ID: {lakehouse_id})")
-        logger.debug(f"Listed lakehouses: {lakehouses}")
+            count += 1
+
+        if not count:
+            click.echo(f"⚠️ No lakehouses found in workspace {workspace_id}")
+        logger.debug(f"Listed {count} lakehouses")
 
     execute_command(command_logic)
 
 
 @display.command(name="warehouses")
 @click.option("--workspace-id", required=True, help="Workspace ID to list warehouses from")
-def list_warehouses(workspace_id):
+@click.option(
+    "--cache",
+    is_flag=True,
+    envvar="FABRIC_HTTP_CACHE",
+    help="Reuse cached responses, revalidated with the service (ETag/Last-Modified)",
+)
+@click.option("--refresh", is_flag=True, help="Fetch the list and store it in the metadata cache")
+@click.option(
+    "--cache-ttl",
+    type=float,
+    help="Show the list from the metadata cache if it was stored at most this many "
+    "seconds ago, instead of fetching it",
+)
+def list_warehouses(workspace_id, cache, refresh, cache_ttl):
     """Display all warehouses in a workspace !!not working with SPN!!"""
     logger.debug(f"Current state: {auth.get_state()}")
 
-    def command_logic():
-        warehouses = get_warehouses(workspace_id, auth)
-        if not warehouses:
-            click.echo(f"⚠️ No warehouses found in workspace {workspace_id}")
-            return
+    max_age = _max_age("warehouse", refresh, cache_ttl)
 
-        click.echo(f"\nWarehouses in workspace {workspace_id}:")
-        for warehouse_id, display_name in warehouses:
+    def command_logic():
+        count = 0
+        for warehouse_id, display_name in iter_warehouses(
+            workspace_id, auth, prefetch=True, cache=cache, max_age=max_age, stream=True
+        ):
+            if not count:
+                click.echo(f"\nWarehouses in workspace {workspace_id}:")
             click.echo(f"  • {display_name} (ID: {warehouse_id})")
-        logger.debug(f"Listed warehouses: {warehouses}")
+            count += 1
+
+        if not count:
+            click.echo(f"⚠️ No warehouses found in workspace {workspace_id}")
+        logger.debug(f"Listed {count} warehouses")
 
     execute_command(command_logic)
 
 
 @display.command(name="capacities")
-def display_capacities():
+@click.option(
+    "--cache",
+    is_flag=True,
+    envvar="FABRIC_HTTP_CACHE",
+    help="Reuse cached responses, revalidated with the service (ETag/Last-Modified)",
+)
+@click.option("--refresh", is_flag=True, help="Fetch the list and store it in the metadata cache")
+@click.option(
+    "--cache-ttl",
+    type=float,
+    help="Show the list from the metadata cache if it was stored at most this many "
+    "seconds ago, instead of fetching it",
+)
+def display_capacities(cache, refresh, cache_ttl):
     """Display all capacities."""
 
+    max_age = _max_age("capacity", refresh, cache_ttl)
+
     def command_logic():
-        capacities = get_capacities(auth)
-        for capacity_id, display_name in capacities:
+        for capacity_id, display_name in iter_capacities(
+            auth, prefetch=True, cache=cache, max_age=max_age, stream=True
+        ):
             click.echo(f"  • {display_name} (ID: {capacity_id})")
 
     execute_command(command_logic)
@@ -241,11 +418,19 @@ def capacity():
 @click.option("--subscription-id", required=True, help="Azure subscription ID")
 @click.option("--resource-group-name", required=True, help="Resource group name")
 @click.option("--dedicated-capacity-name", required=True, help="Dedicated capacity name")
-def suspend_capacity_cli(subscription_id, resource_group_name, dedicated_capacity_name):
+@click.option(
+    "--wait/--no-wait",
+    default=False,
+    show_default=True,
+    help="Wait until the capacity is suspended",
+)
+def suspend_capacity_cli(subscription_id, resource_group_name, dedicated_capacity_name, wait):
     """Suspend a dedicated capacity in Azure"""
 
     def command_logic():
-        response = suspend_capacity(subscription_id, resource_group_name, dedicated_capacity_name)
+        response = suspend_capacity(
+            subscription_id, resource_group_name, dedicated_capacity_name, auth, wait=wait
+        )
         click.echo(f"✅ Successfully suspended capacity '{dedicated_capacity_name}'")
         click.echo(response)
 
@@ -256,11 +441,19 @@ def suspend_capacity_cli(subscription_id, resource_group_name, dedicated_capacit
 @click.option("--subscription-id", required=True, help="Azure subscription ID")
 @click.option("--resource-group-name", required=True, help="Resource group name")
 @click.option("--dedicated-capacity-name", required=True, help="Dedicated capacity name")
-def resume_capacity_cli(subscription_id, resource_group_name, dedicated_capacity_name):
+@click.option(
+    "--wait/--no-wait",
+    default=False,
+    show_default=True,
+    help="Wait until the capacity is resumed",
+)
+def resume_capacity_cli(subscription_id, resource_group_name, dedicated_capacity_name, wait):
     """Resume a dedicated capacity in Azure"""
 
     def command_logic():
-        response = resume_capacity(subscription_id, resource_group_name, dedicated_capacity_name)
+        response = resume_capacity(
+            subscription_id, resource_group_name, dedicated_capacity_name, auth, wait=wait
+        )
         click.echo(f"✅ Successfully resumed capacity '{dedicated_capacity_name}'")
         click.echo(response)
 
@@ -312,5 +505,78 @@ def connect_git(
     execute_command(command_logic)
 
 
+@main.command(name="apply")
+@click.option(
+    "-f",
+    "--file",
+    "spec_file",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="YAML spec of the workspaces, lakehouses, warehouses and Git connections",
+)
+@click.option(
+    "--parallel",
+    default=APPLY_WORKERS,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help="Steps to run at the same time",
+)
+def apply(spec_file, parallel):
+    """Create the resources of a spec, running independent steps in parallel"""
+
+    def on_done(task, result, error):
+        if error is None:
+            click.echo(f"✅ {task.description}")
+        else:
+            click.echo(f"❌ {task.description}: {error}")
+
+    def command_logic():
+        spec = load_spec(spec_file)
+        snapshot = take_snapshot(spec, auth, parallel)
+        for message in conflicts(spec, snapshot):
+            click.echo(f"⚠️ {message}")
+        result = apply_spec(spec, auth, max_workers=parallel, on_done=on_done, snapshot=snapshot)
+        if not result.results and result.ok:
+            click.echo("✅ Nothing to change")
+        for key in result.skipped:
+            click.echo(f"⏭️ Skipped {key}, a step it needs failed")
+        if not result.ok:
+            raise RuntimeError(
+                f"{len(result.errors)} steps failed and {len(result.skipped)} were skipped"
+            )
+        logger.debug(f"Applied {spec_file}: {len(result.results)} steps")
+
+    execute_command(command_logic)
+
+
+@main.command(name="plan")
+@click.option(
+    "-f",
+    "--file",
+    "spec_file",
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help="YAML spec of the workspaces, lakehouses, warehouses and Git connections",
+)
+def plan(spec_file):
+    """Show what apply would change to make the live state match a spec"""
+
+    def command_logic():
+        spec = load_spec(spec_file)
+        snapshot = take_snapshot(spec, auth)
+        for message in conflicts(spec, snapshot):
+            click.echo(f"⚠️ {message}")
+        tasks = build_tasks(spec, auth, snapshot)
+        if not tasks:
+            click.echo("✅ Nothing to change")
+            return
+        click.echo(f"Plan for {spec_file}:")
+        for task in tasks:
+            click.echo(f"  + {task.description}")
+        click.echo(f"{len(tasks)} steps to apply")
+
+    execute_command(command_logic)
+
+
 if __name__ == "__main__":
     main()
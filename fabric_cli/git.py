@@ -1,5 +1,6 @@
 import requests
-from typing import Dict
+from . import transport
+from typing import Any, Dict
 from .auth import Auth
 import logging
 
@@ -27,7 +28,7 @@ def connect_git_repository(
         logger.debug(
             f"Connecting workspace {workspace_id} to Git repository with payload: {json_payload}"
         )
-        response = requests.post(url, json=json_payload, headers=auth.get_headers("fabric"))
+        response = transport.post(url, json=json_payload, headers=auth.get_headers("fabric"))
         response.raise_for_status()
         logger.debug(f"Workspace {workspace_id} successfully connected to Git repository")
 
@@ -37,3 +38,38 @@ def connect_git_repository(
             error_msg += f"\nResponse: {e.response.content.decode()}"
         logger.error(error_msg)
         raise requests.exceptions.HTTPError(error_msg)
+
+
+def get_git_connection(workspace_id: str, auth: Auth) -> Dict[str, Any]:
+    """
+    Gets the Git connection of a workspace.
+
+    Args:
+        workspace_id: The ID of the workspace.
+        auth: Authentication instance for getting headers.
+
+    Returns:
+        Dict: The connection, with ``gitConnectionState`` (``NotConnected``, ``Connected``
+        or ``ConnectedAndInitialized``) and, when connected, ``gitProviderDetails``.
+
+    Raises:
+        requests.exceptions.HTTPError: If the API request fails.
+    """
+    url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/git/connection"
+
+    try:
+        logger.debug(f"Getting Git connection of workspace {workspace_id}")
+        response = transport.get(url, headers=auth.get_headers("fabric"))
+        response.raise_for_status()
+        connection = response.json()
+        logger.debug(
+            f"Workspace {workspace_id} Git connection: {connection.get('gitConnectionState')}"
+        )
+        return connection
+
+    except requests.exceptions.HTTPError as e:
+        error_msg = f"Error getting Git connection of workspace: {str(e)}"
+        if e.response and e.response.content:
+            error_msg += f"\nResponse: {e.response.content.decode()}"
+        logger.error(error_msg)
+        raise requests.exceptions.HTTPError(error_msg)
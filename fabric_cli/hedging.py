@@ -0,0 +1,144 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Callable, Deque, Dict, Optional
+from urllib.parse import urlparse
+import logging
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Send the second request once the first took longer than this percentile of the endpoint
+PERCENTILE = float(os.getenv("FABRIC_HEDGE_PERCENTILE", "95"))
+# Latencies kept per endpoint, and needed before the percentile is used
+SAMPLES = 200
+MIN_SAMPLES = 20
+# Seconds to wait before hedging an endpoint without enough samples
+DEFAULT_DELAY = float(os.getenv("FABRIC_HEDGE_DELAY", "1"))
+# Never hedge sooner than this, so fast endpoints do not get every request twice
+MIN_DELAY = 0.05
+
+_ID_SEGMENT = re.compile(r"/[0-9a-fA-F]{8}(?:-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}")
+
+
+def endpoint(url: str) -> str:
+    """
+    Get the endpoint of a URL, which requests to different resources share.
+
+    Args:
+        url: The request URL.
+
+    Returns:
+        The host and path, with IDs replaced by ``{id}`` and without the query.
+    """
+    parts = urlparse(url)
+    return parts.netloc + _ID_SEGMENT.sub("/{id}", parts.path.rstrip("/"))
+
+
+class LatencyTracker:
+    """Recent latencies per endpoint, to decide how long a request may take before hedging."""
+
+    def __init__(self, samples: int = SAMPLES):
+        self._samples = samples
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = {}
+
+    def record(self, key: str, seconds: float):
+        """Record how long a request to an endpoint took"""
+        with self._lock:
+            latencies = self._latencies.get(key)
+            if latencies is None:
+                latencies = self._latencies[key] = deque(maxlen=self._samples)
+            latencies.append(seconds)
+
+    def percentile(self, key: str, percentile: float) -> Optional[float]:
+        """
+        Get a latency percentile of an endpoint.
+
+        Args:
+            key: The endpoint.
+            percentile: The percentile, between 0 and 100.
+
+        Returns:
+            The latency in seconds, or None with fewer than MIN_SAMPLES samples.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies.get(key, ()))
+        if len(latencies) < MIN_SAMPLES:
+            return None
+        return latencies[round(percentile / 100 * (len(latencies) - 1))]
+
+    def delay(self, key: str) -> float:
+        """Get how long to wait for a request to an endpoint before sending a second one"""
+        threshold = self.percentile(key, PERCENTILE)
+        return DEFAULT_DELAY if threshold is None else max(MIN_DELAY, threshold)
+
+
+tracker = LatencyTracker()
+
+
+def _start(send: Callable[[], requests.Response], key: str) -> Future:
+    future: Future = Future()
+
+    def run():
+        start = time.monotonic()
+        try:
+            response = send()
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            tracker.record(key, time.monotonic() - start)
+            future.set_result(response)
+
+    # Daemon threads, so a slow request that lost the race does not hold up exit
+    threading.Thread(target=run, name=f"hedge {key}", daemon=True).start()
+    return future
+
+
+def _discard(future: Future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def hedged(send: Callable[[], requests.Response], url: str) -> requests.Response:
+    """
+    Send an idempotent request, and a second one if the first is slow.
+
+    When the first request has not answered within the latency percentile of its
+    endpoint, the same request is sent again and the first answer is used. The other
+    request cannot be interrupted; its response is closed when it arrives.
+
+    Args:
+        send: Sends the request once; must be safe to call twice at the same time.
+        url: The request URL, to find the endpoint.
+
+    Returns:
+        requests.Response: The first response.
+
+    Raises:
+        requests.exceptions.RequestException: If every request failed; the error of the
+            first one to fail.
+    """
+    key = endpoint(url)
+    first = _start(send, key)
+    delay = tracker.delay(key)
+    done, _ = wait([first], timeout=delay)
+    if done:
+        return first.result()
+
+    logger.debug(f"No answer from {key} after {delay:.2f}s, sending a hedged request")
+    futures = [first, _start(send, key)]
+    error: Optional[BaseException] = None
+    while futures:
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            futures.remove(future)
+            if future.exception() is None:
+                for other in futures:
+                    other.add_done_callback(_discard)
+                return future.result()
+            error = error or future.exception()
+    raise error
@@ -0,0 +1,105 @@
+from datetime import timedelta
+from typing import Optional
+import logging
+import requests
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import h2  # noqa: F401 - httpx needs it for HTTP/2
+    import httpx
+except ImportError:  # pragma: no cover - depends on the installed extras
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+def available() -> bool:
+    """Check if the HTTP/2 client can be used, which needs ``pip install FabricCLI[http2]``"""
+    return httpx is not None
+
+
+class Http2Client:
+    """
+    HTTP/2 client with the request interface of a requests.Session.
+
+    Requests from all threads to one host are multiplexed over a single connection, instead
+    of one HTTP/1.1 connection per concurrent request. Hosts without HTTP/2 support are
+    spoken to over HTTP/1.1. Responses are converted to ``requests.Response``, so callers
+    and their error handling do not change.
+    """
+
+    def __init__(self, max_connections: int, timeout: Optional[float] = None, **client_kwargs):
+        """
+        Args:
+            max_connections: Connections kept open, across all hosts.
+            timeout: Default seconds to wait for the server.
+            **client_kwargs: Passed on to httpx.Client.
+        """
+        if not available():
+            raise ImportError(
+                "HTTP/2 needs httpx and h2, install them with: pip install FabricCLI[http2]"
+            )
+        self._client = httpx.Client(
+            http2=True,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+            **client_kwargs,
+        )
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request.
+
+        Args:
+            method: The HTTP method.
+            url: The URL to request.
+            **kwargs: The requests arguments ``headers``, ``json``, ``data``, ``params``,
+                ``timeout`` and ``allow_redirects``.
+
+        Returns:
+            requests.Response: The response.
+
+        Raises:
+            requests.exceptions.Timeout: If the server did not answer in time.
+            requests.exceptions.ConnectionError: If the connection failed.
+        """
+        kwargs.pop("stream", None)
+        if "allow_redirects" in kwargs:
+            kwargs["follow_redirects"] = kwargs.pop("allow_redirects")
+        data = kwargs.pop("data", None)
+        if data is not None:
+            kwargs["content" if isinstance(data, (bytes, str)) else "data"] = data
+        try:
+            response = self._client.request(method, url, **kwargs)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        return to_requests_response(response)
+
+    def close(self):
+        """Close the connections of the client."""
+        self._client.close()
+
+
+def to_requests_response(response: "httpx.Response") -> requests.Response:
+    """Convert a read httpx response to a requests response."""
+    result = requests.Response()
+    result.status_code = response.status_code
+    result.headers = CaseInsensitiveDict(response.headers)
+    result._content = response.content
+    result.url = str(response.url)
+    result.reason = response.reason_phrase
+    result.encoding = response.encoding
+    try:
+        result.elapsed = response.elapsed
+    except RuntimeError:
+        # Only set once httpx has closed the response
+        result.elapsed = timedelta(0)
+    result.request = requests.Request(
+        response.request.method, str(response.request.url), headers=dict(response.request.headers)
+    ).prepare()
+    logger.debug(f"{response.request.method} {result.url} over {response.http_version}")
+    return result
@@ -0,0 +1,232 @@
+import base64
+import hashlib
+import json
+import os
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+import logging
+import requests
+from requests.structures import CaseInsensitiveDict
+from . import transport
+from .locking import atomic_write
+
+logger = logging.getLogger(__name__)
+
+HTTP_CACHE_DIR = Path(
+    os.getenv("FABRIC_HTTP_CACHE_DIR", os.path.expanduser("~/.fabric/http_cache"))
+)
+
+# Bytes kept on disk; the least recently used responses are evicted first
+MAX_SIZE = int(os.getenv("FABRIC_HTTP_CACHE_SIZE", str(50 * 1024 * 1024)))
+
+# Seconds a response without freshness information is served without asking the service
+DEFAULT_TTL = float(os.getenv("FABRIC_HTTP_CACHE_TTL", "60"))
+MAX_HEURISTIC_TTL = 3600.0
+
+# Response headers kept with the body
+STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Date")
+
+
+def principal(headers: Mapping[str, str]) -> str:
+    """
+    Get who a request is sent as, so one user's cached responses are never served to another.
+
+    Args:
+        headers: The request headers.
+
+    Returns:
+        The ``tid`` and ``oid`` claims of the bearer token, or a hash of the token if it is
+        not a JWT.
+    """
+    token = headers.get("Authorization", "").split(" ", 1)[-1]
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return f"{claims['tid']}:{claims['oid']}"
+    except Exception:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+
+def freshness(headers: Mapping[str, str], now: float) -> float:
+    """
+    Get how many seconds a response may be served without revalidation.
+
+    Uses ``Cache-Control: max-age`` when the service sends it, otherwise 10% of the time
+    since ``Last-Modified`` (the usual heuristic), otherwise DEFAULT_TTL.
+
+    Args:
+        headers: The response headers.
+        now: The current time.
+
+    Returns:
+        The freshness lifetime in seconds, 0 for ``no-cache``.
+    """
+    cache_control = [d.strip().lower() for d in headers.get("Cache-Control", "").split(",")]
+    if "no-cache" in cache_control:
+        return 0.0
+    for directive in cache_control:
+        if directive.startswith("max-age="):
+            try:
+                return float(directive.split("=", 1)[1])
+            except ValueError:
+                break
+
+    last_modified = headers.get("Last-Modified")
+    if last_modified:
+        try:
+            age = now - parsedate_to_datetime(last_modified).timestamp()
+            return min(MAX_HEURISTIC_TTL, max(0.0, age / 10))
+        except (TypeError, ValueError):
+            pass
+    return DEFAULT_TTL
+
+
+class HttpCache:
+    """
+    On-disk cache of GET responses, revalidated with ETag and Last-Modified.
+
+    Each response is a JSON file named after a hash of the principal and the URL. Reading
+    an entry touches its modification time, and writing one evicts the least recently
+    used entries until the cache fits in ``max_size`` bytes.
+    """
+
+    def __init__(self, directory: Path = HTTP_CACHE_DIR, max_size: int = MAX_SIZE):
+        self.directory = Path(directory)
+        self.max_size = max_size
+
+    def _path(self, url: str, headers: Mapping[str, str]) -> Path:
+        key = hashlib.sha256(f"{principal(headers)} {url}".encode()).hexdigest()
+        return self.directory / f"{key}.json"
+
+    def _load(self, path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            entry = json.loads(path.read_text())
+            os.utime(path)
+            return entry
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+
+    def _store(self, path: Path, url: str, response: requests.Response):
+        if "no-store" in response.headers.get("Cache-Control", "").lower():
+            return
+        try:
+            body = response.content.decode("utf-8")
+        except UnicodeDecodeError:
+            return
+        now = time.time()
+        entry = {
+            "url": url,
+            "headers": {k: response.headers[k] for k in STORED_HEADERS if k in response.headers},
+            "body": body,
+            "stored": now,
+            "ttl": freshness(response.headers, now),
+        }
+        atomic_write(path, json.dumps(entry).encode())
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            logger.debug(f"Evicted {path} from the HTTP cache")
+
+    @staticmethod
+    def _response(url: str, entry: Dict[str, Any]) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = entry["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.from_cache = True
+        return response
+
+    def get(self, url: str, headers: Mapping[str, str], **kwargs) -> requests.Response:
+        """
+        Send a GET request, answered from the cache when possible.
+
+        A fresh entry is returned without a request. A stale one is revalidated with
+        ``If-None-Match``/``If-Modified-Since``, and returned again on 304 Not Modified.
+
+        Args:
+            url: The URL to request.
+            headers: The request headers, including Authorization.
+            **kwargs: Passed on to transport.get.
+
+        Returns:
+            requests.Response: The response; ``from_cache`` is True if it came from disk.
+        """
+        path = self._path(url, headers)
+        entry = self._load(path)
+        now = time.time()
+
+        if entry and now - entry["stored"] < entry["ttl"]:
+            logger.debug(f"HTTP cache hit: {url}")
+            return self._response(url, entry)
+
+        request_headers = dict(headers)
+        if entry:
+            if "ETag" in entry["headers"]:
+                request_headers["If-None-Match"] = entry["headers"]["ETag"]
+            if "Last-Modified" in entry["headers"]:
+                request_headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+
+        response = transport.get(url, headers=request_headers, **kwargs)
+
+        if entry and response.status_code == 304:
+            logger.debug(f"HTTP cache revalidated: {url}")
+            entry["headers"].update(
+                {k: response.headers[k] for k in STORED_HEADERS if k in response.headers}
+            )
+            entry["stored"] = now
+            entry["ttl"] = freshness(entry["headers"], now)
+            atomic_write(path, json.dumps(entry).encode())
+            return self._response(url, entry)
+
+        if response.status_code == 200:
+            self._store(path, url, response)
+        return response
+
+    def clear(self):
+        """Remove all cached responses."""
+        for path in self.directory.glob("*.json"):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+
+_cache: Optional[HttpCache] = None
+
+
+def get_cache() -> HttpCache:
+    """Get the process-wide HTTP cache"""
+    global _cache
+    if _cache is None:
+        _cache = HttpCache()
+    return _cache
+
+
+def get(url: str, headers: Mapping[str, str], **kwargs) -> requests.Response:
+    """Send a GET request through the process-wide HTTP cache, see HttpCache.get."""
+    return get_cache().get(url, headers, **kwargs)
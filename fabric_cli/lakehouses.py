@@ -1,12 +1,17 @@
 import requests
-from typing import List, Tuple
+from . import metadata_cache, operations, transport
+from typing import Iterator, List, Optional
 from .auth import Auth
+from .models import Lakehouse
+from .pagination import iter_items
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def create_lakehouse(workspace_id: str, display_name: str, auth: Auth) -> str:
+def create_lakehouse(
+    workspace_id: str, display_name: str, auth: Auth, wait: bool = True
+) -> Optional[str]:
     """
     Creates a new lakehouse in the specified workspace.
 
@@ -14,23 +19,38 @@ def create_lakehouse(workspace_id: str, display_name: str, auth: Auth) -> str:
         workspace_id: The ID of the workspace where the lakehouse will be created.
         display_name: The display name for the new lakehouse.
         auth: Authentication instance for getting headers.
+        wait: Wait for the creation to finish when the service runs it asynchronously.
 
     Returns:
-        str: The ID of the created lakehouse.
+        str: The ID of the created lakehouse, or None if the creation runs asynchronously
+        and ``wait`` is False.
 
     Raises:
-        requests.exceptions.HTTPError: If the API request fails.
+        requests.exceptions.HTTPError: If the API request or the creation fails.
+        TimeoutError: If the creation does not finish in time.
     """
     url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/lakehouses"
     json_payload = {"displayName": display_name}
 
     try:
         logger.debug(f"Creating lakehouse with payload: {json_payload}")
-        response = requests.post(url, json=json_payload, headers=auth.get_headers("fabric"))
+        response = transport.post(url, json=json_payload, headers=auth.get_headers("fabric"))
         response.raise_for_status()
-        lakehouse_id = response.json()["id"]
-        logger.debug(f"Lakehouse created with ID: {lakehouse_id}")
-        return lakehouse_id
+
+        # 202 Accepted: the lakehouse is created by a long-running operation
+        operation = operations.from_response(response, auth, fetch_result=True)
+        if operation:
+            if not wait:
+                logger.debug(f"Not waiting for lakehouse creation: {operation.url}")
+                metadata_cache.invalidate("lakehouse", auth, workspace_id)
+                return None
+            lakehouse = operations.wait(operation)
+        else:
+            lakehouse = response.json()
+
+        logger.debug(f"Lakehouse created with ID: {lakehouse['id']}")
+        metadata_cache.write_through("lakehouse", auth, workspace_id, lakehouse)
+        return lakehouse["id"]
 
     except requests.exceptions.HTTPError as e:
         error_msg = f"Error creating lakehouse: {str(e)}"
@@ -40,33 +60,75 @@ def create_lakehouse(workspace_id: str, display_name: str, auth: Auth) -> str:
         raise requests.exceptions.HTTPError(error_msg)
 
 
-def get_lakehouses(workspace_id: str, auth: "Auth") -> List[Tuple[str, str]]:
+def iter_lakehouses(
+    workspace_id: str,
+    auth: "Auth",
+    prefetch: bool = False,
+    cache: bool = False,
+    max_age: Optional[float] = None,
+    stream: bool = False,
+    hedge: bool = False,
+) -> Iterator[Lakehouse]:
     """
-    Get all lakehouses in a workspace.
+    Lazily get the lakehouses in a workspace, page by page.
 
     Args:
         workspace_id: The ID of the workspace to list lakehouses from.
         auth: Authentication instance for getting headers.
+        prefetch: Fetch the next page while the current one is consumed.
+        cache: Answer from, and revalidate against, the on-disk HTTP cache.
+        max_age: Serve the list from the metadata cache if it was stored at most this many
+            seconds ago; 0 fetches and stores it again, None leaves the metadata cache alone.
+        stream: Decode large responses as they arrive, instead of all at once.
+        hedge: Send a slow list request again and use the first answer, to cut tail latency.
 
-    Returns:
-        List of tuples containing lakehouse IDs and display names.
+    Yields:
+        Lakehouses, which unpack to lakehouse IDs and display names.
 
     Raises:
         requests.exceptions.HTTPError: If the API request fails.
     """
     url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/lakehouses"
     logger.debug(f"Fetching lakehouses for workspace ID: {workspace_id}")
-    response = requests.get(url, headers=auth.get_headers("fabric"))
-    response.raise_for_status()
 
-    response_data = response.json()
-    lakehouse_list = []
+    lakehouses = metadata_cache.cached_items(
+        "lakehouse",
+        auth,
+        workspace_id,
+        lambda: iter_items(url, auth, prefetch=prefetch, cache=cache, stream=stream, hedge=hedge),
+        max_age,
+    )
+    for lakehouse in lakehouses:
+        if lakehouse.get("id") and lakehouse.get("displayName"):
+            yield Lakehouse.from_payload(lakehouse)
+
+
+def get_lakehouses(
+    workspace_id: str,
+    auth: "Auth",
+    cache: bool = False,
+    max_age: Optional[float] = None,
+    hedge: bool = False,
+) -> List[Lakehouse]:
+    """
+    Get all lakehouses in a workspace.
+
+    Args:
+        workspace_id: The ID of the workspace to list lakehouses from.
+        auth: Authentication instance for getting headers.
+        cache: Answer from, and revalidate against, the on-disk HTTP cache.
+        max_age: Serve the list from the metadata cache if it was stored at most this many
+            seconds ago; 0 fetches and stores it again, None leaves the metadata cache alone.
+        hedge: Send a slow list request again and use the first answer, to cut tail latency.
 
-    for lakehouse in response_data.get("value", []):
-        lakehouse_id = lakehouse.get("id")
-        display_name = lakehouse.get("displayName")
-        if lakehouse_id and display_name:
-            lakehouse_list.append((lakehouse_id, display_name))
+    Returns:
+        List of lakehouses, which unpack to lakehouse IDs and display names.
 
+    Raises:
+        requests.exceptions.HTTPError: If the API request fails.
+    """
+    lakehouse_list = list(
+        iter_lakehouses(workspace_id, auth, cache=cache, max_age=max_age, hedge=hedge)
+    )
     logger.debug(f"Fetched lakehouses: {lakehouse_list}")
     return lakehouse_list
@@ -0,0 +1,123 @@
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+# Held locks per path, so nested file_lock calls in one process do not deadlock
+_held: Dict[str, Tuple[threading.RLock, int, int]] = {}
+_held_lock = threading.Lock()
+
+
+def _lock_fd(fd: int):
+    if os.name == "nt":
+        while True:
+            try:
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                time.sleep(0.05)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+
+
+def _unlock_fd(fd: int):
+    if os.name == "nt":
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """
+    Hold an exclusive cross-process lock for a file.
+
+    The lock is taken on a ``.lock`` file next to ``path`` so the file itself can be
+    replaced atomically while the lock is held. The lock is re-entrant within a process.
+
+    Args:
+        path: The file to lock.
+    """
+    key = str(Path(path).absolute())
+    with _held_lock:
+        if key not in _held:
+            _held[key] = (threading.RLock(), 0, -1)
+        rlock = _held[key][0]
+
+    with rlock:
+        _, depth, fd = _held[key]
+        if depth == 0:
+            lock_path = Path(key + ".lock")
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+            _lock_fd(fd)
+        _held[key] = (rlock, depth + 1, fd)
+        try:
+            yield
+        finally:
+            _, depth, fd = _held[key]
+            if depth == 1:
+                _unlock_fd(fd)
+                os.close(fd)
+                fd = -1
+            _held[key] = (rlock, depth - 1, fd)
+
+
+def atomic_write(path: Path, data: bytes, mode: int = 0o600, sync: bool = True):
+    """
+    Replace a file atomically, so readers never see a partially written file.
+
+    Args:
+        path: The file to write.
+        data: The new content.
+        mode: The permissions of the new file.
+        sync: Flush the content to disk before the rename, so it survives a power loss.
+            Without it, other processes still see the old or the new file, never a partial
+            one, but the write costs no disk flush.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def file_stamp(path: Path):
+    """
+    Get a cheap fingerprint of a file that changes whenever it is replaced or rewritten.
+
+    Args:
+        path: The file to fingerprint.
+
+    Returns:
+        A tuple of inode, modification time and size, or None if the file does not exist.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
@@ -0,0 +1,263 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import logging
+from . import http_cache
+from .auth import DEFAULT_PROFILE, Auth
+
+logger = logging.getLogger(__name__)
+
+METADATA_CACHE_FILE = Path(
+    os.getenv("FABRIC_METADATA_CACHE", os.path.expanduser("~/.fabric/metadata.db"))
+)
+
+# Seconds a cached list stays valid per entity kind, override with FABRIC_CACHE_TTL_<KIND>
+TTLS: Dict[str, float] = {
+    "workspace": 3600.0,
+    "capacity": 3600.0,
+    "lakehouse": 900.0,
+    "warehouse": 900.0,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    profile TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    parent TEXT NOT NULL,
+    id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    PRIMARY KEY (profile, kind, parent, id)
+);
+CREATE TABLE IF NOT EXISTS listings (
+    profile TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    parent TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (profile, kind, parent)
+);
+"""
+
+
+def ttl(kind: str) -> float:
+    """Get the default time to live of a cached list of an entity kind"""
+    override = os.getenv(f"FABRIC_CACHE_TTL_{kind.upper()}")
+    return float(override) if override else TTLS.get(kind, 900.0)
+
+
+class MetadataCache:
+    """
+    SQLite store of workspaces, capacities and items, shared by all processes.
+
+    A list is only served from the store if it was fetched completely, for that profile,
+    signed-in tenant and principal and parent workspace, within the allowed age. Entities
+    created by this CLI are added to stored lists, so they show up without a refresh.
+    """
+
+    def __init__(self, path: Path = METADATA_CACHE_FILE):
+        self.path = Path(path)
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=10)
+        try:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(SCHEMA)
+                    os.chmod(self.path, 0o600)
+                    self._initialized = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_list(
+        self, profile: str, kind: str, parent: str, max_age: float
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get a stored list if it is recent enough.
+
+        Args:
+            profile: The auth profile the list was fetched with.
+            kind: The entity kind, such as ``workspace`` or ``lakehouse``.
+            parent: The parent workspace ID, or an empty string.
+            max_age: The maximum age in seconds.
+
+        Returns:
+            The stored items, or None if the list is missing or too old.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fetched_at FROM listings WHERE profile = ? AND kind = ? AND parent = ?",
+                (profile, kind, parent),
+            ).fetchone()
+            if row is None or time.time() - row[0] > max_age:
+                return None
+            rows = conn.execute(
+                "SELECT payload FROM entities WHERE profile = ? AND kind = ? AND parent = ?",
+                (profile, kind, parent),
+            ).fetchall()
+        logger.debug(f"Metadata cache hit: {len(rows)} {kind} items of {parent or profile}")
+        return [json.loads(payload) for (payload,) in rows]
+
+    def put_list(self, profile: str, kind: str, parent: str, items: Iterable[Dict[str, Any]]):
+        """
+        Replace a stored list with a freshly fetched one.
+
+        Args:
+            profile: The auth profile the list was fetched with.
+            kind: The entity kind.
+            parent: The parent workspace ID, or an empty string.
+            items: The complete list of items, each with an ``id``.
+        """
+        rows = [(profile, kind, parent, item["id"], json.dumps(item)) for item in items]
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM entities WHERE profile = ? AND kind = ? AND parent = ?",
+                (profile, kind, parent),
+            )
+            conn.executemany("INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?)", rows)
+            conn.execute(
+                "INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?)",
+                (profile, kind, parent, time.time()),
+            )
+
+    def put(self, profile: str, kind: str, parent: str, item: Dict[str, Any]):
+        """
+        Add or update one entity, without changing how old its list is.
+
+        Args:
+            profile: The auth profile the entity belongs to.
+            kind: The entity kind.
+            parent: The parent workspace ID, or an empty string.
+            item: The entity, with an ``id``.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entities VALUES (?, ?, ?, ?, ?)",
+                (profile, kind, parent, item["id"], json.dumps(item)),
+            )
+
+    def invalidate(self, profile: str, kind: str, parent: str = ""):
+        """Forget a stored list, so it is fetched again on next use"""
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM listings WHERE profile = ? AND kind = ? AND parent = ?",
+                (profile, kind, parent),
+            )
+
+    def clear(self):
+        """Remove everything from the store."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entities")
+            conn.execute("DELETE FROM listings")
+
+
+_cache: Optional[MetadataCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> MetadataCache:
+    """Get the process-wide metadata cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None or _cache.path != METADATA_CACHE_FILE:
+            _cache = MetadataCache(METADATA_CACHE_FILE)
+        return _cache
+
+
+def _profile(auth: Auth) -> str:
+    # The profile and who is signed in with it, so signing in to another tenant or as
+    # another principal on the same profile does not serve the previous one's lists
+    profile = getattr(auth, "profile", None) or DEFAULT_PROFILE
+    return f"{profile}:{http_cache.principal(auth.get_headers('fabric'))}"
+
+
+def cached_items(
+    kind: str,
+    auth: Auth,
+    parent: str,
+    fetch: Callable[[], Iterator[Dict[str, Any]]],
+    max_age: Optional[float] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Serve a list from the metadata cache, or fetch it and store it.
+
+    Args:
+        kind: The entity kind.
+        auth: Authentication instance; lists are stored per profile and signed-in
+            principal.
+        parent: The parent workspace ID, or an empty string.
+        fetch: Fetches the items from the API.
+        max_age: Serve a stored list up to this many seconds old; 0 always fetches and
+            refreshes the store, None bypasses the store.
+
+    Yields:
+        The items, as returned by the API.
+    """
+    if max_age is None:
+        yield from fetch()
+        return
+
+    cache = get_cache()
+    profile = _profile(auth)
+    if max_age > 0:
+        items = cache.get_list(profile, kind, parent, max_age)
+        if items is not None:
+            yield from items
+            return
+
+    items = []
+    for item in fetch():
+        items.append(item)
+        yield item
+    # Only a list that was read to the end is complete enough to serve later
+    cache.put_list(profile, kind, parent, items)
+
+
+def write_through(kind: str, auth: Auth, parent: str, item: Dict[str, Any]):
+    """
+    Add a created entity to the metadata cache, if the cache is in use.
+
+    Errors are logged and ignored, the entity was created either way.
+
+    Args:
+        kind: The entity kind.
+        auth: Authentication instance the entity was created with.
+        parent: The parent workspace ID, or an empty string.
+        item: The entity, with an ``id``.
+    """
+    if not METADATA_CACHE_FILE.exists():
+        return
+    try:
+        get_cache().put(_profile(auth), kind, parent, item)
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to add {kind} {item.get('id')} to the metadata cache: {e}")
+
+
+def invalidate(kind: str, auth: Auth, parent: str = ""):
+    """
+    Make the next lookup of a list fetch it again, if the cache is in use.
+
+    Used when an entity was created but is not known yet, such as a lakehouse that is
+    still being created.
+
+    Args:
+        kind: The entity kind.
+        auth: Authentication instance the entity was created with.
+        parent: The parent workspace ID, or an empty string.
+    """
+    if not METADATA_CACHE_FILE.exists():
+        return
+    try:
+        get_cache().invalidate(_profile(auth), kind, parent)
+    except sqlite3.Error as e:
+        logger.warning(f"Failed to invalidate the {kind} list in the metadata cache: {e}")
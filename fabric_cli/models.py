@@ -0,0 +1,167 @@
+import json
+from typing import Any, Dict, Iterator, Optional, Tuple, Type, TypeVar
+import logging
+
+logger = logging.getLogger(__name__)
+
+R = TypeVar("R", bound="Resource")
+
+_SEPARATORS = (",", ":")
+
+
+class Resource:
+    """
+    A Fabric resource from a list response.
+
+    The fields used by nearly every caller are attributes. The rest of the API payload is
+    kept as compact JSON text and only decoded when ``payload`` or ``get`` needs it, so
+    holding a whole tenant in memory costs little more than its IDs and names.
+
+    Resources behave like the tuples the list functions used to return: they unpack,
+    index and compare equal to ``(id, display_name, ...)``.
+    """
+
+    __slots__ = ("id", "display_name", "_raw", "_payload")
+
+    # Payload members kept as attributes, by attribute name
+    _hot: Dict[str, str] = {"id": "id", "display_name": "displayName"}
+    # Attributes of the tuple view
+    _fields: Tuple[str, ...] = ("id", "display_name")
+
+    def __init__(self, id: str, display_name: str, **attributes: Any):
+        self.id = id
+        self.display_name = display_name
+        for name, value in attributes.items():
+            setattr(self, name, value)
+        self._raw: Optional[str] = None
+        self._payload: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_payload(cls: Type[R], payload: Dict[str, Any]) -> R:
+        """
+        Create a resource from an item of a Fabric list response.
+
+        Args:
+            payload: The decoded item.
+
+        Returns:
+            The resource, with the members that are not attributes stored as JSON text.
+        """
+        members = set(cls._hot.values())
+        resource = cls(**{name: payload.get(member) for name, member in cls._hot.items()})
+        rest = {k: v for k, v in payload.items() if k not in members}
+        if rest:
+            resource._raw = json.dumps(rest, separators=_SEPARATORS)
+        return resource
+
+    @property
+    def payload(self) -> Dict[str, Any]:
+        """The full API payload, decoded on first use"""
+        if self._payload is None:
+            payload = json.loads(self._raw) if self._raw else {}
+            for name, member in self._hot.items():
+                value = getattr(self, name)
+                if value is not None:
+                    payload[member] = value
+            self._payload = payload
+        return self._payload
+
+    def get(self, member: str, default: Any = None) -> Any:
+        """
+        Get a member of the API payload, such as ``description``.
+
+        Args:
+            member: The name of the member in the API response.
+            default: Returned when the payload does not have the member.
+
+        Returns:
+            The value of the member.
+        """
+        for name, hot_member in self._hot.items():
+            if hot_member == member:
+                value = getattr(self, name)
+                return default if value is None else value
+        return self.payload.get(member, default)
+
+    def __iter__(self) -> Iterator[Any]:
+        return (getattr(self, name) for name in self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, tuple):
+            return tuple(self) == other
+        if isinstance(other, Resource):
+            return type(self) is type(other) and self.payload == other.payload
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        attributes = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._hot)
+        return f"{type(self).__name__}({attributes})"
+
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in self._hot) + (self._raw,)
+
+    def __setstate__(self, state: Tuple[Any, ...]):
+        for name, value in zip(self._hot, state):
+            setattr(self, name, value)
+        self._raw = state[-1]
+        self._payload = None
+
+
+class Workspace(Resource):
+    """A workspace; the tuple view is ``(id, display_name, capacity_id)``."""
+
+    __slots__ = ("capacity_id",)
+    _hot = {**Resource._hot, "capacity_id": "capacityId"}
+    _fields = ("id", "display_name", "capacity_id")
+
+    def __init__(self, id: str, display_name: str, capacity_id: Optional[str] = None):
+        super().__init__(id, display_name, capacity_id=capacity_id)
+
+
+class Capacity(Resource):
+    """A capacity; the tuple view is ``(id, display_name)``."""
+
+    __slots__ = ("sku", "state")
+    _hot = {**Resource._hot, "sku": "sku", "state": "state"}
+
+    def __init__(
+        self, id: str, display_name: str, sku: Optional[str] = None, state: Optional[str] = None
+    ):
+        super().__init__(id, display_name, sku=sku, state=state)
+
+
+class Item(Resource):
+    """An item in a workspace; the tuple view is ``(id, display_name)``."""
+
+    __slots__ = ("type", "workspace_id")
+    _hot = {**Resource._hot, "type": "type", "workspace_id": "workspaceId"}
+
+    def __init__(
+        self,
+        id: str,
+        display_name: str,
+        type: Optional[str] = None,
+        workspace_id: Optional[str] = None,
+    ):
+        super().__init__(id, display_name, type=type, workspace_id=workspace_id)
+
+
+class Lakehouse(Item):
+    """A lakehouse; the tuple view is ``(id, display_name)``."""
+
+    __slots__ = ()
+
+
+class Warehouse(Item):
+    """A warehouse; the tuple view is ``(id, display_name)``."""
+
+    __slots__ = ()
@@ -0,0 +1,236 @@
+import heapq
+import os
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+import logging
+import requests
+from . import transport
+from .auth import Auth
+from .retry import parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for a long-running operation before giving up
+OPERATION_TIMEOUT = float(os.getenv("FABRIC_OPERATION_TIMEOUT", "600"))
+
+# Poll interval when the service does not send Retry-After, growing up to the maximum
+DEFAULT_INTERVAL = 2.0
+MAX_INTERVAL = 30.0
+# Never poll sooner than this, even when Retry-After is 0 or a date in the past
+MIN_INTERVAL = 1.0
+BACKOFF_FACTOR = 1.5
+
+FABRIC_OPERATIONS_URL = "https://api.fabric.microsoft.com/v1/operations"
+
+# Operation states of the Fabric and Azure Resource Manager status endpoints
+RUNNING_STATES = frozenset({"notstarted", "running", "inprogress", "accepted", "undefined"})
+SUCCEEDED_STATES = frozenset({"succeeded"})
+
+
+class Operation:
+    """
+    A long-running operation started by a request that was answered with 202 Accepted.
+
+    Call ``poll`` until it returns True, or hand it to ``wait``/``wait_all``.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        auth: Auth,
+        interval: float = DEFAULT_INTERVAL,
+        timeout: Optional[float] = None,
+        fetch_result: bool = False,
+    ):
+        self.url = url
+        self.auth = auth
+        self.provider = "management" if urlparse(url).netloc == "management.azure.com" else "fabric"
+        self.interval = interval
+        self.deadline = time.monotonic() + (OPERATION_TIMEOUT if timeout is None else timeout)
+        self.fetch_result = fetch_result
+        self.done = False
+        self.result: Any = None
+        self.result_url: Optional[str] = None
+        self.error: Optional[Exception] = None
+
+    def __repr__(self):
+        return f"Operation({self.url!r}, done={self.done})"
+
+    def _schedule(self, response: requests.Response):
+        retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            self.interval = max(MIN_INTERVAL, retry_after)
+        else:
+            self.interval = min(MAX_INTERVAL, self.interval * BACKOFF_FACTOR)
+
+    def _get(self, url: str) -> requests.Response:
+        response = transport.get(url, headers=self.auth.get_headers(self.provider))
+        response.raise_for_status()
+        return response
+
+    def _finish(self, result: Any):
+        self.done = True
+        self.result = result
+        logger.debug(f"Operation {self.url} finished")
+
+    def update(self, response) -> bool:
+        """
+        Apply a status response to the operation.
+
+        This does no I/O, so the blocking and the asyncio client share it. When the
+        operation succeeded and its result still has to be fetched, ``result_url`` is set.
+
+        Args:
+            response: The response (requests or httpx) of a GET on the status URL.
+
+        Returns:
+            bool: True if the operation finished.
+
+        Raises:
+            requests.exceptions.HTTPError: If the operation failed.
+        """
+        # Location style: 202 while running, the final resource when done
+        if response.status_code == 202:
+            self._schedule(response)
+            return False
+
+        body: Dict[str, Any] = response.json() if response.content else {}
+        status = body.get("status")
+        if status is None:
+            self._finish(body or None)
+            return True
+
+        state = status.lower()
+        if state in RUNNING_STATES:
+            logger.debug(f"Operation {self.url} is {status}, next poll in {self.interval:.1f}s")
+            self._schedule(response)
+            return False
+
+        if state in SUCCEEDED_STATES:
+            if self.fetch_result:
+                self.result_url = response.headers.get("Location") or f"{self.url}/result"
+            self._finish(None)
+            return True
+
+        error = body.get("error") or {}
+        raise requests.exceptions.HTTPError(
+            f"Operation {self.url} {status}: {error.get('message') or error or body}"
+        )
+
+    def poll(self) -> bool:
+        """
+        Check the status of the operation once.
+
+        Returns:
+            bool: True if the operation finished, after which ``result`` is set.
+
+        Raises:
+            requests.exceptions.HTTPError: If the operation failed or a status request fails.
+        """
+        if not self.update(self._get(self.url)):
+            return False
+        if self.result_url:
+            self.result = self._get(self.result_url).json()
+        return True
+
+
+def from_response(
+    response: requests.Response,
+    auth: Auth,
+    timeout: Optional[float] = None,
+    fetch_result: bool = False,
+) -> Optional[Operation]:
+    """
+    Get the long-running operation a response started.
+
+    Args:
+        response: The response to a request that may start a long-running operation.
+        auth: Authentication instance for polling.
+        timeout: Seconds to wait for the operation, defaults to OPERATION_TIMEOUT.
+        fetch_result: Fetch the result of a Fabric operation when it succeeds.
+
+    Returns:
+        The operation, or None if the response is not 202 or has no status URL.
+    """
+    if response.status_code != 202:
+        return None
+
+    headers = response.headers
+    url = headers.get("Azure-AsyncOperation") or headers.get("Location")
+    if not url and headers.get("x-ms-operation-id"):
+        url = f"{FABRIC_OPERATIONS_URL}/{headers['x-ms-operation-id']}"
+    if not url:
+        return None
+
+    interval = parse_retry_after(headers.get("Retry-After"))
+    logger.debug(f"Started long-running operation {url}")
+    return Operation(
+        url,
+        auth,
+        interval=DEFAULT_INTERVAL if interval is None else max(MIN_INTERVAL, interval),
+        timeout=timeout,
+        fetch_result=fetch_result,
+    )
+
+
+def wait_all(operations: List[Operation]) -> List[Any]:
+    """
+    Wait for many operations in the calling thread.
+
+    The operations are polled in order of their next due time, so waiting on many
+    operations takes one thread instead of one sleeping thread each.
+
+    Args:
+        operations: The operations to wait for.
+
+    Returns:
+        The results of the operations, in the same order.
+
+    Raises:
+        requests.exceptions.HTTPError: If an operation failed, after all others finished.
+        TimeoutError: If an operation did not finish before its timeout.
+    """
+    now = time.monotonic()
+    due = [(now + op.interval, i) for i, op in enumerate(operations) if not op.done]
+    heapq.heapify(due)
+
+    while due:
+        poll_at, i = heapq.heappop(due)
+        time.sleep(max(0.0, poll_at - time.monotonic()))
+        op = operations[i]
+        try:
+            if op.poll():
+                continue
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Operation {op.url} failed: {e}")
+            op.error = e
+            continue
+
+        if time.monotonic() + op.interval > op.deadline:
+            op.error = TimeoutError(f"Operation {op.url} did not finish in time")
+            logger.error(str(op.error))
+            continue
+        heapq.heappush(due, (time.monotonic() + op.interval, i))
+
+    for op in operations:
+        if op.error is not None:
+            raise op.error
+    return [op.result for op in operations]
+
+
+def wait(operation: Operation) -> Any:
+    """
+    Wait for one operation.
+
+    Args:
+        operation: The operation to wait for.
+
+    Returns:
+        The result of the operation.
+
+    Raises:
+        requests.exceptions.HTTPError: If the operation failed.
+        TimeoutError: If the operation did not finish before its timeout.
+    """
+    return wait_all([operation])[0]
@@ -0,0 +1,177 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+import logging
+import requests
+from . import http_cache, transport
+from .auth import Auth
+from .streaming import ListPage
+
+logger = logging.getLogger(__name__)
+
+
+def next_page_url(url: str, body: Dict[str, Any]) -> Optional[str]:
+    """
+    Get the URL of the next page of a Fabric list response.
+
+    Args:
+        url: The URL of the current page.
+        body: The decoded response body.
+
+    Returns:
+        The ``continuationUri``, or ``url`` with the ``continuationToken`` query parameter,
+        or None if this was the last page.
+    """
+    if body.get("continuationUri"):
+        return body["continuationUri"]
+    token = body.get("continuationToken")
+    if not token:
+        return None
+    parts = urlparse(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query) if k != "continuationToken"]
+    query.append(("continuationToken", token))
+    return urlunparse(parts._replace(query=urlencode(query)))
+
+
+def _fetch_page(
+    url: str, auth: Auth, provider: str, cache: bool = False, hedge: bool = False
+) -> Dict[str, Any]:
+    logger.debug(f"Fetching page: {url}")
+    get = http_cache.get if cache else transport.get
+    # Only pass hedge when set, so unhedged page requests are sent exactly as before
+    options = {"hedge": True} if hedge else {}
+    response = get(url, headers=auth.get_headers(provider), **options)
+    response.raise_for_status()
+    return response.json()
+
+
+def _open_page(url: str, auth: Auth, provider: str, hedge: bool = False) -> requests.Response:
+    logger.debug(f"Opening page: {url}")
+    response = transport.get(url, headers=auth.get_headers(provider), stream=True, hedge=hedge)
+    response.raise_for_status()
+    return response
+
+
+def _iter_streamed_items(
+    url: str, auth: Auth, provider: str, prefetch: bool, hedge: bool
+) -> Iterator[Dict[str, Any]]:
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    pending: Optional[Future] = None
+    page: Optional[ListPage] = None
+    try:
+        page = ListPage(_open_page(url, auth, provider, hedge))
+        while True:
+            pending = None
+            # The continuation token of a streamed page is only known once it is read
+            if page.complete and executor:
+                next_url = next_page_url(url, page.body)
+                if next_url:
+                    pending = executor.submit(_open_page, next_url, auth, provider, hedge)
+
+            yield from page
+
+            next_url = next_page_url(url, page.body)
+            if not next_url:
+                return
+            url = next_url
+            response = pending.result() if pending else _open_page(url, auth, provider, hedge)
+            page = ListPage(response)
+    finally:
+        if page is not None:
+            page.response.close()
+        if executor:
+            # Close a prefetched response nobody will read
+            if pending and not pending.cancel():
+                pending.add_done_callback(_close_response)
+            executor.shutdown(wait=False)
+
+
+def _close_response(future: Future):
+    if not future.exception():
+        future.result().close()
+
+
+def iter_pages(
+    url: str,
+    auth: Auth,
+    provider: str = "fabric",
+    prefetch: bool = False,
+    cache: bool = False,
+    hedge: bool = False,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Lazily fetch the pages of a list endpoint, following continuation tokens.
+
+    Args:
+        url: The URL of the first page.
+        auth: Authentication instance for getting headers.
+        provider: The token provider for the endpoint.
+        prefetch: Fetch the next page in the background while the current one is consumed.
+        cache: Answer from, and revalidate against, the on-disk HTTP cache.
+        hedge: Send a page request again when it is slow, and use the first answer.
+
+    Yields:
+        The ``value`` list of each page.
+
+    Raises:
+        requests.exceptions.HTTPError: If a page request fails.
+    """
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    pending: Optional[Future] = None
+    try:
+        body = _fetch_page(url, auth, provider, cache, hedge)
+        while True:
+            next_url = next_page_url(url, body)
+            pending = None
+            if next_url and executor:
+                pending = executor.submit(_fetch_page, next_url, auth, provider, cache, hedge)
+
+            yield body.get("value", [])
+
+            if not next_url:
+                return
+            url = next_url
+            body = pending.result() if pending else _fetch_page(url, auth, provider, cache, hedge)
+    finally:
+        if executor:
+            # Drop a prefetch nobody will read, if it has not started yet
+            if pending:
+                pending.cancel()
+            executor.shutdown(wait=False)
+
+
+def iter_items(
+    url: str,
+    auth: Auth,
+    provider: str = "fabric",
+    prefetch: bool = False,
+    cache: bool = False,
+    stream: bool = False,
+    hedge: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily fetch all items of a list endpoint, page by page.
+
+    Args:
+        url: The URL of the first page.
+        auth: Authentication instance for getting headers.
+        provider: The token provider for the endpoint.
+        prefetch: Fetch the next page in the background while the current one is consumed.
+        cache: Answer from, and revalidate against, the on-disk HTTP cache.
+        stream: Decode large pages as they arrive, so memory does not grow with the page
+            size and the first items are yielded before the download finishes. Not used
+            together with ``cache``.
+        hedge: Send a page request again when it is slow, and use the first answer.
+
+    Yields:
+        Each item of the ``value`` lists.
+
+    Raises:
+        requests.exceptions.HTTPError: If a page request fails.
+    """
+    if stream and not cache:
+        yield from _iter_streamed_items(url, auth, provider, prefetch, hedge)
+        return
+
+    for page in iter_pages(url, auth, provider, prefetch, cache, hedge):
+        yield from page
@@ -0,0 +1,129 @@
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+import logging
+from .auth import Auth
+from .capacity import get_capacities
+from .git import get_git_connection
+from .lakehouses import get_lakehouses
+from .models import Capacity, Workspace
+from .spec import Spec
+from .warehouses import get_warehouses
+from .workspaces import get_workspaces
+
+logger = logging.getLogger(__name__)
+
+# List requests sent at the same time while reading live state
+PLAN_WORKERS = int(os.getenv("FABRIC_PLAN_WORKERS", "8"))
+
+NOT_CONNECTED = "NotConnected"
+
+
+@dataclass
+class Snapshot:
+    """
+    The live state of the parts of a tenant a spec touches.
+
+    Lakehouses, warehouses and Git connections are only read for the workspaces of the
+    spec that exist and ask for them, and capacities only when the spec assigns any.
+    """
+
+    # By display name
+    workspaces: Dict[str, Workspace] = field(default_factory=dict)
+    # By lowercased ID; None when the spec assigns no capacity
+    capacities: Optional[Dict[str, Capacity]] = None
+    # Display names by workspace ID
+    lakehouses: Dict[str, Set[str]] = field(default_factory=dict)
+    warehouses: Dict[str, Set[str]] = field(default_factory=dict)
+    # The Git connection by workspace ID
+    git: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def git_connected(self, workspace_id: str) -> bool:
+        """True if the workspace is connected to a Git repository"""
+        connection = self.git.get(workspace_id, {})
+        return connection.get("gitConnectionState", NOT_CONNECTED) != NOT_CONNECTED
+
+
+def take_snapshot(spec: Spec, auth: Auth, max_workers: int = PLAN_WORKERS) -> Snapshot:
+    """
+    Read the live state a spec is compared against, with the reads run concurrently.
+
+    Workspaces, and capacities if the spec assigns any, are listed first. Then the
+    lakehouses, warehouses and Git connections of the existing workspaces of the spec are
+    read at the same time, each only if the spec has some for that workspace.
+
+    Args:
+        spec: The spec.
+        auth: Authentication instance for the API calls.
+        max_workers: Requests sent at the same time.
+
+    Returns:
+        Snapshot: The live state.
+
+    Raises:
+        requests.exceptions.HTTPError: If a read fails.
+    """
+    snapshot = Snapshot()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        workspaces = executor.submit(get_workspaces, auth)
+        capacities: Optional[Future] = None
+        if any(ws.capacity_id for ws in spec.workspaces):
+            capacities = executor.submit(get_capacities, auth)
+
+        snapshot.workspaces = {ws.display_name: ws for ws in workspaces.result()}
+        if capacities:
+            snapshot.capacities = {c.id.lower(): c for c in capacities.result()}
+
+        # The kind of each read and the workspace it is for
+        reads: Dict[Future, Tuple[str, str]] = {}
+        for ws in spec.workspaces:
+            live = snapshot.workspaces.get(ws.name)
+            if live is None:
+                continue
+            if ws.lakehouses:
+                reads[executor.submit(get_lakehouses, live.id, auth)] = ("lakehouses", live.id)
+            if ws.warehouses:
+                reads[executor.submit(get_warehouses, live.id, auth)] = ("warehouses", live.id)
+            if ws.git:
+                reads[executor.submit(get_git_connection, live.id, auth)] = ("git", live.id)
+
+        for future, (kind, workspace_id) in reads.items():
+            if kind == "git":
+                snapshot.git[workspace_id] = future.result()
+            else:
+                names = {item.display_name for item in future.result()}
+                getattr(snapshot, kind)[workspace_id] = names
+
+    logger.debug(f"Snapshot: {len(snapshot.workspaces)} workspaces, {len(reads)} workspace reads")
+    return snapshot
+
+
+def conflicts(spec: Spec, snapshot: Snapshot) -> List[str]:
+    """
+    Find differences between a spec and the live state that apply will not change.
+
+    Args:
+        spec: The spec.
+        snapshot: The live state, from take_snapshot.
+
+    Returns:
+        A message per difference: capacities that do not exist, and workspaces connected
+        to another Git repository or branch than the spec says.
+    """
+    messages = []
+    for ws in spec.workspaces:
+        known = snapshot.capacities
+        if ws.capacity_id and known is not None and ws.capacity_id.lower() not in known:
+            messages.append(f"Capacity {ws.capacity_id} of workspace '{ws.name}' was not found")
+
+        live = snapshot.workspaces.get(ws.name)
+        if ws.git and live and snapshot.git_connected(live.id):
+            details = snapshot.git[live.id].get("gitProviderDetails", {})
+            different = sorted(k for k, v in ws.git.provider_details.items() if details.get(k) != v)
+            if different:
+                messages.append(
+                    f"Workspace '{ws.name}' is connected to another Git repository "
+                    f"({', '.join(different)} differ), disconnect it first"
+                )
+    return messages
@@ -0,0 +1,160 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Tuple
+from urllib.parse import urlparse
+import logging
+from .locking import atomic_write, file_lock
+
+logger = logging.getLogger(__name__)
+
+# Bucket state is shared through files, so every fabric process on the host draws from one budget
+RATE_LIMIT_DIR = Path(os.getenv("FABRIC_RATE_LIMIT_DIR", os.path.expanduser("~/.fabric/ratelimit")))
+ENABLED = os.getenv("FABRIC_RATE_LIMIT", "1") != "0"
+
+# Requests per second and burst size per endpoint family, kept below the service limits.
+# Override one with FABRIC_RATE_LIMIT_<FAMILY>=<rate>:<burst>, for example 2:10.
+LIMITS: Dict[str, Tuple[float, float]] = {
+    "workspaces": (5.0, 20.0),
+    "items": (5.0, 20.0),
+    "admin": (200 / 3600, 20.0),
+    "arm": (3.0, 30.0),
+    "default": (5.0, 20.0),
+}
+
+# Workspace sub-resources that are workspace operations rather than items
+WORKSPACE_ACTIONS = frozenset(
+    {
+        "assigntocapacity",
+        "unassignfromcapacity",
+        "provisionidentity",
+        "deprovisionidentity",
+        "roleassignments",
+    }
+)
+
+_buckets: Dict[str, "TokenBucket"] = {}
+_buckets_lock = threading.Lock()
+
+
+def endpoint_family(url: str) -> str:
+    """
+    Get the endpoint family of a URL, the unit the service throttles by.
+
+    Args:
+        url: The request URL.
+
+    Returns:
+        One of ``workspaces``, ``items``, ``admin``, ``arm`` or ``default``.
+    """
+    parts = urlparse(url)
+    if parts.netloc == "management.azure.com":
+        return "arm"
+    if parts.netloc != "api.fabric.microsoft.com":
+        return "default"
+
+    segments = [s.lower() for s in parts.path.split("/") if s]
+    if "admin" in segments:
+        return "admin"
+    if len(segments) > 1 and segments[1] == "workspaces":
+        if len(segments) > 3 and segments[3] not in WORKSPACE_ACTIONS:
+            return "items"
+        return "workspaces"
+    return "default"
+
+
+def _limit(family: str) -> Tuple[float, float]:
+    override = os.getenv(f"FABRIC_RATE_LIMIT_{family.upper()}")
+    if override:
+        rate, _, burst = override.partition(":")
+        return float(rate), float(burst or rate)
+    return LIMITS.get(family, LIMITS["default"])
+
+
+class TokenBucket:
+    """
+    Token bucket whose state lives in a locked file shared by all processes.
+
+    Every request takes one token, tokens flow back at ``rate`` per second up to ``burst``.
+    A request that finds the bucket empty still takes its token, driving the count below
+    zero, and sleeps until its turn outside the lock, so waiters are served in order.
+    """
+
+    def __init__(self, path: Path, rate: float, burst: float):
+        self.path = Path(path)
+        self.rate = rate
+        self.burst = burst
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before using it"""
+        with file_lock(self.path):
+            now = time.time()
+            try:
+                state = json.loads(self.path.read_text())
+                tokens = float(state["tokens"])
+                elapsed = max(0.0, now - float(state["updated"]))
+                tokens = min(self.burst, tokens + elapsed * self.rate)
+            except (FileNotFoundError, ValueError, KeyError, TypeError):
+                tokens = self.burst
+
+            tokens -= 1
+            # Replaced atomically, so other processes never read a torn count. Not synced to
+            # disk: the count is seconds old, losing it in a power cut only refills the bucket
+            atomic_write(
+                self.path, json.dumps({"tokens": tokens, "updated": now}).encode(), sync=False
+            )
+        return 0.0 if tokens >= 0 else -tokens / self.rate
+
+    def acquire(self) -> float:
+        """
+        Wait until a request may be sent.
+
+        Returns:
+            The number of seconds waited.
+        """
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+def get_bucket(family: str) -> TokenBucket:
+    """Get the token bucket of an endpoint family"""
+    with _buckets_lock:
+        if family not in _buckets:
+            rate, burst = _limit(family)
+            _buckets[family] = TokenBucket(RATE_LIMIT_DIR / f"{family}.json", rate, burst)
+        return _buckets[family]
+
+
+def reserve(url: str) -> float:
+    """
+    Take a token for a request to a URL without waiting for it.
+
+    Args:
+        url: The request URL.
+
+    Returns:
+        The seconds to wait before sending the request.
+    """
+    if not ENABLED:
+        return 0.0
+    family = endpoint_family(url)
+    wait = get_bucket(family).reserve()
+    if wait:
+        logger.debug(f"Rate limited {family} request for {wait:.2f}s: {url}")
+    return wait
+
+
+def acquire(url: str):
+    """
+    Wait until a request to a URL fits in the budget of its endpoint family.
+
+    Args:
+        url: The request URL.
+    """
+    wait = reserve(url)
+    if wait:
+        time.sleep(wait)
@@ -0,0 +1,215 @@
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+import logging
+import requests
+from .circuit_breaker import CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# Status codes that mean "try again later" rather than "this request is wrong"
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+# Methods that can be sent twice without changing the outcome
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header.
+
+    Args:
+        value: The header value, either a number of seconds or an HTTP date.
+
+    Returns:
+        The number of seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a request.
+
+    Attributes:
+        max_attempts: Total number of attempts, including the first one.
+        backoff_base: Seconds of the first backoff, doubled for every further attempt.
+        backoff_max: Upper bound for a single backoff without Retry-After.
+        deadline: Seconds after the first attempt after which no retry is started.
+    """
+
+    max_attempts: int = int(os.getenv("FABRIC_RETRY_MAX_ATTEMPTS", "5"))
+    backoff_base: float = 1.0
+    backoff_max: float = 60.0
+    deadline: float = float(os.getenv("FABRIC_RETRY_DEADLINE", "120"))
+
+    def delay(self, attempt: int, response=None) -> float:
+        """
+        Get the wait before the next attempt.
+
+        Args:
+            attempt: The number of the attempt that failed, starting at 1.
+            response: The failed response (requests or httpx), if any.
+
+        Returns:
+            The Retry-After value of the response, or an exponential backoff with full jitter.
+        """
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return retry_after
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+
+class HostCooldown:
+    """
+    Per-host pause shared by all threads.
+
+    When one request to a host is throttled, every other request to that host waits
+    until the cool-down ends instead of adding to the load.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._until: Dict[str, float] = {}
+
+    def pause(self, host: str, seconds: float):
+        """Pause all requests to a host for the given number of seconds"""
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._until.get(host, 0.0):
+                self._until[host] = until
+                logger.info(f"Pausing requests to {host} for {seconds:.1f}s")
+
+    def remaining(self, host: str) -> float:
+        """Get the number of seconds until requests to a host may be sent again"""
+        with self._lock:
+            return max(0.0, self._until.get(host, 0.0) - time.monotonic())
+
+    def wait(self, host: str):
+        """Block until requests to a host may be sent again"""
+        seconds = self.remaining(host)
+        if seconds:
+            logger.debug(f"Waiting {seconds:.1f}s for {host} to cool down")
+            time.sleep(seconds)
+
+
+cooldown = HostCooldown()
+
+
+def is_retryable(method: str, retry_safe: bool = False) -> bool:
+    """Check if requests with this method may be retried"""
+    return retry_safe or method.upper() in IDEMPOTENT_METHODS
+
+
+def next_delay(
+    policy: RetryPolicy,
+    attempt: int,
+    start: float,
+    retryable: bool,
+    host: str,
+    response=None,
+) -> Optional[float]:
+    """
+    Decide if and when a failed attempt is retried.
+
+    This does no I/O, so the blocking and the asyncio client share it. A throttled
+    response starts the cool-down of its host, also when the request is not retried.
+
+    Args:
+        policy: The retry policy.
+        attempt: The number of the attempt that failed, starting at 1.
+        start: ``time.monotonic()`` of the first attempt.
+        retryable: Whether the request may be sent again.
+        host: The host of the request.
+        response: The failed response (requests or httpx), or None after a connection error.
+
+    Returns:
+        The seconds to wait before the next attempt, or None to give up.
+    """
+    delay = policy.delay(attempt, response)
+    if response is not None and response.status_code in (429, 503):
+        cooldown.pause(host, delay)
+
+    out_of_time = time.monotonic() - start + delay > policy.deadline
+    if not retryable or attempt >= policy.max_attempts or out_of_time:
+        return None
+    return delay
+
+
+def send_with_retry(
+    send: Callable[[], requests.Response],
+    method: str,
+    url: str,
+    retry_safe: bool = False,
+    policy: Optional[RetryPolicy] = None,
+) -> requests.Response:
+    """
+    Send a request, retrying throttled and transient failures of retry-safe requests.
+
+    Every attempt waits for the cool-down of the host first. Throttled responses start a
+    new cool-down for the host, also when the request itself is not retried.
+
+    Args:
+        send: Sends the request once.
+        method: The HTTP method, used to decide if the request is idempotent.
+        url: The request URL, used to find the host.
+        retry_safe: Retry even if the method is not idempotent.
+        policy: The retry policy, defaults to RetryPolicy().
+
+    Returns:
+        requests.Response: The last response; callers still call raise_for_status.
+
+    Raises:
+        requests.exceptions.RequestException: If the last attempt failed to connect.
+        CircuitOpenError: If the circuit breaker of the host is open.
+    """
+    policy = policy or RetryPolicy()
+    host = urlparse(url).netloc
+    retryable = is_retryable(method, retry_safe)
+    start = time.monotonic()
+    attempt = 0
+
+    while True:
+        attempt += 1
+        cooldown.wait(host)
+        response = None
+        try:
+            response = send()
+        except CircuitOpenError:
+            # Waiting would only delay the failure, the circuit stays open for a while
+            raise
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            error = e
+        else:
+            error = None
+            if response.status_code not in RETRY_STATUSES:
+                return response
+
+        delay = next_delay(policy, attempt, start, retryable, host, response)
+        if delay is None:
+            if error is not None:
+                raise error
+            return response
+
+        reason = error or f"status {response.status_code}"
+        logger.warning(
+            f"{method} {url} failed ({reason}), retry {attempt}/{policy.max_attempts - 1} "
+            f"in {delay:.1f}s"
+        )
+        time.sleep(delay)
@@ -0,0 +1,58 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time.
+
+    Callers that arrive while a call for the same key is in flight wait for it and get
+    its result (or its exception) instead of running the call again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call ``fn(*args, **kwargs)`` unless a call for ``key`` is already in flight.
+
+        Args:
+            key: Identifies calls that may share a result.
+            fn: The function to call.
+
+        Returns:
+            The result of the call, shared by all callers for the same key.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            logger.debug(f"Waiting for in-flight call {key}")
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Check if a call for a key is running"""
+        with self._lock:
+            return key in self._calls
@@ -0,0 +1,163 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import logging
+
+logger = logging.getLogger(__name__)
+
+GIT_PROVIDER_TYPES = ("AzureDevOps", "GitHub")
+
+
+@dataclass
+class GitSpec:
+    organization_name: str
+    project_name: str
+    git_provider_type: str
+    repository_name: str
+    branch_name: str
+    directory_name: str
+
+    @property
+    def provider_details(self) -> Dict[str, str]:
+        """The ``gitProviderDetails`` of the connect request"""
+        return {
+            "organizationName": self.organization_name,
+            "projectName": self.project_name,
+            "gitProviderType": self.git_provider_type,
+            "repositoryName": self.repository_name,
+            "branchName": self.branch_name,
+            "directoryName": self.directory_name,
+        }
+
+
+@dataclass
+class WorkspaceSpec:
+    name: str
+    capacity_id: Optional[str] = None
+    provision_identity: bool = False
+    lakehouses: List[str] = field(default_factory=list)
+    warehouses: List[str] = field(default_factory=list)
+    git: Optional[GitSpec] = None
+
+
+@dataclass
+class Spec:
+    workspaces: List[WorkspaceSpec] = field(default_factory=list)
+
+
+def _names(value: Any, where: str) -> List[str]:
+    if value is None:
+        return []
+    if not isinstance(value, list) or not all(isinstance(v, str) and v for v in value):
+        raise ValueError(f"{where} must be a list of names")
+    if len(set(value)) != len(value):
+        raise ValueError(f"{where} has duplicate names")
+    return value
+
+
+def _check_keys(data: Dict[str, Any], allowed: List[str], where: str):
+    unknown = sorted(set(data) - set(allowed))
+    if unknown:
+        raise ValueError(f"Unknown keys in {where}: {', '.join(unknown)}")
+
+
+def parse_spec(data: Dict[str, Any]) -> Spec:
+    """
+    Validate a decoded spec and convert it to a Spec.
+
+    Args:
+        data: The decoded YAML or JSON document.
+
+    Returns:
+        Spec: The spec.
+
+    Raises:
+        ValueError: If the document is not a valid spec.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("The spec must be a mapping with a 'workspaces' list")
+    _check_keys(data, ["workspaces"], "the spec")
+    workspaces = data.get("workspaces") or []
+    if not isinstance(workspaces, list):
+        raise ValueError("'workspaces' must be a list")
+
+    spec = Spec()
+    for i, ws in enumerate(workspaces):
+        if not isinstance(ws, dict) or not isinstance(ws.get("name"), str) or not ws["name"]:
+            raise ValueError(f"Workspace {i + 1} must be a mapping with a 'name'")
+        where = f"workspace '{ws['name']}'"
+        _check_keys(
+            ws,
+            ["name", "capacity_id", "provision_identity", "lakehouses", "warehouses", "git"],
+            where,
+        )
+
+        git = None
+        if ws.get("git") is not None:
+            if not isinstance(ws["git"], dict):
+                raise ValueError(f"'git' of {where} must be a mapping")
+            try:
+                git = GitSpec(**ws["git"])
+            except TypeError as e:
+                raise ValueError(f"Invalid 'git' of {where}: {e}")
+            if git.git_provider_type not in GIT_PROVIDER_TYPES:
+                raise ValueError(
+                    f"'git_provider_type' of {where} must be one of {', '.join(GIT_PROVIDER_TYPES)}"
+                )
+
+        spec.workspaces.append(
+            WorkspaceSpec(
+                name=ws["name"],
+                capacity_id=ws.get("capacity_id"),
+                provision_identity=bool(ws.get("provision_identity", False)),
+                lakehouses=_names(ws.get("lakehouses"), f"'lakehouses' of {where}"),
+                warehouses=_names(ws.get("warehouses"), f"'warehouses' of {where}"),
+                git=git,
+            )
+        )
+
+    names = [ws.name for ws in spec.workspaces]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate workspaces in the spec: {', '.join(duplicates)}")
+    return spec
+
+
+def load_spec(path: Union[str, Path]) -> Spec:
+    """
+    Read a spec from a YAML (or JSON) file.
+
+    Example::
+
+        workspaces:
+          - name: sales-dev
+            capacity_id: 00000000-0000-0000-0000-000000000000
+            provision_identity: true
+            lakehouses: [raw, curated]
+            warehouses: [reporting]
+            git:
+              organization_name: contoso
+              project_name: data
+              git_provider_type: AzureDevOps
+              repository_name: sales
+              branch_name: main
+              directory_name: /fabric
+
+    Args:
+        path: The spec file.
+
+    Returns:
+        Spec: The spec.
+
+    Raises:
+        ValueError: If the file is not a valid spec.
+    """
+    # Imported here, so other commands do not load it
+    import yaml
+
+    try:
+        data = yaml.safe_load(Path(path).read_text())
+    except yaml.YAMLError as e:
+        raise ValueError(f"Could not read spec {path}: {e}")
+    logger.debug(f"Loaded spec {path}")
+    return parse_spec(data)
@@ -0,0 +1,158 @@
+import codecs
+import json
+import os
+from typing import Any, Dict, Iterable, Iterator
+import logging
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Responses smaller than this many bytes are decoded at once with response.json()
+STREAM_THRESHOLD = int(os.getenv("FABRIC_STREAM_THRESHOLD", str(256 * 1024)))
+
+# Bytes read from the connection at a time
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Text of a JSON document as it arrives, with the position of the parser in it."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def more(self) -> bool:
+        """Read the next chunk, dropping the text already parsed. False at the end."""
+        if self.eof:
+            return False
+        parsed, self.pos = self.pos, 0
+        self.buffer = self.buffer[parsed:]
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.buffer += self._utf8.decode(b"", final=True)
+            self.eof = True
+        else:
+            self.buffer += self._utf8.decode(chunk)
+        return True
+
+    def peek(self) -> str:
+        """Get the next character that is not whitespace, or an empty string at the end."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.more():
+                return ""
+
+    def expect(self, characters: str) -> str:
+        """Consume the next character, which must be one of ``characters``."""
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError(f"Expected one of {characters!r} in JSON, got {character!r}")
+        self.pos += 1
+        return character
+
+    def value(self) -> Any:
+        """Decode the next JSON value, reading chunks until it is complete."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.more():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next chunk
+            if end < len(self.buffer) or not self.more():
+                self.pos = end
+                return value
+
+
+def iter_array(chunks: Iterable[bytes], key: str, rest: Dict[str, Any]) -> Iterator[Any]:
+    """
+    Decode the items of an array in a JSON object, as the bytes of the object arrive.
+
+    Only one item is held in memory at a time, besides the other members of the object.
+
+    Args:
+        chunks: The bytes of a JSON object, in pieces.
+        key: The member of the object with the array.
+        rest: Filled with the other members of the object, complete once the iterator is.
+
+    Yields:
+        The items of the array.
+
+    Raises:
+        ValueError: If the bytes are not a JSON object.
+    """
+    reader = _Reader(chunks)
+    reader.expect("{")
+    if reader.peek() == "}":
+        reader.pos += 1
+        return
+
+    while True:
+        name = reader.value()
+        if not isinstance(name, str):
+            raise ValueError(f"Expected a member name in JSON, got {name!r}")
+        reader.expect(":")
+        if name == key and reader.peek() == "[":
+            reader.pos += 1
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    if reader.expect(",]") == "]":
+                        break
+        else:
+            rest[name] = reader.value()
+        if reader.expect(",}") == "}":
+            break
+
+    if reader.peek():
+        raise ValueError("Extra data after the JSON object")
+
+
+class ListPage:
+    """
+    One page of a Fabric list response, with its ``value`` items decoded as they arrive.
+
+    Small responses, those with a Content-Length below ``threshold``, and responses that
+    were already read are decoded at once. Iterate the page for its items; ``body`` has
+    the other members, such as ``continuationToken``, once ``complete`` is True.
+    """
+
+    def __init__(self, response: requests.Response, threshold: int = STREAM_THRESHOLD):
+        """
+        Args:
+            response: A response requested with ``stream=True``.
+            threshold: Bytes from which the body is decoded incrementally.
+        """
+        self.response = response
+        self.body: Dict[str, Any] = {}
+        length = response.headers.get("Content-Length")
+        self.streamed = response.raw is not None and (length is None or int(length) >= threshold)
+        self.complete = not self.streamed
+        if not self.streamed:
+            self.body = response.json()
+            self._items = self.body.pop("value", [])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if not self.streamed:
+            yield from self._items
+            return
+
+        logger.debug(f"Decoding {self.response.url} as it arrives")
+        try:
+            yield from iter_array(self.response.iter_content(CHUNK_SIZE), "value", self.body)
+            self.complete = True
+        finally:
+            self.response.close()
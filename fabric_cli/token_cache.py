@@ -0,0 +1,140 @@
+import json
+import os
+import pickle
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional
+import logging
+from .locking import atomic_write, file_lock
+
+if TYPE_CHECKING:
+    import msal
+
+logger = logging.getLogger(__name__)
+
+TOKEN_CACHE_FILE = Path(
+    os.getenv("FABRIC_TOKEN_CACHE", os.path.expanduser("~/.fabric/msal_token_cache.json"))
+)
+HTTP_CACHE_FILE = TOKEN_CACHE_FILE.with_name("msal_http_cache.bin")
+
+_cache: Optional["msal.SerializableTokenCache"] = None
+_http_cache: Optional[Dict] = None
+_http_cache_snapshot: Optional[bytes] = None
+_save_lock = threading.Lock()
+
+
+def _write_private(path: Path, data: bytes):
+    """Atomically write a file that only the current user can read."""
+    with file_lock(path):
+        atomic_write(path, data, mode=0o600)
+
+
+def get_token_cache() -> "msal.SerializableTokenCache":
+    """
+    Get the process-wide MSAL token cache, loading it from disk on first use.
+
+    MSAL keys the cached access tokens by client ID, tenant and scope, so one cache file
+    can be shared by every service principal and scope the CLI talks to.
+
+    Returns:
+        msal.SerializableTokenCache: The shared token cache.
+    """
+    import msal
+
+    global _cache
+    if _cache is None:
+        _cache = msal.SerializableTokenCache()
+        try:
+            if TOKEN_CACHE_FILE.exists():
+                _cache.deserialize(TOKEN_CACHE_FILE.read_text())
+                logger.debug(f"Loaded MSAL token cache from {TOKEN_CACHE_FILE}")
+        except Exception as e:
+            logger.warning(f"Failed to load MSAL token cache: {e}")
+    return _cache
+
+
+def get_http_cache() -> Dict:
+    """
+    Get the MSAL HTTP cache, loading it from disk on first use.
+
+    MSAL stores authority and instance discovery responses in this mapping. Persisting it
+    means a new process can build a ConfidentialClientApplication without a network call.
+
+    Returns:
+        Dict: The mapping to pass as ``http_cache`` to MSAL.
+    """
+    global _http_cache, _http_cache_snapshot
+    if _http_cache is None:
+        _http_cache = {}
+        try:
+            if HTTP_CACHE_FILE.exists():
+                _http_cache_snapshot = HTTP_CACHE_FILE.read_bytes()
+                _http_cache = pickle.loads(_http_cache_snapshot)
+                logger.debug(f"Loaded MSAL HTTP cache from {HTTP_CACHE_FILE}")
+        except Exception as e:
+            logger.warning(f"Failed to load MSAL HTTP cache: {e}")
+            _http_cache = {}
+    return _http_cache
+
+
+def _merge_from_disk(cache: "msal.SerializableTokenCache"):
+    """
+    Add the entries other processes saved since this cache was loaded.
+
+    Other service principals and scopes are kept; for entries both copies have, the
+    in-memory one wins. Call this while holding the file lock.
+    """
+    try:
+        on_disk = json.loads(TOKEN_CACHE_FILE.read_text())
+    except FileNotFoundError:
+        return
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable MSAL token cache: {e}")
+        return
+
+    merged = json.loads(cache.serialize())
+    for credential_type, entries in on_disk.items():
+        if isinstance(entries, dict):
+            merged[credential_type] = {**entries, **merged.get(credential_type, {})}
+    cache.deserialize(json.dumps(merged))
+
+
+def save_token_cache():
+    """
+    Persist the shared MSAL token and HTTP caches if they changed since they were loaded.
+
+    Tokens saved by other processes in the meantime are merged in first, so parallel
+    processes with different service principals or scopes do not drop each other's tokens.
+
+    The files are created with owner-only permissions because they contain access tokens.
+    """
+    global _http_cache_snapshot
+    with _save_lock:
+        try:
+            if _cache is not None and _cache.has_state_changed:
+                with file_lock(TOKEN_CACHE_FILE):
+                    _merge_from_disk(_cache)
+                    _write_private(TOKEN_CACHE_FILE, _cache.serialize().encode())
+                _cache.has_state_changed = False
+                logger.debug(f"Saved MSAL token cache to {TOKEN_CACHE_FILE}")
+            if _http_cache:
+                data = pickle.dumps(_http_cache, protocol=4)
+                if data != _http_cache_snapshot:
+                    _write_private(HTTP_CACHE_FILE, data)
+                    _http_cache_snapshot = data
+                    logger.debug(f"Saved MSAL HTTP cache to {HTTP_CACHE_FILE}")
+        except Exception as e:
+            logger.warning(f"Failed to save MSAL token cache: {e}")
+
+
+def clear_token_cache():
+    """Remove the persisted MSAL caches and reset the in-memory copies."""
+    global _cache, _http_cache, _http_cache_snapshot
+    _cache = None
+    _http_cache = None
+    _http_cache_snapshot = None
+    for path in (TOKEN_CACHE_FILE, HTTP_CACHE_FILE):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
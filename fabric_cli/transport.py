@@ -0,0 +1,236 @@
+import copy
+import os
+import threading
+from typing import TYPE_CHECKING, Hashable, Iterable, List, Optional, Union
+from urllib.parse import urlparse
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from . import circuit_breaker, hedging, rate_limit
+from .retry import IDEMPOTENT_METHODS, send_with_retry
+from .singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from .http2 import Http2Client
+
+logger = logging.getLogger(__name__)
+
+# Keep-alive connections kept per host, and number of hosts with a connection pool
+POOL_SIZE = int(os.getenv("FABRIC_HTTP_POOL_SIZE", "10"))
+POOL_HOSTS = int(os.getenv("FABRIC_HTTP_POOL_HOSTS", "10"))
+
+# Seconds to wait for the server to connect or send data
+TIMEOUT = float(os.getenv("FABRIC_HTTP_TIMEOUT", "60"))
+
+# "http1" for a pool of HTTP/1.1 connections per host, or "http2" to multiplex all requests
+# to a host over one connection (needs pip install FabricCLI[http2])
+HTTP_TRANSPORT = os.getenv("FABRIC_HTTP_TRANSPORT", "http1").lower()
+
+# Let identical GETs from concurrent threads share one request, "0" to turn it off
+COALESCE = os.getenv("FABRIC_HTTP_COALESCE", "1") != "0"
+
+# Connect to the hosts of a command while it starts up, "0" to turn it off
+PREWARM = os.getenv("FABRIC_PREWARM", "1") != "0"
+
+# Hosts MSAL gets tokens from; it is handed the requests session, never the HTTP/2 client
+LOGIN_HOSTS = frozenset({"login.microsoftonline.com"})
+
+_session: Optional[requests.Session] = None
+_http2_client: Optional["Http2Client"] = None
+_session_lock = threading.Lock()
+_in_flight = SingleFlight()
+
+
+def get_session() -> requests.Session:
+    """
+    Get the process-wide HTTP session.
+
+    The session keeps a pool of keep-alive connections per host, so consecutive calls to
+    api.fabric.microsoft.com or management.azure.com reuse the TCP and TLS connection.
+
+    Returns:
+        requests.Session: The shared session.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+                logger.debug(f"Created HTTP session with {POOL_SIZE} connections per host")
+    return _session
+
+
+def get_client() -> Union[requests.Session, "Http2Client"]:
+    """
+    Get the client that API requests are sent with.
+
+    Returns:
+        The HTTP/2 client if FABRIC_HTTP_TRANSPORT is ``http2`` and httpx with HTTP/2
+        support is installed, otherwise the shared session.
+    """
+    global _http2_client, HTTP_TRANSPORT
+    if HTTP_TRANSPORT != "http2":
+        return get_session()
+
+    # Imported here, so commands on HTTP/1.1 do not load httpx
+    from . import http2
+
+    if not http2.available():
+        logger.warning("HTTP/2 needs pip install FabricCLI[http2], falling back to HTTP/1.1")
+        HTTP_TRANSPORT = "http1"
+        return get_session()
+
+    if _http2_client is None:
+        with _session_lock:
+            if _http2_client is None:
+                _http2_client = http2.Http2Client(POOL_HOSTS, timeout=TIMEOUT)
+                logger.debug("Created HTTP/2 client")
+    return _http2_client
+
+
+def configure(
+    pool_size: Optional[int] = None,
+    pool_hosts: Optional[int] = None,
+    http_transport: Optional[str] = None,
+):
+    """
+    Change the connection pool size or transport, replacing the current clients.
+
+    Args:
+        pool_size: Keep-alive connections per host, set this to the number of threads.
+        pool_hosts: Number of hosts with a connection pool.
+        http_transport: ``http1`` or ``http2``.
+    """
+    global POOL_SIZE, POOL_HOSTS, HTTP_TRANSPORT
+    POOL_SIZE = pool_size or POOL_SIZE
+    POOL_HOSTS = pool_hosts or POOL_HOSTS
+    HTTP_TRANSPORT = (http_transport or HTTP_TRANSPORT).lower()
+    close()
+
+
+def close():
+    """Close the shared clients and their connections."""
+    global _session, _http2_client
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+        if _http2_client is not None:
+            _http2_client.close()
+            _http2_client = None
+
+
+def _warm(url: str):
+    # Warm the pool the real requests to the host will use
+    client = get_session() if urlparse(url).netloc in LOGIN_HOSTS else get_client()
+    try:
+        # Any answer leaves a connection with DNS, TCP and TLS done in the pool
+        client.request("HEAD", url, timeout=TIMEOUT, allow_redirects=False).close()
+        logger.debug(f"Pre-warmed connection to {url}")
+    except Exception as e:
+        logger.debug(f"Pre-warming {url} failed: {e}")
+
+
+def prewarm(urls: Iterable[str]) -> List[threading.Thread]:
+    """
+    Open connections to hosts in the background, before the first request to them.
+
+    Each URL gets a HEAD request from a daemon thread, without rate limit, retries or
+    authentication. Login hosts are always warmed on the requests session that MSAL
+    uses, other hosts on the client from get_client. Failures are ignored, the real
+    request connects again.
+
+    Args:
+        urls: URLs on the hosts to connect to, such as ``https://api.fabric.microsoft.com/``.
+
+    Returns:
+        The started threads, none if PREWARM is off.
+    """
+    if not PREWARM:
+        return []
+    threads = []
+    for url in urls:
+        thread = threading.Thread(target=_warm, args=(url,), name=f"prewarm {url}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
+
+
+def _coalesce_key(method: str, url: str, kwargs: dict) -> Optional[Hashable]:
+    # Only plain GETs without a body or streaming are the same request for every caller
+    if not COALESCE or method.upper() != "GET" or kwargs.get("stream"):
+        return None
+    if any(kwargs.get(name) is not None for name in ("data", "json", "files")):
+        return None
+    # The headers carry the bearer token, so callers only share responses with themselves
+    headers = tuple(sorted((k.lower(), v) for k, v in (kwargs.get("headers") or {}).items()))
+    params = kwargs.get("params")
+    params = tuple(sorted(params.items())) if isinstance(params, dict) else params
+    try:
+        key = (url, headers, params)
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def request(
+    method: str, url: str, retry_safe: bool = False, hedge: bool = False, **kwargs
+) -> requests.Response:
+    """
+    Send a request through the shared session, or the HTTP/2 client if selected.
+
+    Requests wait for the client-side rate limit of their endpoint family (rate_limit.py).
+    Throttled (429/503) and transient (502/504, connection) failures are retried with
+    backoff for idempotent methods (retry.py). While a host and endpoint family keeps
+    failing, requests to it fail fast with CircuitOpenError (circuit_breaker.py). A GET
+    that is already in flight with the same URL, query and headers (so the same principal)
+    is not sent again; the caller gets a copy of the response of the request in flight.
+
+    Args:
+        method: The HTTP method.
+        url: The URL to request.
+        retry_safe: Also retry a non-idempotent request, for operations that are safe to repeat.
+        hedge: Send an idempotent request a second time when the first one is slower than
+            usual for its endpoint, and use the first answer (hedging.py).
+        **kwargs: Passed on to requests, such as ``headers`` and ``json``.
+
+    Returns:
+        requests.Response: The response.
+    """
+    kwargs.setdefault("timeout", TIMEOUT)
+    client = get_client()
+
+    def send_once() -> requests.Response:
+        # Every attempt, retries included, draws from the shared rate limit budget
+        rate_limit.acquire(url)
+        return client.request(method, url, **kwargs)
+
+    def send() -> requests.Response:
+        return circuit_breaker.call(url, send_once)
+
+    def send_hedged() -> requests.Response:
+        return hedging.hedged(send, url)
+
+    attempt = send_hedged if hedge and method.upper() in IDEMPOTENT_METHODS else send
+    key = _coalesce_key(method, url, kwargs)
+    if key is None:
+        return send_with_retry(attempt, method, url, retry_safe=retry_safe)
+
+    response = _in_flight.do(key, send_with_retry, attempt, method, url, retry_safe=retry_safe)
+    # Callers may set attributes on their response, so each gets its own
+    return copy.copy(response)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    """Send a GET request through the shared session."""
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    """Send a POST request through the shared session."""
+    return request("POST", url, **kwargs)
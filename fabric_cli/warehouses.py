@@ -1,12 +1,17 @@
 import requests
-from typing import List, Tuple
+from . import metadata_cache, operations, transport
+from typing import Iterator, List, Optional
 from .auth import Auth
+from .models import Warehouse
+from .pagination import iter_items
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def create_warehouse(workspace_id: str, display_name: str, auth: Auth) -> str:
+def create_warehouse(
+    workspace_id: str, display_name: str, auth: Auth, wait: bool = True
+) -> Optional[str]:
     """
     Creates a new warehouse in the specified workspace.
 
@@ -14,23 +19,38 @@ def create_warehouse(workspace_id: str, display_name: str, auth: Auth) -> str:
         workspace_id: The ID of the workspace where the warehouse will be created.
         display_name: The display name for the new warehouse.
         auth: Authentication instance for getting headers.
+        wait: Wait for the creation to finish when the service runs it asynchronously.
 
     Returns:
-        str: The ID of the created warehouse.
+        str: The ID of the created warehouse, or None if the creation runs asynchronously
+        and ``wait`` is False.
 
     Raises:
-        requests.exceptions.HTTPError: If the API request fails.
+        requests.exceptions.HTTPError: If the API request or the creation fails.
+        TimeoutError: If the creation does not finish in time.
     """
     url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/warehouses"
     json_payload = {"displayName": display_name}
 
     try:
         logger.debug(f"Creating warehouse with payload: {json_payload}")
-        response = requests.post(url, json=json_payload, headers=auth.get_headers("fabric"))
+        response = transport.post(url, json=json_payload, headers=auth.get_headers("fabric"))
         response.raise_for_status()
-        warehouse_id = response.json()["id"]
-        logger.debug(f"Warehouse created with ID: {warehouse_id}")
-        return warehouse_id
+
+        # 202 Accepted: the warehouse is created by a long-running operation
+        operation = operations.from_response(response, auth, fetch_result=True)
+        if operation:
+            if not wait:
+                logger.debug(f"Not waiting for warehouse creation: {operation.url}")
+                metadata_cache.invalidate("warehouse", auth, workspace_id)
+                return None
+            warehouse = operations.wait(operation)
+        else:
+            warehouse = response.json()
+
+        logger.debug(f"Warehouse created with ID: {warehouse['id']}")
+        metadata_cache.write_through("warehouse", auth, workspace_id, warehouse)
+        return warehouse["id"]
 
     except requests.exceptions.HTTPError as e:
         error_msg = f"Error creating warehouse: {str(e)}"
@@ -40,27 +60,73 @@ def create_warehouse(workspace_id: str, display_name: str, auth: Auth) -> str:
         raise requests.exceptions.HTTPError(error_msg)
 
 
-def get_warehouses(workspace_id: str, auth: Auth) -> List[Tuple[str, str]]:
+def iter_warehouses(
+    workspace_id: str,
+    auth: Auth,
+    prefetch: bool = False,
+    cache: bool = False,
+    max_age: Optional[float] = None,
+    stream: bool = False,
+    hedge: bool = False,
+) -> Iterator[Warehouse]:
     """
-    Fetches the list of warehouse IDs and display names in the specified workspace.
+    Lazily fetches the warehouse IDs and display names in a workspace, page by page.
 
     Args:
         workspace_id: The ID of the workspace.
         auth: Authentication instance for getting headers.
+        prefetch: Fetch the next page while the current one is consumed.
+        cache: Answer from, and revalidate against, the on-disk HTTP cache.
+        max_age: Serve the list from the metadata cache if it was stored at most this many
+            seconds ago; 0 fetches and stores it again, None leaves the metadata cache alone.
+        stream: Decode large responses as they arrive, instead of all at once.
+        hedge: Send a slow list request again and use the first answer, to cut tail latency.
 
-    Returns:
-        List of tuples containing warehouse IDs and display names.
+    Yields:
+        Warehouses, which unpack to warehouse IDs and display names.
 
     Raises:
         requests.exceptions.HTTPError: If the API request fails.
     """
     url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/warehouses"
 
+    warehouses = metadata_cache.cached_items(
+        "warehouse",
+        auth,
+        workspace_id,
+        lambda: iter_items(url, auth, prefetch=prefetch, cache=cache, stream=stream, hedge=hedge),
+        max_age,
+    )
+    for wh in warehouses:
+        yield Warehouse.from_payload(wh)
+
+
+def get_warehouses(
+    workspace_id: str,
+    auth: Auth,
+    cache: bool = False,
+    max_age: Optional[float] = None,
+    hedge: bool = False,
+) -> List[Warehouse]:
+    """
+    Fetches the list of warehouse IDs and display names in the specified workspace.
+
+    Args:
+        workspace_id: The ID of the workspace.
+        auth: Authentication instance for getting headers.
+        cache: Answer from, and revalidate against, the on-disk HTTP cache.
+        max_age: Serve the list from the metadata cache if it was stored at most this many
+            seconds ago; 0 fetches and stores it again, None leaves the metadata cache alone.
+        hedge: Send a slow list request again and use the first answer, to cut tail latency.
+
+    Returns:
+        List of warehouses, which unpack to warehouse IDs and display names.
+
+    Raises:
+        requests.exceptions.HTTPError: If the API request fails.
+    """
     try:
-        response = requests.get(url, headers=auth.get_headers("fabric"))
-        response.raise_for_status()
-        warehouses = response.json().get("value", [])
-        return [(wh["id"], wh["displayName"]) for wh in warehouses]
+        return list(iter_warehouses(workspace_id, auth, cache=cache, max_age=max_age, hedge=hedge))
 
     except requests.exceptions.HTTPError as e:
         error_msg = f"Error fetching warehouses: {str(e)}"
@@ -1,7 +1,10 @@
 import requests
+from . import metadata_cache, operations, transport
 from urllib.parse import urlparse
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Optional
 from .auth import Auth
+from .models import Workspace
+from .pagination import iter_items
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,7 +33,7 @@ def create_workspace(display_name: str, auth: Auth, capacity_id: Optional[str] =
 
     try:
         logger.debug(f"Creating workspace with payload: {json_payload}")
-        response = requests.post(url, json=json_payload, headers=auth.get_headers("fabric"))
+        response = transport.post(url, json=json_payload, headers=auth.get_headers("fabric"))
         response.raise_for_status()
         location_header = response.headers.get("Location")
         if not location_header:
@@ -38,6 +41,7 @@ def create_workspace(display_name: str, auth: Auth, capacity_id: Optional[str] =
 
         workspace_id = urlparse(location_header).path.split("/")[-1]
         logger.debug(f"Workspace created with ID: {workspace_id}")
+        metadata_cache.write_through("workspace", auth, "", {"id": workspace_id, **json_payload})
         return workspace_id
 
     except requests.exceptions.HTTPError as e:
@@ -48,53 +52,70 @@ def create_workspace(display_name: str, auth: Auth, capacity_id: Optional[str] =
         raise requests.exceptions.HTTPError(error_msg)
 
 
-def get_workspaces(auth: Auth) -> List[Tuple[str, str, str]]:
+def iter_workspaces(
+    auth: Auth,
+    prefetch: bool = False,
+    cache: bool = False,
+    max_age: Optional[float] = None,
+    stream: bool = False,
+    hedge: bool = False,
+) -> Iterator[Workspace]:
     """
-    Fetches the list of workspace IDs and display names.
+    Lazily fetches workspace IDs and display names, page by page.
 
     Args:
         auth: Authentication instance for getting headers.
+        prefetch: Fetch the next page while the current one is consumed.
+        cache: Answer from, and revalidate against, the on-disk HTTP cache.
+        max_age: Serve the list from the metadata cache if it was stored at most this many
+            seconds ago; 0 fetches and stores it again, None leaves the metadata cache alone.
+        stream: Decode large responses as they arrive, instead of all at once.
+        hedge: Send a slow list request again and use the first answer, to cut tail latency.
 
-    Returns:
-        List of tuples containing workspace IDs, display names, and capacity IDs.
+    Yields:
+        Workspaces, which unpack to workspace IDs, display names, and capacity IDs.
 
     Raises:
         requests.exceptions.HTTPError: If the API request fails.
     """
     url = "https://api.fabric.microsoft.com/v1/workspaces"
+    logger.info(f"Attempting to fetch workspaces from URL: {url}")
+
+    workspaces = metadata_cache.cached_items(
+        "workspace",
+        auth,
+        "",
+        lambda: iter_items(url, auth, prefetch=prefetch, cache=cache, stream=stream, hedge=hedge),
+        max_age,
+    )
+    for ws in workspaces:
+        workspace = Workspace.from_payload(ws)
+        logger.debug(f"Workspace found: {workspace}")
+        yield workspace
+
+
+def get_workspaces(
+    auth: Auth, cache: bool = False, max_age: Optional[float] = None, hedge: bool = False
+) -> List[Workspace]:
+    """
+    Fetches the list of workspace IDs and display names.
 
-    try:
-        # Log the request details
-        logger.info(f"Attempting to fetch workspaces from URL: {url}")
-
-        # Get and log headers (without exposing full token)
-        headers = auth.get_headers("fabric")
-        masked_headers = {
-            k: (v[:10] + "..." if k == "Authorization" else v) for k, v in headers.items()
-        }
-        logger.debug(f"Request headers: {masked_headers}")
-
-        # Make the API request
-        response = requests.get(url, headers=auth.get_headers("fabric"))
-
-        # Log response status and basic details
-        logger.info(f"Response received. Status Code: {response.status_code}")
-        logger.debug(f"Response Headers: {response.headers}")
-
-        # Raise an exception for bad status codes
-        response.raise_for_status()
-
-        # Parse and log workspace data
-        workspaces = response.json().get("value", [])
-        logger.info(f"Number of workspaces found: {len(workspaces)}")
+    Args:
+        auth: Authentication instance for getting headers.
+        cache: Answer from, and revalidate against, the on-disk HTTP cache.
+        max_age: Serve the list from the metadata cache if it was stored at most this many
+            seconds ago; 0 fetches and stores it again, None leaves the metadata cache alone.
+        hedge: Send a slow list request again and use the first answer, to cut tail latency.
 
-        # Prepare workspace list with detailed logging
-        workspace_list = []
-        for ws in workspaces:
-            workspace_info = (ws["id"], ws["displayName"], ws.get("capacityId"))
-            logger.debug(f"Workspace found: {workspace_info}")
-            workspace_list.append(workspace_info)
+    Returns:
+        List of workspaces, which unpack to workspace IDs, display names, and capacity IDs.
 
+    Raises:
+        requests.exceptions.HTTPError: If the API request fails.
+    """
+    try:
+        workspace_list = list(iter_workspaces(auth, cache=cache, max_age=max_age, hedge=hedge))
+        logger.info(f"Number of workspaces found: {len(workspace_list)}")
         return workspace_list
 
     except requests.exceptions.RequestException as e:
@@ -123,24 +144,30 @@ def get_workspaces(auth: Auth) -> List[Tuple[str, str, str]]:
         raise
 
 
-def provision_workspace_identity(workspace_id: str, auth: "Auth") -> bool:
+def provision_workspace_identity(workspace_id: str, auth: "Auth", wait: bool = True) -> bool:
     """
     Provisions an identity for the specified workspace.
 
     Args:
         workspace_id: The ID of the workspace.
         auth: Authentication instance for getting headers.
+        wait: Wait for the provisioning to finish when the service runs it asynchronously.
 
     Returns:
-        bool: True if the identity was provisioned successfully.
+        bool: True if the identity was provisioned successfully, or provisioning started
+        and ``wait`` is False.
 
     Raises:
-        requests.exceptions.HTTPError: If the API request fails.
+        requests.exceptions.HTTPError: If the API request or the provisioning fails.
+        TimeoutError: If the provisioning does not finish in time.
     """
     url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/provisionIdentity"
     logger.debug(f"Provisioning identity for workspace ID: {workspace_id}")
-    response = requests.post(url, headers=auth.get_headers())
+    response = transport.post(url, headers=auth.get_headers("fabric"))
     response.raise_for_status()
+    operation = operations.from_response(response, auth)
+    if operation and wait:
+        operations.wait(operation)
     logger.debug(f"Identity provisioned for workspace ID: {workspace_id}")
     return True
 
@@ -163,7 +190,10 @@ def assign_workspace_to_capacity(workspace_id: str, capacity_id: str, auth: "Aut
     url = f"https://api.fabric.microsoft.com/v1/workspaces/{workspace_id}/assignToCapacity"
     json_payload = {"capacityId": capacity_id}
     logger.debug(f"Assigning workspace ID {workspace_id} to capacity ID {capacity_id}")
-    response = requests.post(url, json=json_payload, headers=auth.get_headers())
+    # Assigning the same capacity twice has the same outcome
+    response = transport.post(
+        url, json=json_payload, headers=auth.get_headers("fabric"), retry_safe=True
+    )
     response.raise_for_status()
     logger.debug(f"Workspace ID {workspace_id} assigned to capacity ID {capacity_id}")
     return True
@@ -0,0 +1,84 @@
+import socket
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+from fabric_cli import agent
+from fabric_cli.auth import Auth, TokenStore
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "requires Unix domain sockets")
+class TestAgent(unittest.TestCase):
+    """
+    Test cases for the token agent in agent.py.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.socket_path = Path(self.tmp_dir.name) / "agent.sock"
+        self.expiry = datetime.now().replace(microsecond=0) + timedelta(hours=1)
+        self.server = agent._AgentServer(str(self.socket_path), agent._TokenRequestHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp_dir.cleanup()
+
+    def test_request_token_from_agent(self):
+        """
+        Test that the agent hands out the token and expiry it holds.
+        """
+        with patch.object(Auth, "get_access_token", return_value="token") as mock_get, patch.object(
+            Auth, "_token_expiry", return_value=self.expiry
+        ):
+            result = agent.request_token("management", self.socket_path)
+
+        self.assertEqual(result, ("token", self.expiry))
+        mock_get.assert_called_once_with("management")
+
+    def test_request_token_agent_error(self):
+        """
+        Test that an agent failure makes the client fall back.
+        """
+        with patch.object(Auth, "get_access_token", side_effect=ValueError("No SPN")):
+            self.assertIsNone(agent.request_token("fabric", self.socket_path))
+
+    def test_request_token_without_agent(self):
+        """
+        Test that no agent socket means no token.
+        """
+        self.assertIsNone(agent.request_token("fabric", Path(self.tmp_dir.name) / "missing"))
+
+    def test_auth_uses_agent_token(self):
+        """
+        Test that Auth takes tokens from the agent and caches them.
+        """
+        with patch.object(agent, "AGENT_SOCKET", self.socket_path), patch.object(
+            Auth, "_agent_tokens", {}
+        ), patch.object(Auth, "use_agent", True), patch.object(
+            agent, "request_token", return_value=("agent-token", self.expiry)
+        ) as mock_request, patch.object(
+            Auth, "_refresh"
+        ) as mock_refresh, patch.object(
+            Auth, "_state_file", Path(self.tmp_dir.name) / "auth_state.json"
+        ), patch.object(
+            Auth, "_store", TokenStore()
+        ), patch.object(
+            Auth, "_state_stamp", None
+        ), patch.object(
+            Auth, "_instances", {}
+        ):
+            auth = Auth()
+            self.assertEqual(auth.get_access_token("fabric"), "agent-token")
+            self.assertEqual(auth.get_access_token("fabric"), "agent-token")
+
+        mock_request.assert_called_once_with("fabric", profile=auth.profile)
+        mock_refresh.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+import requests
+from fabric_cli.auth import Auth
+from fabric_cli.circuit_breaker import CLOSED, HALF_OPEN, CircuitBreaker
+from fabric_cli.retry import HostCooldown, RetryPolicy
+
+try:
+    import httpx
+    from fabric_cli.aio import AsyncClient
+except ImportError:
+    httpx = None
+
+
+@unittest.skipUnless(httpx, "needs pip install FabricCLI[async]")
+class TestAsyncClient(unittest.IsolatedAsyncioTestCase):
+    """
+    Test cases for the asyncio client in aio.py.
+    """
+
+    def setUp(self):
+        self.auth = MagicMock(spec=Auth)
+        self.auth.get_headers.return_value = {"Authorization": "Bearer token"}
+        self.requests = []
+        self.routes = {}
+
+        for target, value in (
+            ("fabric_cli.aio.retry.cooldown", HostCooldown()),
+            ("fabric_cli.aio.rate_limit.ENABLED", False),
+        ):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def handler(self, request):
+        self.requests.append(request)
+        responses = self.routes[(request.method, str(request.url))]
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    def client(self):
+        return AsyncClient(
+            self.auth,
+            policy=RetryPolicy(backoff_base=0.01),
+            transport=httpx.MockTransport(self.handler),
+        )
+
+    async def test_get_workspaces_follows_continuation(self):
+        """
+        Test that list coroutines follow continuation tokens and return the same tuples.
+        """
+        url = "https://api.fabric.microsoft.com/v1/workspaces"
+        self.routes[("GET", url)] = [
+            httpx.Response(
+                200,
+                json={"value": [{"id": "1", "displayName": "WS 1"}], "continuationToken": "t"},
+            )
+        ]
+        self.routes[("GET", f"{url}?continuationToken=t")] = [
+            httpx.Response(
+                200, json={"value": [{"id": "2", "displayName": "WS 2", "capacityId": "c"}]}
+            )
+        ]
+
+        async with self.client() as client:
+            workspaces = await client.get_workspaces()
+
+        self.assertEqual(workspaces, [("1", "WS 1", None), ("2", "WS 2", "c")])
+        self.assertEqual(self.requests[0].headers["Authorization"], "Bearer token")
+        # The token is fetched once for both pages
+        self.auth.get_headers.assert_called_once_with("fabric")
+
+    async def test_throttled_get_is_retried(self):
+        """
+        Test that a 429 is retried with the shared retry policy.
+        """
+        url = "https://api.fabric.microsoft.com/v1/workspaces/ws-1/lakehouses"
+        self.routes[("GET", url)] = [
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(200, json={"value": [{"id": "lh-1", "displayName": "LH"}]}),
+        ]
+
+        async with self.client() as client:
+            self.assertEqual(await client.get_lakehouses("ws-1"), [("lh-1", "LH")])
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_failed_token_does_not_take_probe(self):
+        """
+        Test that a request failing before it is sent leaves a half-open circuit usable.
+        """
+        url = "https://api.fabric.microsoft.com/v1/capacities"
+        self.routes[("GET", url)] = [httpx.Response(200, json={"value": []})]
+        breaker = CircuitBreaker("test", open_seconds=30)
+        breaker._state = HALF_OPEN
+        self.auth.get_headers.side_effect = [RuntimeError("token"), {"Authorization": "Bearer"}]
+
+        with patch("fabric_cli.aio.circuit_breaker.get_breaker", return_value=breaker):
+            async with self.client() as client:
+                with self.assertRaises(RuntimeError):
+                    await client.get_capacities()
+                self.assertEqual(await client.get_capacities(), [])
+
+        self.assertEqual(breaker.state, CLOSED)
+
+    async def test_error_raises_http_error(self):
+        """
+        Test that errors raise the same exception type as the blocking functions.
+        """
+        url = "https://api.fabric.microsoft.com/v1/workspaces/ws-1/git/connect"
+        self.routes[("POST", url)] = [httpx.Response(400, text="bad request")]
+
+        async with self.client() as client:
+            with self.assertRaisesRegex(requests.exceptions.HTTPError, "bad request") as ctx:
+                await client.connect_git_repository("ws-1", {"repositoryName": "repo"})
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(ctx.exception.response.status_code, 400)
+        self.assertEqual(ctx.exception.response.text, "bad request")
+
+    async def test_timeout_raises_timeout(self):
+        """
+        Test that a timed out request raises requests' Timeout after the retries.
+        """
+
+        def handler(request):
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        client = AsyncClient(
+            self.auth,
+            policy=RetryPolicy(max_attempts=2, backoff_base=0.01),
+            transport=httpx.MockTransport(handler),
+        )
+        async with client:
+            with self.assertRaises(requests.exceptions.Timeout):
+                await client.get_capacities()
+
+    @patch("fabric_cli.operations.DEFAULT_INTERVAL", 0)
+    @patch("fabric_cli.operations.MIN_INTERVAL", 0)
+    async def test_create_warehouse_waits_for_operation(self):
+        """
+        Test that an accepted creation is polled to its result.
+        """
+        operation_url = "https://api.fabric.microsoft.com/v1/operations/op-1"
+        self.routes[("POST", "https://api.fabric.microsoft.com/v1/workspaces/ws-1/warehouses")] = [
+            httpx.Response(202, headers={"Location": operation_url, "Retry-After": "0"})
+        ]
+        self.routes[("GET", operation_url)] = [
+            httpx.Response(200, json={"status": "Running"}, headers={"Retry-After": "0"}),
+            httpx.Response(200, json={"status": "Succeeded"}),
+        ]
+        self.routes[("GET", f"{operation_url}/result")] = [httpx.Response(200, json={"id": "wh-1"})]
+
+        async with self.client() as client:
+            self.assertEqual(await client.create_warehouse("ws-1", "WH"), "wh-1")
+        self.assertEqual(json.loads(self.requests[0].content), {"displayName": "WH"})
+
+    async def test_concurrent_calls_share_token_fetch(self):
+        """
+        Test that concurrent coroutines fetch the token only once.
+        """
+        self.routes[("GET", "https://api.fabric.microsoft.com/v1/capacities")] = [
+            httpx.Response(200, json={"value": []})
+        ]
+
+        async with self.client() as client:
+            await asyncio.gather(*(client.get_capacities() for _ in range(20)))
+        self.auth.get_headers.assert_called_once_with("fabric")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from fabric_cli.apply import Task, apply_spec, build_tasks, run_tasks
+from fabric_cli.auth import Auth
+from fabric_cli.plan import Snapshot
+from fabric_cli.spec import GitSpec, Spec, WorkspaceSpec
+
+
+class TestRunTasks(unittest.TestCase):
+    """
+    Test cases for the dependency graph executor in apply.py.
+    """
+
+    def test_independent_tasks_run_in_parallel(self):
+        """
+        Test that tasks without dependencies between them run at the same time.
+        """
+        barrier = threading.Barrier(3, timeout=5)
+        tasks = [Task(str(i), f"task {i}", lambda results: barrier.wait()) for i in range(3)]
+
+        result = run_tasks(tasks, max_workers=3)
+
+        self.assertTrue(result.ok)
+        self.assertEqual(set(result.results), {"0", "1", "2"})
+
+    def test_dependencies_run_first_and_pass_results(self):
+        """
+        Test that a task starts after its dependencies and can read their results.
+        """
+        order = []
+
+        def slow(results):
+            time.sleep(0.1)
+            order.append("slow")
+            return "ws-1"
+
+        def child(results):
+            order.append("child")
+            return f"{results['slow']}/child"
+
+        tasks = [
+            Task("child", "child", child, ["slow", "fast"]),
+            Task("slow", "slow", slow),
+            Task("fast", "fast", lambda results: order.append("fast")),
+        ]
+
+        result = run_tasks(tasks, max_workers=4)
+
+        self.assertEqual(order[-1], "child")
+        self.assertEqual(result.results["child"], "ws-1/child")
+
+    def test_failure_skips_dependents_only(self):
+        """
+        Test that tasks depending on a failed task are skipped, and others still run.
+        """
+        error = RuntimeError("boom")
+
+        def fail(results):
+            raise error
+
+        done = []
+        tasks = [
+            Task("a", "a", fail),
+            Task("b", "b", lambda results: "b", ["a"]),
+            Task("c", "c", lambda results: "c", ["b"]),
+            Task("d", "d", lambda results: "d"),
+        ]
+
+        result = run_tasks(tasks, on_done=lambda task, value, e: done.append((task.key, e)))
+
+        self.assertFalse(result.ok)
+        self.assertEqual(result.errors, {"a": error})
+        self.assertEqual(sorted(result.skipped), ["b", "c"])
+        self.assertEqual(result.results, {"d": "d"})
+        self.assertEqual(sorted(done, key=lambda d: d[0]), [("a", error), ("d", None)])
+
+    def test_invalid_graphs(self):
+        """
+        Test that cycles, unknown dependencies and duplicate keys raise a ValueError.
+        """
+        action = MagicMock()
+        cases = {
+            "each other": [Task("a", "a", action, ["b"]), Task("b", "b", action, ["a"])],
+            "unknown": [Task("a", "a", action, ["missing"])],
+            "unique": [Task("a", "a", action), Task("a", "a", action)],
+        }
+        for message, tasks in cases.items():
+            with self.subTest(message):
+                with self.assertRaisesRegex(ValueError, message):
+                    run_tasks(tasks)
+        action.assert_not_called()
+
+
+class TestApplySpec(unittest.TestCase):
+    """
+    Test cases for turning a spec into API calls in apply.py.
+    """
+
+    def setUp(self):
+        self.auth = MagicMock(spec=Auth)
+        self.git = GitSpec("contoso", "data", "GitHub", "sales", "main", "/fabric")
+        self.spec = Spec(
+            [
+                WorkspaceSpec(
+                    "sales",
+                    capacity_id="cap-1",
+                    provision_identity=True,
+                    lakehouses=["raw"],
+                    warehouses=["reporting"],
+                    git=self.git,
+                ),
+                WorkspaceSpec("sandbox", lakehouses=["scratch"]),
+            ]
+        )
+
+    def test_build_tasks_dependencies(self):
+        """
+        Test that items only wait for their workspace, which is created on its capacity.
+        """
+        tasks = {task.key: task for task in build_tasks(self.spec, self.auth)}
+
+        self.assertEqual(list(tasks["workspace:sales"].depends_on), [])
+        self.assertNotIn("capacity:sales", tasks)
+        for key in [
+            "identity:sales",
+            "lakehouse:sales/raw",
+            "warehouse:sales/reporting",
+            "git:sales",
+        ]:
+            self.assertEqual(list(tasks[key].depends_on), ["workspace:sales"], key)
+        self.assertEqual(list(tasks["lakehouse:sandbox/scratch"].depends_on), ["workspace:sandbox"])
+        self.assertNotIn("capacity:sandbox", tasks)
+
+    @patch("fabric_cli.apply.connect_git_repository")
+    @patch("fabric_cli.apply.create_warehouse")
+    @patch("fabric_cli.apply.create_lakehouse")
+    @patch("fabric_cli.apply.provision_workspace_identity")
+    @patch("fabric_cli.apply.assign_workspace_to_capacity")
+    @patch("fabric_cli.apply.create_workspace")
+    def test_apply_spec(
+        self,
+        mock_create_workspace,
+        mock_assign,
+        mock_identity,
+        mock_create_lakehouse,
+        mock_create_warehouse,
+        mock_connect_git,
+    ):
+        """
+        Test that applying a spec calls the API functions with the created workspace IDs.
+        """
+        mock_create_workspace.side_effect = lambda name, auth, capacity_id: f"id-{name}"
+        mock_create_lakehouse.side_effect = lambda ws_id, name, auth: f"{ws_id}/{name}"
+
+        result = apply_spec(self.spec, self.auth, max_workers=4, snapshot=Snapshot())
+
+        self.assertTrue(result.ok)
+        self.assertEqual(mock_create_workspace.call_count, 2)
+        mock_create_workspace.assert_any_call("sales", self.auth, "cap-1")
+        mock_assign.assert_not_called()
+        mock_identity.assert_called_once_with("id-sales", self.auth)
+        mock_create_warehouse.assert_called_once_with("id-sales", "reporting", self.auth)
+        mock_connect_git.assert_called_once_with("id-sales", self.git.provider_details, self.auth)
+        self.assertEqual(result.results["lakehouse:sandbox/scratch"], "id-sandbox/scratch")
+        self.assertEqual(result.results["lakehouse:sales/raw"], "id-sales/raw")
+
+
+if __name__ == "__main__":
+    unittest.main()
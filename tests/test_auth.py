@@ -1 +1,369 @@
-# TODO
+import base64
+import json
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+from fabric_cli.auth import (
+    DEFAULT_CREDENTIALS,
+    Auth,
+    AuthState,
+    TokenStore,
+    FabricClient,
+    SPNConfig,
+    acquire_tokens,
+    get_msal_app,
+    token_expiry,
+)
+
+
+def make_jwt(expires_on: datetime) -> str:
+    """Build an unsigned JWT with the given expiry."""
+    claims = json.dumps({"exp": int(expires_on.timestamp())}).encode()
+    payload = base64.urlsafe_b64encode(claims).decode().rstrip("=")
+    return f"header.{payload}.signature"
+
+
+class TestAuth(unittest.TestCase):
+    """
+    Test cases for the token lifetime handling in auth.py.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.patches = [
+            patch.object(Auth, "_store", TokenStore()),
+            patch.object(Auth, "_instances", {}),
+            patch.object(Auth, "_state_file", Path(self.tmp_dir.name) / "auth_state.json"),
+            patch.object(Auth, "_state_stamp", None),
+            patch.object(Auth, "_credentials", {}),
+            patch.object(Auth, "use_agent", False),
+            patch("fabric_cli.auth._msal_apps", {}),
+        ]
+        for p in self.patches:
+            p.start()
+        self.auth = Auth()
+
+    def tearDown(self):
+        self.auth.stop_background_refresh()
+        for p in self.patches:
+            p.stop()
+        self.tmp_dir.cleanup()
+
+    def test_token_expiry_from_jwt(self):
+        """
+        Test that the expiry is read from the exp claim of a JWT.
+        """
+        expires_on = datetime.now().replace(microsecond=0) + timedelta(minutes=42)
+        self.assertEqual(token_expiry(make_jwt(expires_on)), expires_on)
+
+    def test_token_expiry_defaults_for_opaque_token(self):
+        """
+        Test that a token without an exp claim gets the default lifetime.
+        """
+        expiry = token_expiry("not-a-jwt")
+        self.assertAlmostEqual(
+            (expiry - datetime.now()).total_seconds(), timedelta(hours=1).total_seconds(), delta=5
+        )
+
+    def test_set_token_uses_real_expiry(self):
+        """
+        Test that a manually set token keeps the expiry of the token.
+        """
+        expires_on = datetime.now().replace(microsecond=0) + timedelta(minutes=10)
+        self.auth.set_token(make_jwt(expires_on), "fabric")
+        self.assertEqual(self.auth.get_state().fabric_token_expiry, expires_on)
+
+    @patch("msal.ConfidentialClientApplication")
+    def test_fabric_client_tracks_expires_in(self, mock_app):
+        """
+        Test that the MSAL expires_in value is used as token lifetime.
+        """
+        mock_app.return_value.acquire_token_for_client.return_value = {
+            "access_token": "token",
+            "expires_in": 600,
+        }
+        client = FabricClient(SPNConfig("client", "secret", "tenant"), "scope")
+        client.get_token()
+        self.assertAlmostEqual((client.expires_on - datetime.now()).total_seconds(), 600, delta=5)
+
+    @patch("msal.ConfidentialClientApplication")
+    def test_msal_app_is_shared_per_client(self, mock_app):
+        """
+        Test that one MSAL application is built per tenant and client.
+        """
+        config = SPNConfig("client", "secret", "tenant")
+        self.assertIs(get_msal_app(config), get_msal_app(config))
+        get_msal_app(SPNConfig("client", "secret", "other-tenant"))
+        self.assertEqual(mock_app.call_count, 2)
+
+    @patch("msal.ConfidentialClientApplication")
+    def test_acquire_tokens_for_multiple_scopes(self, mock_app):
+        """
+        Test that tokens for several scopes come from one shared application.
+        """
+        mock_app.return_value.acquire_token_for_client.side_effect = lambda scopes: {
+            "access_token": f"token-{scopes[0]}",
+            "expires_in": 3600,
+        }
+        clients = acquire_tokens(SPNConfig("client", "secret", "tenant"), ["fabric", "management"])
+
+        self.assertEqual(clients["fabric"].get_token(), "token-fabric")
+        self.assertEqual(clients["management"].get_token(), "token-management")
+        mock_app.assert_called_once()
+
+    @patch("msal.ConfidentialClientApplication")
+    def test_acquire_tokens_raises_on_failure(self, mock_app):
+        """
+        Test that a failed acquisition for any scope is raised.
+        """
+        mock_app.return_value.acquire_token_for_client.side_effect = lambda scopes: (
+            {"error_description": "denied"}
+            if scopes[0] == "management"
+            else {"access_token": "token", "expires_in": 3600}
+        )
+        with self.assertRaises(ValueError):
+            acquire_tokens(SPNConfig("client", "secret", "tenant"), ["fabric", "management"])
+
+    @patch("fabric_cli.auth.build_credential")
+    def test_default_credential_remembers_successful_link(self, mock_build):
+        """
+        Test that the credential that succeeded in the chain is used directly next time.
+        """
+        from azure.identity import CredentialUnavailableError
+
+        unavailable = MagicMock()
+        unavailable.get_token.side_effect = CredentialUnavailableError("no environment")
+        cli = MagicMock()
+        cli.get_token.return_value = MagicMock(token="cli-token", expires_on=2e9)
+        mock_build.side_effect = lambda name: {
+            "EnvironmentCredential": unavailable,
+            "AzureCliCredential": cli,
+        }.get(name)
+
+        with patch.dict(Auth._credentials, clear=True):
+            self.auth.authenticate_with_default_credential("scope")
+            self.assertEqual(self.auth.get_state().default_credential, "AzureCliCredential")
+            self.auth.authenticate_with_default_credential("scope")
+
+        # The chain is built once; the second call only asks the remembered credential
+        self.assertEqual(mock_build.call_count, len(DEFAULT_CREDENTIALS))
+        unavailable.get_token.assert_called_once()
+        self.assertEqual(cli.get_token.call_count, 2)
+        self.assertEqual(self.auth.get_state().fabric_token, "cli-token")
+
+    @patch("fabric_cli.auth.build_credential")
+    def test_default_credential_forgets_failing_link(self, mock_build):
+        """
+        Test that a failing remembered credential falls back to the full chain, and is
+        forgotten on disk even when the chain fails too.
+        """
+        failing = MagicMock()
+        failing.get_token.side_effect = ValueError("az not logged in")
+        mock_build.return_value = failing
+        self.auth.get_state().default_credential = "AzureCliCredential"
+        self.auth._save_state()
+
+        with patch.dict(Auth._credentials, {"AzureCliCredential": failing}):
+            with self.assertRaises(Exception):
+                self.auth.authenticate_with_default_credential("scope")
+
+        # Read back what is on disk
+        Auth._store = TokenStore()
+        Auth._state_stamp = None
+        Auth._load_state()
+        self.assertIsNone(self.auth.get_state().default_credential)
+
+    def test_profiles_are_isolated(self):
+        """
+        Test that each profile keeps its own tokens and survives a reload.
+        """
+        expiry = datetime.now().replace(microsecond=0) + timedelta(hours=1)
+        Auth("tenant-a").set_token("token-a", "fabric", expiry)
+        Auth("tenant-b").set_token("token-b", "fabric", expiry)
+
+        # Simulate a new process
+        with patch.object(Auth, "_store", TokenStore()), patch.object(
+            Auth, "_state_stamp", None
+        ), patch.object(Auth, "_instances", {}):
+            self.assertEqual(Auth("tenant-a").get_access_token("fabric"), "token-a")
+            self.assertEqual(Auth("tenant-b").get_access_token("fabric"), "token-b")
+            self.assertEqual(Auth.list_profiles(), ["tenant-a", "tenant-b"])
+
+    def test_default_profile_selects_instance(self):
+        """
+        Test that Auth() returns the instance of the active profile.
+        """
+        with patch.object(Auth, "default_profile", "tenant-a"):
+            self.assertIs(Auth(), Auth("tenant-a"))
+        self.assertIsNot(Auth("tenant-a"), Auth("tenant-b"))
+
+    def test_save_state_keeps_profiles_written_by_other_processes(self):
+        """
+        Test that saving one profile does not drop a profile another process added.
+        """
+        expiry = datetime.now() + timedelta(hours=1)
+        self.auth.set_token("token", "fabric", expiry)
+        other = TokenStore()
+        other.put("other", AuthState(fabric_token="other-token", fabric_token_expiry=expiry))
+        Auth._state_file.write_text(json.dumps(other.to_dict()))
+
+        self.auth.set_token("new-token", "fabric", expiry)
+
+        saved = json.loads(Auth._state_file.read_text())["profiles"]
+        self.assertEqual(saved["other"]["fabric_token"], "other-token")
+        self.assertEqual(saved["default"]["fabric_token"], "new-token")
+
+    def test_token_store_evicts_least_recently_used(self):
+        """
+        Test that a full token store evicts the least recently used profile.
+        """
+        store = TokenStore(max_profiles=2)
+        store.put("a", AuthState())
+        store.put("b", AuthState())
+        store.get("a")
+        store.put("c", AuthState())
+        self.assertEqual(store.names(), ["a", "c"])
+
+    def test_looking_up_profile_does_not_create_it(self):
+        """
+        Test that reading an unknown profile neither stores nor saves it.
+        """
+        self.auth.set_token("token", "fabric", datetime.now() + timedelta(hours=1))
+        self.assertIsNone(Auth._store.get("typo"))
+        self.assertIsNone(Auth("typo").get_state().fabric_token)
+        Auth("typo").get_state()
+
+        self.assertEqual(Auth.list_profiles(), ["default"])
+        with open(Auth._state_file) as f:
+            self.assertEqual(list(json.load(f)["profiles"]), ["default"])
+
+    def test_get_access_token_refreshes_ahead_of_expiry(self):
+        """
+        Test that a token inside the refresh-ahead window is refreshed.
+        """
+        self.auth.set_token("old", "fabric", datetime.now() + timedelta(seconds=30))
+        with patch.object(Auth, "_refresh") as mock_refresh:
+            self.auth.get_access_token("fabric")
+        mock_refresh.assert_called_once_with("fabric")
+
+    def test_get_access_token_keeps_token_when_early_refresh_fails(self):
+        """
+        Test that a failed early refresh still returns the valid token.
+        """
+        self.auth.set_token("old", "fabric", datetime.now() + timedelta(seconds=30))
+        with patch.object(Auth, "_refresh", side_effect=ValueError("AAD down")):
+            self.assertEqual(self.auth.get_access_token("fabric"), "old")
+
+    def test_get_access_token_does_not_block_with_background_refresher(self):
+        """
+        Test that a running background refresher takes over early refreshes.
+        """
+        self.auth.set_token("old", "fabric", datetime.now() + timedelta(seconds=30))
+        with patch.object(Auth, "_refresh") as mock_refresh, patch.object(
+            Auth, "is_background_refresh_running", return_value=True
+        ):
+            self.assertEqual(self.auth.get_access_token("fabric"), "old")
+        mock_refresh.assert_not_called()
+
+    def test_load_state_skips_unchanged_file(self):
+        """
+        Test that an unchanged state file is not parsed again.
+        """
+        self.auth.set_token("token", "fabric", datetime.now() + timedelta(hours=1))
+        with patch("fabric_cli.auth.json.load") as mock_load:
+            Auth._load_state()
+            Auth._load_state()
+        mock_load.assert_not_called()
+
+    def test_get_access_token_picks_up_refresh_by_other_process(self):
+        """
+        Test that a token refreshed by another process is used without refreshing again.
+        """
+        self.auth.set_token("old", "fabric", datetime.now() - timedelta(minutes=1))
+        expiry = (datetime.now() + timedelta(hours=1)).isoformat()
+        # Another process replaces the state file
+        new_file = Auth._state_file.with_name("new.json")
+        new_file.write_text(json.dumps({"fabric_token": "new", "fabric_token_expiry": expiry}))
+        new_file.replace(Auth._state_file)
+
+        with patch.object(Auth, "_refresh") as mock_refresh:
+            self.assertEqual(self.auth.get_access_token("fabric"), "new")
+        mock_refresh.assert_not_called()
+
+    def test_save_state_leaves_no_temporary_files(self):
+        """
+        Test that the state file is replaced atomically.
+        """
+        self.auth.set_token("token", "fabric", datetime.now() + timedelta(hours=1))
+        names = sorted(p.name for p in Auth._state_file.parent.iterdir())
+        self.assertEqual(names, ["auth_state.json", "auth_state.json.lock"])
+
+    def test_concurrent_refreshes_are_single_flight(self):
+        """
+        Test that threads asking for an expired token trigger a single refresh.
+        """
+        calls = []
+
+        def refresh(provider):
+            calls.append(provider)
+            time.sleep(0.2)
+            self.auth.set_token("new", provider, datetime.now() + timedelta(hours=1))
+
+        tokens = []
+        with patch.object(Auth, "_refresh", side_effect=refresh):
+            threads = [
+                threading.Thread(target=lambda: tokens.append(self.auth.get_access_token("fabric")))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(calls, ["fabric"])
+        self.assertEqual(tokens, ["new"] * 8)
+
+    def test_get_headers_cached_until_token_changes(self):
+        """
+        Test that headers are an immutable mapping reused while the token is unchanged.
+        """
+        expiry = datetime.now() + timedelta(hours=1)
+        self.auth.set_token("first", "fabric", expiry)
+        headers = self.auth.get_headers("fabric")
+
+        self.assertIs(self.auth.get_headers("fabric"), headers)
+        with self.assertRaises(TypeError):
+            headers["Authorization"] = "changed"
+
+        self.auth.set_token("second", "fabric", expiry)
+        self.assertEqual(self.auth.get_headers("fabric")["Authorization"], "Bearer second")
+
+    def test_background_refresher_refreshes_expiring_tokens(self):
+        """
+        Test that the background refresher refreshes tokens in the window.
+        """
+        self.auth.set_token("old", "fabric", datetime.now() + timedelta(seconds=30))
+        refreshed = MagicMock()
+
+        def refresh(provider):
+            self.auth.set_token("new", provider, datetime.now() + timedelta(hours=1))
+            refreshed(provider)
+
+        with patch.object(Auth, "_refresh", side_effect=refresh):
+            self.auth.start_background_refresh(interval=0.01)
+            for _ in range(200):
+                if refreshed.called:
+                    break
+                self.auth._refresher_stop.wait(0.01)
+            self.auth.stop_background_refresh()
+
+        refreshed.assert_called_with("fabric")
+        self.assertEqual(self.auth.get_state().fabric_token, "new")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+from unittest.mock import patch
+import requests
+from fabric_cli import circuit_breaker, transport
+from fabric_cli.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+URL = "https://api.fabric.microsoft.com/v1/workspaces"
+
+
+def make_response(status_code):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b"{}"
+    return response
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    Test cases for the per-host circuit breaker in circuit_breaker.py.
+    """
+
+    def setUp(self):
+        circuit_breaker.reset()
+        self.addCleanup(circuit_breaker.reset)
+        self.breaker = CircuitBreaker("test", error_rate=0.5, min_requests=4, open_seconds=30)
+
+    def test_opens_at_error_rate(self):
+        """
+        Test that the circuit opens once enough requests failed, and then fails fast.
+        """
+        for ok in (True, False, True):
+            self.breaker.record(ok)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+        self.breaker.record(False)
+        self.assertEqual(self.breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.allow()
+        self.assertGreater(self.breaker.report()["retry_in"], 0)
+
+    def test_half_open_probe(self):
+        """
+        Test that one probe is let through after the open time, and closes the circuit.
+        """
+        for _ in range(4):
+            self.breaker.record(False)
+
+        with patch("fabric_cli.circuit_breaker.time.monotonic") as mock_monotonic:
+            mock_monotonic.return_value = self.breaker._opened_at + 31
+            self.assertEqual(self.breaker.state, HALF_OPEN)
+
+            self.breaker.allow()
+            with self.assertRaises(CircuitOpenError):
+                self.breaker.allow()
+
+            self.breaker.record(False)
+            self.assertEqual(self.breaker.state, OPEN)
+
+            mock_monotonic.return_value += 31
+            self.breaker.allow()
+            self.breaker.record(True)
+            self.assertEqual(self.breaker.state, CLOSED)
+            self.breaker.allow()
+
+    @patch("fabric_cli.circuit_breaker.get_breaker")
+    def test_unexpected_error_reports_probe(self, mock_get_breaker):
+        """
+        Test that a probe failing with any error is recorded, so the next probe can go.
+        """
+        self.breaker._state = HALF_OPEN
+        mock_get_breaker.return_value = self.breaker
+
+        def send():
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            circuit_breaker.call(URL, send)
+        self.assertEqual(self.breaker.state, OPEN)
+
+    @patch("fabric_cli.rate_limit.ENABLED", False)
+    @patch("fabric_cli.circuit_breaker.MIN_REQUESTS", 2)
+    @patch("requests.Session.request")
+    def test_transport_fails_fast(self, mock_request):
+        """
+        Test that the transport stops sending requests to a failing host and family.
+        """
+        mock_request.return_value = make_response(500)
+        transport.post(URL, json={})
+        transport.post(URL, json={})
+
+        with self.assertRaises(CircuitOpenError):
+            transport.get(URL)
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(
+            circuit_breaker.states()["api.fabric.microsoft.com (workspaces)"]["state"], OPEN
+        )
+
+        # Other endpoint families of the host are not affected
+        mock_request.return_value = make_response(200)
+        transport.get("https://api.fabric.microsoft.com/v1/capacities")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 import requests
 from unittest.mock import patch, MagicMock
-from fabric_cli.git import connect_git_repository
+from fabric_cli.git import connect_git_repository, get_git_connection
 from fabric_cli.auth import Auth
 
 
@@ -10,7 +10,7 @@ class TestGit(unittest.TestCase):
     Test cases for the connect_git_repository function in git.py.
     """
 
-    @patch("fabric_cli.git.requests.post")
+    @patch("fabric_cli.git.transport.post")
     def test_connect_git_repository_success(self, mock_post):
         """
         Test the successful connection of a workspace to a Git repository.
@@ -44,7 +44,7 @@ class TestGit(unittest.TestCase):
             headers={"Authorization": "Bearer token"},
         )
 
-    @patch("fabric_cli.git.requests.post")
+    @patch("fabric_cli.git.transport.post")
     def test_connect_git_repository_failure(self, mock_post):
         """
         Test the failure case where the API request raises an HTTPError.
@@ -78,6 +78,33 @@ class TestGit(unittest.TestCase):
             headers={"Authorization": "Bearer token"},
         )
 
+    @patch("fabric_cli.git.transport.get")
+    def test_get_git_connection(self, mock_get):
+        """
+        Test that the Git connection of a workspace is returned as decoded JSON.
+        """
+        mock_get.return_value.json.return_value = {"gitConnectionState": "NotConnected"}
+        mock_auth = MagicMock(spec=Auth)
+        mock_auth.get_headers.return_value = {"Authorization": "Bearer token"}
+
+        connection = get_git_connection("workspace-id", mock_auth)
+
+        self.assertEqual(connection, {"gitConnectionState": "NotConnected"})
+        mock_get.assert_called_once_with(
+            "https://api.fabric.microsoft.com/v1/workspaces/workspace-id/git/connection",
+            headers={"Authorization": "Bearer token"},
+        )
+
+    @patch("fabric_cli.git.transport.get")
+    def test_get_git_connection_failure(self, mock_get):
+        """
+        Test that a failed request raises an HTTPError.
+        """
+        mock_get.return_value.raise_for_status.side_effect = requests.exceptions.HTTPError("Error")
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            get_git_connection("workspace-id", MagicMock(spec=Auth))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,107 @@
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from fabric_cli import hedging, transport
+from fabric_cli.hedging import LatencyTracker, endpoint, hedged
+
+URL = (
+    "https://api.fabric.microsoft.com/v1/workspaces/0b9f2a4e-1c3d-4e5f-8a6b-7c8d9e0f1a2b/lakehouses"
+)
+
+
+class TestHedging(unittest.TestCase):
+    """
+    Test cases for hedged requests in hedging.py.
+    """
+
+    def setUp(self):
+        patcher = patch.object(hedging, "tracker", LatencyTracker())
+        self.tracker = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_endpoint_groups_ids(self):
+        """
+        Test that requests for different workspaces share an endpoint.
+        """
+        self.assertEqual(
+            endpoint(URL + "?continuationToken=abc"),
+            "api.fabric.microsoft.com/v1/workspaces/{id}/lakehouses",
+        )
+
+    def test_delay_from_percentile(self):
+        """
+        Test that the delay is the default until there are enough samples.
+        """
+        key = endpoint(URL)
+        self.assertEqual(self.tracker.delay(key), hedging.DEFAULT_DELAY)
+        for i in range(100):
+            self.tracker.record(key, (i + 1) / 100)
+        self.assertAlmostEqual(self.tracker.delay(key), 0.95, delta=0.01)
+
+    @patch("fabric_cli.hedging.DEFAULT_DELAY", 0.05)
+    def test_slow_request_is_hedged(self):
+        """
+        Test that a second request is sent when the first is slow, and the first to
+        answer wins while the other response is closed.
+        """
+        release = threading.Event()
+        slow, fast = MagicMock(name="slow"), MagicMock(name="fast")
+        responses = iter([slow, fast])
+        calls = []
+
+        def send():
+            response = next(responses)
+            calls.append(response)
+            if response is slow:
+                release.wait(5)
+            return response
+
+        self.assertIs(hedged(send, URL), fast)
+        release.set()
+        for _ in range(100):
+            if slow.close.called:
+                break
+            time.sleep(0.01)
+        slow.close.assert_called_once()
+        self.assertEqual(len(calls), 2)
+
+    def test_fast_request_is_not_hedged(self):
+        """
+        Test that a request answering within the threshold is sent once.
+        """
+        send = MagicMock(return_value="response")
+        self.assertEqual(hedged(send, URL), "response")
+        send.assert_called_once()
+        self.assertEqual(len(self.tracker._latencies[endpoint(URL)]), 1)
+
+    @patch("fabric_cli.hedging.DEFAULT_DELAY", 0.01)
+    def test_failure_waits_for_other_request(self):
+        """
+        Test that an error is only raised when both requests failed.
+        """
+        send = MagicMock(side_effect=[ConnectionError("first"), ConnectionError("second")])
+        with self.assertRaises(ConnectionError):
+            hedged(send, URL)
+
+    @patch("fabric_cli.rate_limit.ENABLED", False)
+    @patch("fabric_cli.transport.hedging.hedged")
+    @patch("requests.Session.request")
+    def test_transport_hedges_only_when_asked(self, mock_request, mock_hedged):
+        """
+        Test that only idempotent requests with hedge=True are hedged.
+        """
+        mock_request.return_value.status_code = 200
+        mock_hedged.side_effect = lambda send, url: send()
+
+        transport.get(URL)
+        transport.post(URL, json={}, hedge=True)
+        mock_hedged.assert_not_called()
+
+        transport.get(URL, hedge=True)
+        mock_hedged.assert_called_once()
+        self.assertEqual(mock_request.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from unittest.mock import patch
+import requests
+from fabric_cli import http2, transport
+from fabric_cli.http2 import Http2Client
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+@unittest.skipUnless(http2.available(), "needs pip install FabricCLI[http2]")
+class TestHttp2(unittest.TestCase):
+    """
+    Test cases for the HTTP/2 transport in http2.py.
+    """
+
+    def tearDown(self):
+        transport.close()
+
+    def test_http2_not_loaded_by_default(self):
+        """
+        Test that the HTTP/1.1 transport does not need httpx.
+        """
+        with patch.object(transport, "HTTP_TRANSPORT", "http1"):
+            self.assertIs(transport.get_client(), transport.get_session())
+
+    def make_client(self, handler):
+        return Http2Client(10, timeout=5, transport=httpx.MockTransport(handler))
+
+    def test_response_converted_to_requests(self):
+        """
+        Test that responses behave like requests responses, including raise_for_status.
+        """
+        sent = []
+
+        def handler(request):
+            sent.append(request)
+            return httpx.Response(404, json={"errorCode": "NotFound"}, headers={"x-ms-id": "1"})
+
+        client = self.make_client(handler)
+        response = client.request(
+            "POST",
+            "https://api.fabric.microsoft.com/v1/workspaces",
+            json={"displayName": "WS"},
+            headers={"Authorization": "Bearer token"},
+            timeout=5,
+        )
+
+        self.assertIsInstance(response, requests.Response)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {"errorCode": "NotFound"})
+        self.assertEqual(response.headers["X-MS-ID"], "1")
+        self.assertEqual(sent[0].content, b'{"displayName":"WS"}')
+        with self.assertRaises(requests.exceptions.HTTPError):
+            response.raise_for_status()
+
+    def test_connection_errors_converted(self):
+        """
+        Test that connection failures raise requests exceptions, so retries still apply.
+        """
+
+        def handler(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.make_client(handler).request("GET", "https://api.fabric.microsoft.com/v1")
+
+    @patch.object(transport, "HTTP_TRANSPORT", "http2")
+    def test_transport_selects_http2(self):
+        """
+        Test that FABRIC_HTTP_TRANSPORT=http2 sends requests through the HTTP/2 client.
+        """
+        self.assertIsInstance(transport.get_client(), Http2Client)
+
+    @patch.object(transport, "HTTP_TRANSPORT", "http2")
+    @patch("fabric_cli.http2.available", return_value=False)
+    def test_transport_falls_back_without_httpx(self, mock_available):
+        """
+        Test that the session is used when HTTP/2 support is not installed.
+        """
+        self.assertIs(transport.get_client(), transport.get_session())
+        self.assertEqual(transport.HTTP_TRANSPORT, "http1")
+
+
+if __name__ == "__main__":
+    unittest.main()
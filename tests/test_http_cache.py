@@ -0,0 +1,122 @@
+import base64
+import json
+import tempfile
+import time
+import unittest
+from email.utils import formatdate
+from pathlib import Path
+from unittest.mock import patch
+import requests
+from fabric_cli.http_cache import HttpCache, freshness, principal
+
+URL = "https://api.fabric.microsoft.com/v1/workspaces"
+
+
+def make_token(tid, oid):
+    payload = base64.urlsafe_b64encode(json.dumps({"tid": tid, "oid": oid}).encode())
+    return f"header.{payload.decode().rstrip('=')}.signature"
+
+
+def make_response(status_code=200, body=b"", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body
+    response.headers.update(headers or {})
+    return response
+
+
+class TestHttpCache(unittest.TestCase):
+    """
+    Test cases for the conditional GET cache in http_cache.py.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache = HttpCache(Path(self.tmp_dir.name))
+        self.headers = {"Authorization": f"Bearer {make_token('tenant', 'user-a')}"}
+
+    def test_principal_from_token(self):
+        """
+        Test that cache entries are keyed by tenant and object ID of the token.
+        """
+        self.assertEqual(principal(self.headers), "tenant:user-a")
+        self.assertNotEqual(
+            principal({"Authorization": "Bearer a"}), principal({"Authorization": "Bearer b"})
+        )
+
+    def test_freshness(self):
+        """
+        Test max-age, the Last-Modified heuristic and the default TTL.
+        """
+        now = time.time()
+        self.assertEqual(freshness({"Cache-Control": "private, max-age=30"}, now), 30)
+        self.assertEqual(freshness({"Cache-Control": "no-cache"}, now), 0)
+        self.assertAlmostEqual(
+            freshness({"Last-Modified": formatdate(now - 1000, usegmt=True)}, now), 100, delta=1
+        )
+        with patch("fabric_cli.http_cache.DEFAULT_TTL", 7):
+            self.assertEqual(freshness({}, now), 7)
+
+    @patch("fabric_cli.http_cache.transport.get")
+    def test_fresh_entry_served_without_request(self, mock_get):
+        """
+        Test that a fresh response is answered from disk.
+        """
+        mock_get.return_value = make_response(
+            body=b'{"value": []}', headers={"Cache-Control": "max-age=60"}
+        )
+        self.cache.get(URL, self.headers)
+        response = self.cache.get(URL, self.headers)
+
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.json(), {"value": []})
+        mock_get.assert_called_once()
+
+    @patch("fabric_cli.http_cache.transport.get")
+    def test_stale_entry_revalidated(self, mock_get):
+        """
+        Test that a stale response is revalidated with its ETag and reused on 304.
+        """
+        mock_get.side_effect = [
+            make_response(
+                body=b'{"value": [1]}', headers={"ETag": '"v1"', "Cache-Control": "no-cache"}
+            ),
+            make_response(304, headers={"ETag": '"v1"'}),
+        ]
+        self.cache.get(URL, self.headers)
+        response = self.cache.get(URL, self.headers)
+
+        self.assertEqual(response.json(), {"value": [1]})
+        self.assertEqual(mock_get.call_args.kwargs["headers"]["If-None-Match"], '"v1"')
+
+    @patch("fabric_cli.http_cache.transport.get")
+    def test_entries_are_per_principal(self, mock_get):
+        """
+        Test that another user never gets a response cached for someone else.
+        """
+        mock_get.return_value = make_response(body=b"{}", headers={"Cache-Control": "max-age=60"})
+        self.cache.get(URL, self.headers)
+        self.cache.get(URL, {"Authorization": f"Bearer {make_token('tenant', 'user-b')}"})
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch("fabric_cli.http_cache.transport.get")
+    def test_lru_eviction(self, mock_get):
+        """
+        Test that the least recently used entries are evicted when the cache is full.
+        """
+        mock_get.return_value = make_response(body=b"x" * 400)
+        cache = HttpCache(Path(self.tmp_dir.name), max_size=1500)
+        for i in range(5):
+            cache.get(f"{URL}/{i}", self.headers)
+            time.sleep(0.01)
+
+        self.assertLessEqual(
+            sum(p.stat().st_size for p in Path(self.tmp_dir.name).glob("*.json")), 1500
+        )
+        self.assertFalse(cache._path(f"{URL}/0", self.headers).exists())
+        self.assertTrue(cache._path(f"{URL}/4", self.headers).exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
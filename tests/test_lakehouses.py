@@ -1,4 +1,6 @@
+import tempfile
 import unittest
+from pathlib import Path
 import requests
 from unittest.mock import patch, MagicMock
 from fabric_cli.lakehouses import create_lakehouse, get_lakehouses
@@ -10,7 +12,17 @@ class TestLakehouses(unittest.TestCase):
     Test cases for the lakehouse functions in lakehouses.py.
     """
 
-    @patch("fabric_cli.lakehouses.requests.post")
+    def setUp(self):
+        # Keep the metadata cache write-through away from the user's home directory
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        patcher = patch(
+            "fabric_cli.metadata_cache.METADATA_CACHE_FILE", Path(tmp_dir.name) / "metadata.db"
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("fabric_cli.lakehouses.transport.post")
     def test_create_lakehouse_success(self, mock_post):
         """
         Test the successful creation of a lakehouse.
@@ -36,7 +48,7 @@ class TestLakehouses(unittest.TestCase):
             headers={"Authorization": "Bearer token"},
         )
 
-    @patch("fabric_cli.lakehouses.requests.post")
+    @patch("fabric_cli.lakehouses.transport.post")
     def test_create_lakehouse_failure(self, mock_post):
         """
         Test the failure case where the API request raises an HTTPError.
@@ -60,7 +72,7 @@ class TestLakehouses(unittest.TestCase):
             headers={"Authorization": "Bearer token"},
         )
 
-    @patch("fabric_cli.lakehouses.requests.get")
+    @patch("fabric_cli.lakehouses.transport.get")
     def test_get_lakehouses_success(self, mock_get):
         """
         Test the successful retrieval of lakehouses.
@@ -90,7 +102,7 @@ class TestLakehouses(unittest.TestCase):
             headers={"Authorization": "Bearer token"},
         )
 
-    @patch("fabric_cli.lakehouses.requests.get")
+    @patch("fabric_cli.lakehouses.transport.get")
     def test_get_lakehouses_failure(self, mock_get):
         """
         Test the failure case where the API request raises an HTTPError.
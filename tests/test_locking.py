@@ -0,0 +1,94 @@
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from fabric_cli.locking import atomic_write, file_lock, file_stamp
+
+
+class TestLocking(unittest.TestCase):
+    """
+    Test cases for the file helpers in locking.py.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / "state.json"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_atomic_write_replaces_content(self):
+        """
+        Test that atomic_write replaces the file and changes its stamp.
+        """
+        atomic_write(self.path, b"first")
+        first_stamp = file_stamp(self.path)
+        atomic_write(self.path, b"second!")
+
+        self.assertEqual(self.path.read_bytes(), b"second!")
+        self.assertNotEqual(file_stamp(self.path), first_stamp)
+
+    def test_file_stamp_missing_file(self):
+        """
+        Test that a missing file has no stamp.
+        """
+        self.assertIsNone(file_stamp(self.path))
+
+    def test_file_lock_is_reentrant(self):
+        """
+        Test that nested locks in one thread do not deadlock.
+        """
+        with file_lock(self.path):
+            with file_lock(self.path):
+                atomic_write(self.path, b"data")
+        self.assertEqual(self.path.read_bytes(), b"data")
+
+    def test_file_lock_excludes_threads(self):
+        """
+        Test that a second thread waits for the lock.
+        """
+        events = []
+
+        def worker():
+            with file_lock(self.path):
+                events.append("worker")
+
+        with file_lock(self.path):
+            thread = threading.Thread(target=worker)
+            thread.start()
+            time.sleep(0.1)
+            events.append("main")
+        thread.join()
+
+        self.assertEqual(events, ["main", "worker"])
+
+    def test_file_lock_excludes_processes(self):
+        """
+        Test that another process cannot take the lock while it is held.
+        """
+        script = (
+            "import sys, time; from pathlib import Path; from fabric_cli.locking import file_lock\n"
+            "print('ready', flush=True)\n"
+            "with file_lock(Path(sys.argv[1])):\n"
+            "    print(time.time(), flush=True)\n"
+        )
+        with file_lock(self.path):
+            process = subprocess.Popen(
+                [sys.executable, "-c", script, str(self.path)],
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            # Release only once the child is about to take the lock
+            self.assertEqual(process.stdout.readline().strip(), "ready")
+            time.sleep(0.2)
+            released = time.time()
+        locked = float(process.communicate(timeout=30)[0])
+
+        self.assertGreaterEqual(locked, released)
+
+
+if __name__ == "__main__":
+    unittest.main()
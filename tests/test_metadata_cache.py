@@ -0,0 +1,115 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+from fabric_cli.auth import Auth
+from fabric_cli.metadata_cache import MetadataCache, cached_items, ttl, write_through
+from fabric_cli.workspaces import create_workspace, get_workspaces
+
+WORKSPACES = [
+    {"id": "ws-1", "displayName": "One", "capacityId": "cap-1"},
+    {"id": "ws-2", "displayName": "Two"},
+]
+
+
+class TestMetadataCache(unittest.TestCase):
+    """
+    Test cases for the SQLite metadata cache in metadata_cache.py.
+    """
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = Path(tmp_dir.name) / "metadata.db"
+        patcher = patch("fabric_cli.metadata_cache.METADATA_CACHE_FILE", self.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.auth = MagicMock(spec=Auth)
+        self.auth.profile = "default"
+        self.auth.get_headers.return_value = {"Authorization": "Bearer token"}
+
+    def test_list_round_trip_and_expiry(self):
+        """
+        Test that a stored list is served until it is older than the allowed age.
+        """
+        cache = MetadataCache(self.path)
+        cache.put_list("default", "workspace", "", WORKSPACES)
+
+        self.assertEqual(cache.get_list("default", "workspace", "", 60), WORKSPACES)
+        self.assertIsNone(cache.get_list("other", "workspace", "", 60))
+        with patch("fabric_cli.metadata_cache.time.time", return_value=time.time() + 120):
+            self.assertIsNone(cache.get_list("default", "workspace", "", 60))
+
+    def test_cached_items_fetches_once(self):
+        """
+        Test that a list is fetched on the first lookup and served from SQLite afterwards.
+        """
+        fetch = MagicMock(side_effect=lambda: iter(WORKSPACES))
+
+        self.assertEqual(list(cached_items("workspace", self.auth, "", fetch, 60)), WORKSPACES)
+        self.assertEqual(list(cached_items("workspace", self.auth, "", fetch, 60)), WORKSPACES)
+        self.assertEqual(fetch.call_count, 1)
+
+        # max_age 0 is --refresh
+        list(cached_items("workspace", self.auth, "", fetch, 0))
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_lists_kept_per_principal(self):
+        """
+        Test that signing in as someone else on the same profile does not serve their lists.
+        """
+        fetch = MagicMock(side_effect=lambda: iter(WORKSPACES))
+        list(cached_items("workspace", self.auth, "", fetch, 60))
+
+        self.auth.get_headers.return_value = {"Authorization": "Bearer other-token"}
+        list(cached_items("workspace", self.auth, "", fetch, 60))
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_partial_list_not_stored(self):
+        """
+        Test that a list that was not read to the end is not served later.
+        """
+        fetch = MagicMock(side_effect=lambda: iter(WORKSPACES))
+        next(cached_items("workspace", self.auth, "", fetch, 60))
+        list(cached_items("workspace", self.auth, "", fetch, 60))
+        self.assertEqual(fetch.call_count, 2)
+
+    def test_no_max_age_bypasses_cache(self):
+        """
+        Test that library calls without max_age do not create the database.
+        """
+        list(cached_items("workspace", self.auth, "", lambda: iter(WORKSPACES)))
+        write_through("workspace", self.auth, "", WORKSPACES[0])
+        self.assertFalse(self.path.exists())
+
+    def test_ttl_override(self):
+        """
+        Test that the TTL of an entity kind can be set from the environment.
+        """
+        with patch.dict("os.environ", {"FABRIC_CACHE_TTL_LAKEHOUSE": "5"}):
+            self.assertEqual(ttl("lakehouse"), 5)
+        self.assertEqual(ttl("workspace"), 3600)
+
+    @patch("fabric_cli.workspaces.transport.post")
+    @patch("fabric_cli.pagination.transport.get")
+    def test_create_writes_through(self, mock_get, mock_post):
+        """
+        Test that a created workspace shows up in the stored list without a refetch.
+        """
+        mock_get.return_value.json.return_value = {"value": WORKSPACES}
+        get_workspaces(self.auth, max_age=60)
+
+        mock_post.return_value.headers = {
+            "Location": "https://api.fabric.microsoft.com/v1/workspaces/ws-3"
+        }
+        create_workspace("Three", self.auth)
+
+        workspaces = get_workspaces(self.auth, max_age=60)
+        self.assertIn(("ws-3", "Three", None), workspaces)
+        mock_get.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import pickle
+import unittest
+from fabric_cli.models import Capacity, Lakehouse, Workspace
+
+PAYLOAD = {
+    "id": "ws-1",
+    "displayName": "Sales",
+    "capacityId": "cap-1",
+    "description": "Sales data",
+    "type": "Workspace",
+}
+
+
+class TestModels(unittest.TestCase):
+    """
+    Test cases for the resource models in models.py.
+    """
+
+    def test_tuple_compatible(self):
+        """
+        Test that models unpack, index and compare like the tuples they replace.
+        """
+        workspace = Workspace.from_payload(PAYLOAD)
+        workspace_id, display_name, capacity_id = workspace
+
+        self.assertEqual((workspace_id, display_name, capacity_id), ("ws-1", "Sales", "cap-1"))
+        self.assertEqual(workspace, ("ws-1", "Sales", "cap-1"))
+        self.assertEqual(workspace[1], "Sales")
+        self.assertEqual(len(workspace), 3)
+        self.assertEqual(Lakehouse.from_payload({"id": "lh", "displayName": "Raw"}), ("lh", "Raw"))
+        self.assertIn(("ws-1", "Sales", "cap-1"), {workspace})
+
+    def test_payload_decoded_lazily(self):
+        """
+        Test that members without an attribute are kept as JSON until they are read.
+        """
+        workspace = Workspace.from_payload(PAYLOAD)
+
+        self.assertIsNone(workspace._payload)
+        self.assertEqual(workspace.get("capacityId"), "cap-1")
+        self.assertIsNone(workspace._payload)
+        self.assertEqual(workspace.get("description"), "Sales data")
+        self.assertEqual(workspace.payload, PAYLOAD)
+        self.assertEqual(workspace.get("missing", "default"), "default")
+
+    def test_slots(self):
+        """
+        Test that models do not carry a per-instance __dict__.
+        """
+        capacity = Capacity.from_payload({"id": "c", "displayName": "F2", "sku": "F2"})
+        self.assertFalse(hasattr(capacity, "__dict__"))
+        self.assertEqual(capacity.sku, "F2")
+
+    def test_pickle(self):
+        """
+        Test that models survive pickling, for process pools.
+        """
+        workspace = pickle.loads(pickle.dumps(Workspace.from_payload(PAYLOAD)))
+        self.assertEqual(workspace.payload, PAYLOAD)
+
+
+if __name__ == "__main__":
+    unittest.main()
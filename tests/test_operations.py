@@ -0,0 +1,144 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import requests
+from fabric_cli import operations
+from fabric_cli.auth import Auth
+from fabric_cli.operations import Operation, from_response, wait, wait_all
+
+OPERATION_URL = "https://api.fabric.microsoft.com/v1/operations/op-1"
+
+
+def make_response(status_code=200, body=None, headers=None):
+    response = MagicMock(spec=requests.Response)
+    response.status_code = status_code
+    response.headers = headers or {}
+    response.content = b"{}" if body is not None else b""
+    response.json.return_value = body
+    return response
+
+
+class TestOperations(unittest.TestCase):
+    """
+    Test cases for the long-running operation poller in operations.py.
+    """
+
+    def setUp(self):
+        self.auth = MagicMock(spec=Auth)
+        self.auth.get_headers.return_value = {"Authorization": "Bearer token"}
+        patcher = patch("fabric_cli.operations.time.sleep")
+        self.mock_sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_from_response(self):
+        """
+        Test that the status URL and first interval are read from the 202 headers.
+        """
+        response = make_response(
+            202, headers={"Location": OPERATION_URL, "Retry-After": "5", "x-ms-operation-id": "x"}
+        )
+        operation = from_response(response, self.auth)
+        self.assertEqual(operation.url, OPERATION_URL)
+        self.assertEqual(operation.interval, 5.0)
+        self.assertEqual(operation.provider, "fabric")
+
+        response = make_response(202, headers={"x-ms-operation-id": "op-2"})
+        self.assertEqual(
+            from_response(response, self.auth).url,
+            "https://api.fabric.microsoft.com/v1/operations/op-2",
+        )
+        self.assertIsNone(from_response(make_response(201), self.auth))
+
+    def test_arm_operation_uses_management_token(self):
+        """
+        Test that Azure Resource Manager operations are polled with the management token.
+        """
+        url = "https://management.azure.com/subscriptions/sub/providers/ops/1"
+        response = make_response(202, headers={"Azure-AsyncOperation": url, "Location": "other"})
+        operation = from_response(response, self.auth)
+        self.assertEqual(operation.url, url)
+        self.assertEqual(operation.provider, "management")
+
+    @patch("fabric_cli.operations.transport.get")
+    def test_wait_fetches_result(self, mock_get):
+        """
+        Test that a succeeded Fabric operation returns its result.
+        """
+        mock_get.side_effect = [
+            make_response(body={"status": "Running"}, headers={"Retry-After": "1"}),
+            make_response(
+                body={"status": "Succeeded"}, headers={"Location": f"{OPERATION_URL}/result"}
+            ),
+            make_response(body={"id": "lh-1"}),
+        ]
+
+        result = wait(Operation(OPERATION_URL, self.auth, fetch_result=True))
+
+        self.assertEqual(result, {"id": "lh-1"})
+        mock_get.assert_called_with(
+            f"{OPERATION_URL}/result", headers={"Authorization": "Bearer token"}
+        )
+
+    @patch("fabric_cli.operations.transport.get")
+    def test_interval_grows_without_retry_after(self, mock_get):
+        """
+        Test that the poll interval backs off when the service gives no hint.
+        """
+        mock_get.return_value = make_response(body={"status": "Running"})
+        operation = Operation(OPERATION_URL, self.auth, interval=2.0)
+        operation.poll()
+        operation.poll()
+        self.assertAlmostEqual(operation.interval, 2.0 * operations.BACKOFF_FACTOR**2)
+
+    @patch("fabric_cli.operations.transport.get")
+    def test_retry_after_zero_is_clamped(self, mock_get):
+        """
+        Test that Retry-After: 0 does not make wait poll in a tight loop.
+        """
+        mock_get.return_value = make_response(
+            body={"status": "Running"}, headers={"Retry-After": "0"}
+        )
+        operation = Operation(OPERATION_URL, self.auth, interval=2.0)
+        operation.poll()
+        self.assertEqual(operation.interval, operations.MIN_INTERVAL)
+
+    @patch("fabric_cli.operations.transport.get")
+    def test_failed_operation_raises(self, mock_get):
+        """
+        Test that a failed operation raises an HTTPError with the service message.
+        """
+        mock_get.return_value = make_response(
+            body={"status": "Failed", "error": {"message": "Name already in use"}}
+        )
+        with self.assertRaisesRegex(requests.exceptions.HTTPError, "Name already in use"):
+            wait(Operation(OPERATION_URL, self.auth))
+
+    @patch("fabric_cli.operations.transport.get")
+    def test_timeout(self, mock_get):
+        """
+        Test that waiting stops at the operation timeout.
+        """
+        mock_get.return_value = make_response(body={"status": "Running"})
+        with self.assertRaises(TimeoutError):
+            wait(Operation(OPERATION_URL, self.auth, interval=1.0, timeout=0.5))
+
+    @patch("fabric_cli.operations.transport.get")
+    def test_wait_all_polls_in_due_order(self, mock_get):
+        """
+        Test that many operations are waited for in one loop, soonest due first.
+        """
+        polled = []
+
+        def get(url, headers):
+            polled.append(url)
+            return make_response(body={"status": "Succeeded"})
+
+        mock_get.side_effect = get
+        slow = Operation("https://api.fabric.microsoft.com/v1/operations/slow", self.auth, 10)
+        fast = Operation("https://api.fabric.microsoft.com/v1/operations/fast", self.auth, 1)
+
+        self.assertEqual(wait_all([slow, fast]), [None, None])
+        self.assertEqual(polled, [fast.url, slow.url])
+
+
+if __name__ == "__main__":
+    unittest.main()
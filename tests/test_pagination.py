@@ -0,0 +1,103 @@
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+from fabric_cli.auth import Auth
+from fabric_cli.pagination import iter_items, iter_pages, next_page_url
+
+
+def make_response(body):
+    response = MagicMock()
+    response.raise_for_status.return_value = None
+    response.json.return_value = body
+    return response
+
+
+class TestPagination(unittest.TestCase):
+    """
+    Test cases for the continuation token paginator in pagination.py.
+    """
+
+    def setUp(self):
+        self.auth = MagicMock(spec=Auth)
+        self.auth.get_headers.return_value = {"Authorization": "Bearer token"}
+
+    def test_next_page_url_prefers_continuation_uri(self):
+        """
+        Test that continuationUri is followed as is.
+        """
+        body = {"continuationUri": "https://next", "continuationToken": "abc"}
+        self.assertEqual(next_page_url("https://first", body), "https://next")
+
+    def test_next_page_url_from_continuation_token(self):
+        """
+        Test that a continuationToken replaces the one of the current page.
+        """
+        url = "https://api.fabric.microsoft.com/v1/workspaces?roles=Admin&continuationToken=old"
+        self.assertEqual(
+            next_page_url(url, {"continuationToken": "new"}),
+            "https://api.fabric.microsoft.com/v1/workspaces?roles=Admin&continuationToken=new",
+        )
+
+    def test_next_page_url_last_page(self):
+        """
+        Test that a page without continuation is the last page.
+        """
+        self.assertIsNone(next_page_url("https://first", {"value": []}))
+
+    @patch("fabric_cli.pagination.transport.get")
+    def test_iter_items_follows_pages(self, mock_get):
+        """
+        Test that items of all pages are yielded in order.
+        """
+        mock_get.side_effect = [
+            make_response({"value": [{"id": "1"}], "continuationToken": "t1"}),
+            make_response({"value": [{"id": "2"}], "continuationUri": "https://page3"}),
+            make_response({"value": [{"id": "3"}]}),
+        ]
+
+        items = list(iter_items("https://first", self.auth))
+
+        self.assertEqual([item["id"] for item in items], ["1", "2", "3"])
+        self.assertEqual(
+            [c.args[0] for c in mock_get.call_args_list],
+            ["https://first", "https://first?continuationToken=t1", "https://page3"],
+        )
+
+    @patch("fabric_cli.pagination.transport.get")
+    def test_iter_pages_is_lazy(self, mock_get):
+        """
+        Test that the next page is only fetched when it is needed.
+        """
+        mock_get.side_effect = [
+            make_response({"value": [{"id": "1"}], "continuationToken": "t1"}),
+            make_response({"value": [{"id": "2"}]}),
+        ]
+
+        pages = iter_pages("https://first", self.auth)
+        next(pages)
+
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch("fabric_cli.pagination.transport.get")
+    def test_iter_pages_prefetches_next_page(self, mock_get):
+        """
+        Test that with prefetch the next page is requested before the current one is used.
+        """
+        second_requested = threading.Event()
+
+        def get(url, headers):
+            if url != "https://first":
+                second_requested.set()
+                return make_response({"value": [{"id": "2"}]})
+            return make_response({"value": [{"id": "1"}], "continuationToken": "t1"})
+
+        mock_get.side_effect = get
+
+        pages = iter_pages("https://first", self.auth, prefetch=True)
+        self.assertEqual(next(pages), [{"id": "1"}])
+        self.assertTrue(second_requested.wait(5))
+        self.assertEqual(next(pages), [{"id": "2"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from fabric_cli.apply import apply_spec, build_tasks
+from fabric_cli.auth import Auth
+from fabric_cli.models import Capacity, Lakehouse, Warehouse, Workspace
+from fabric_cli.plan import Snapshot, conflicts, take_snapshot
+from fabric_cli.spec import GitSpec, Spec, WorkspaceSpec
+
+GIT = GitSpec("contoso", "data", "GitHub", "sales", "main", "/fabric")
+
+
+class TestPlan(unittest.TestCase):
+    """
+    Test cases for comparing a spec against live state in plan.py.
+    """
+
+    def setUp(self):
+        self.auth = MagicMock(spec=Auth)
+        self.spec = Spec(
+            [
+                WorkspaceSpec(
+                    "sales",
+                    capacity_id="CAP-1",
+                    lakehouses=["raw", "curated"],
+                    warehouses=["reporting"],
+                    git=GIT,
+                ),
+                WorkspaceSpec("new", provision_identity=True, lakehouses=["scratch"]),
+                WorkspaceSpec("plain"),
+            ]
+        )
+
+    @patch("fabric_cli.plan.get_git_connection")
+    @patch("fabric_cli.plan.get_warehouses")
+    @patch("fabric_cli.plan.get_lakehouses")
+    @patch("fabric_cli.plan.get_capacities")
+    @patch("fabric_cli.plan.get_workspaces")
+    def test_take_snapshot_reads_only_touched_scopes(
+        self, mock_workspaces, mock_capacities, mock_lakehouses, mock_warehouses, mock_git
+    ):
+        """
+        Test that items and Git are only read for existing workspaces of the spec.
+        """
+        mock_workspaces.return_value = [
+            Workspace("ws-1", "sales", "cap-1"),
+            Workspace("ws-2", "plain"),
+            Workspace("ws-3", "other"),
+        ]
+        mock_capacities.return_value = [Capacity("cap-1", "Capacity")]
+        mock_lakehouses.return_value = [Lakehouse("lh-1", "raw")]
+        mock_warehouses.return_value = [Warehouse("wh-1", "reporting")]
+        mock_git.return_value = {"gitConnectionState": "NotConnected"}
+
+        snapshot = take_snapshot(self.spec, self.auth)
+
+        self.assertEqual(set(snapshot.workspaces), {"sales", "plain", "other"})
+        self.assertEqual(set(snapshot.capacities), {"cap-1"})
+        mock_lakehouses.assert_called_once_with("ws-1", self.auth)
+        mock_warehouses.assert_called_once_with("ws-1", self.auth)
+        mock_git.assert_called_once_with("ws-1", self.auth)
+        self.assertEqual(snapshot.lakehouses, {"ws-1": {"raw"}})
+        self.assertEqual(snapshot.warehouses, {"ws-1": {"reporting"}})
+        self.assertFalse(snapshot.git_connected("ws-1"))
+
+    @patch("fabric_cli.plan.get_capacities")
+    @patch("fabric_cli.plan.get_workspaces")
+    def test_take_snapshot_skips_capacities(self, mock_workspaces, mock_capacities):
+        """
+        Test that capacities are not listed when the spec assigns none.
+        """
+        mock_workspaces.return_value = []
+
+        snapshot = take_snapshot(Spec([WorkspaceSpec("plain")]), self.auth)
+
+        mock_capacities.assert_not_called()
+        self.assertIsNone(snapshot.capacities)
+
+    def test_build_tasks_with_snapshot(self):
+        """
+        Test that the plan only has the steps the live state lacks.
+        """
+        snapshot = Snapshot(
+            workspaces={"sales": Workspace("ws-1", "sales", "cap-1")},
+            lakehouses={"ws-1": {"raw"}},
+            warehouses={"ws-1": {"reporting"}},
+            git={"ws-1": {"gitConnectionState": "NotConnected"}},
+        )
+
+        tasks = {task.key: task for task in build_tasks(self.spec, self.auth, snapshot)}
+
+        self.assertEqual(
+            set(tasks),
+            {
+                "lakehouse:sales/curated",
+                "git:sales",
+                "workspace:new",
+                "identity:new",
+                "lakehouse:new/scratch",
+                "workspace:plain",
+            },
+        )
+        # The existing workspace is on its capacity, so its steps need nothing else
+        self.assertEqual(list(tasks["lakehouse:sales/curated"].depends_on), [])
+
+    def test_build_tasks_assigns_moved_workspace(self):
+        """
+        Test that an existing workspace on another capacity gets assigned before its items.
+        """
+        snapshot = Snapshot(workspaces={"sales": Workspace("ws-1", "sales", "cap-2")})
+        spec = Spec([WorkspaceSpec("sales", capacity_id="cap-1", lakehouses=["raw"])])
+
+        tasks = {task.key: task for task in build_tasks(spec, self.auth, snapshot)}
+
+        self.assertEqual(set(tasks), {"capacity:sales", "lakehouse:sales/raw"})
+        self.assertEqual(list(tasks["capacity:sales"].depends_on), [])
+        self.assertEqual(list(tasks["lakehouse:sales/raw"].depends_on), ["capacity:sales"])
+
+    def test_conflicts(self):
+        """
+        Test that unknown capacities and other Git connections are reported.
+        """
+        other = {**GIT.provider_details, "branchName": "dev"}
+        snapshot = Snapshot(
+            workspaces={"sales": Workspace("ws-1", "sales", "cap-1")},
+            capacities={},
+            git={"ws-1": {"gitConnectionState": "Connected", "gitProviderDetails": other}},
+        )
+
+        messages = conflicts(self.spec, snapshot)
+
+        self.assertEqual(len(messages), 2)
+        self.assertIn("CAP-1", messages[0])
+        self.assertIn("branchName", messages[1])
+        tasks = [task.key for task in build_tasks(self.spec, self.auth, snapshot)]
+        self.assertNotIn("git:sales", tasks)
+
+    @patch("fabric_cli.apply.create_lakehouse")
+    @patch("fabric_cli.apply.take_snapshot")
+    def test_apply_spec_reuses_snapshot(self, mock_take_snapshot, mock_create_lakehouse):
+        """
+        Test that apply uses the snapshot it is given and creates in existing workspaces.
+        """
+        snapshot = Snapshot(workspaces={"plain": Workspace("ws-2", "plain")})
+        spec = Spec([WorkspaceSpec("plain", lakehouses=["raw"])])
+
+        result = apply_spec(spec, self.auth, snapshot=snapshot)
+
+        self.assertTrue(result.ok)
+        mock_take_snapshot.assert_not_called()
+        mock_create_lakehouse.assert_called_once_with("ws-2", "raw", self.auth)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import tempfile
+import unittest
+from multiprocessing import Process
+from pathlib import Path
+from unittest.mock import patch
+from fabric_cli import rate_limit
+from fabric_cli.rate_limit import TokenBucket, endpoint_family
+
+
+def take_tokens(path, count):
+    bucket = TokenBucket(path, rate=0.001, burst=10)
+    for _ in range(count):
+        bucket.reserve()
+
+
+class TestRateLimit(unittest.TestCase):
+    """
+    Test cases for the client-side rate limiter in rate_limit.py.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = Path(self.tmp.name) / "workspaces.json"
+
+    def test_endpoint_family(self):
+        """
+        Test that URLs are grouped into the families the service throttles by.
+        """
+        base = "https://api.fabric.microsoft.com/v1"
+        self.assertEqual(endpoint_family(f"{base}/workspaces"), "workspaces")
+        self.assertEqual(endpoint_family(f"{base}/workspaces/ws-1/assignToCapacity"), "workspaces")
+        self.assertEqual(endpoint_family(f"{base}/workspaces/ws-1/lakehouses"), "items")
+        self.assertEqual(endpoint_family(f"{base}/admin/workspaces"), "admin")
+        self.assertEqual(endpoint_family(f"{base}/capacities"), "default")
+        self.assertEqual(
+            endpoint_family("https://management.azure.com/subscriptions/sub/resourceGroups/rg"),
+            "arm",
+        )
+
+    @patch("fabric_cli.rate_limit.time.sleep")
+    def test_bucket_allows_burst_then_waits(self, mock_sleep):
+        """
+        Test that the burst is free and later requests wait for the refill rate.
+        """
+        bucket = TokenBucket(self.path, rate=2.0, burst=3)
+        waits = [bucket.acquire() for _ in range(5)]
+
+        self.assertEqual(waits[:3], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(waits[3], 0.5, delta=0.05)
+        self.assertAlmostEqual(waits[4], 1.0, delta=0.05)
+
+    @patch("fabric_cli.locking.os.fsync")
+    def test_reserve_does_not_flush_to_disk(self, mock_fsync):
+        """
+        Test that taking a token does not cost a disk flush.
+        """
+        bucket = TokenBucket(self.path, rate=2.0, burst=3)
+        bucket.reserve()
+        bucket.reserve()
+
+        mock_fsync.assert_not_called()
+        self.assertLess(bucket.reserve(), 0.1)
+
+    def test_bucket_shared_across_processes(self):
+        """
+        Test that processes using the same state file share one budget.
+        """
+        workers = [Process(target=take_tokens, args=(self.path, 5)) for _ in range(2)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        bucket = TokenBucket(self.path, rate=0.001, burst=10)
+        self.assertGreater(bucket.reserve(), 0.0)
+
+    @patch("fabric_cli.rate_limit.ENABLED", False)
+    @patch("fabric_cli.rate_limit.get_bucket")
+    def test_disabled(self, mock_get_bucket):
+        """
+        Test that FABRIC_RATE_LIMIT=0 turns the limiter off.
+        """
+        rate_limit.acquire("https://api.fabric.microsoft.com/v1/workspaces")
+        mock_get_bucket.assert_not_called()
+
+    @patch.dict("os.environ", {"FABRIC_RATE_LIMIT_ARM": "1.5:4"})
+    def test_limit_override(self):
+        """
+        Test that a family limit can be overridden from the environment.
+        """
+        self.assertEqual(rate_limit._limit("arm"), (1.5, 4.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import threading
+import time
+import unittest
+from email.utils import formatdate
+from unittest.mock import MagicMock, patch
+import requests
+from fabric_cli import retry
+from fabric_cli.retry import HostCooldown, RetryPolicy, parse_retry_after, send_with_retry
+
+URL = "https://api.fabric.microsoft.com/v1/workspaces"
+
+
+def make_response(status_code, headers=None):
+    response = MagicMock(spec=requests.Response)
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+class TestRetry(unittest.TestCase):
+    """
+    Test cases for the retry engine in retry.py.
+    """
+
+    def setUp(self):
+        patcher = patch.object(retry, "cooldown", HostCooldown())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parse_retry_after(self):
+        """
+        Test that Retry-After is read as seconds or as an HTTP date.
+        """
+        self.assertEqual(parse_retry_after("7"), 7.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertAlmostEqual(parse_retry_after(formatdate(time.time() + 30)), 30, delta=2)
+
+    def test_backoff_is_bounded(self):
+        """
+        Test that the jittered backoff stays below the exponential bound.
+        """
+        policy = RetryPolicy(backoff_base=1.0, backoff_max=5.0)
+        for attempt in range(1, 10):
+            self.assertLessEqual(policy.delay(attempt), min(5.0, 2 ** (attempt - 1)))
+
+    @patch("fabric_cli.retry.time.sleep")
+    def test_get_retried_after_retry_after(self, mock_sleep):
+        """
+        Test that a throttled GET waits for Retry-After and is sent again.
+        """
+        send = MagicMock(side_effect=[make_response(429, {"Retry-After": "3"}), make_response(200)])
+
+        response = send_with_retry(send, "GET", URL)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(send.call_count, 2)
+        mock_sleep.assert_any_call(3.0)
+
+    @patch("fabric_cli.retry.time.sleep")
+    def test_post_not_retried_unless_safe(self, mock_sleep):
+        """
+        Test that a POST is only retried when marked retry-safe.
+        """
+        send = MagicMock(return_value=make_response(503, {"Retry-After": "0"}))
+        response = send_with_retry(send, "POST", URL)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(send.call_count, 1)
+
+        send = MagicMock(side_effect=[make_response(503, {"Retry-After": "0"}), make_response(202)])
+        response = send_with_retry(send, "POST", URL, retry_safe=True)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(send.call_count, 2)
+
+    @patch("fabric_cli.retry.time.sleep")
+    def test_gives_up_after_max_attempts(self, mock_sleep):
+        """
+        Test that the last response is returned once the attempts are used up.
+        """
+        send = MagicMock(return_value=make_response(502))
+        response = send_with_retry(send, "GET", URL, policy=RetryPolicy(max_attempts=3))
+        self.assertEqual(response.status_code, 502)
+        self.assertEqual(send.call_count, 3)
+
+    @patch("fabric_cli.retry.time.sleep")
+    def test_gives_up_at_deadline(self, mock_sleep):
+        """
+        Test that no retry starts if its wait would pass the deadline.
+        """
+        send = MagicMock(return_value=make_response(429, {"Retry-After": "60"}))
+        response = send_with_retry(send, "GET", URL, policy=RetryPolicy(deadline=30))
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(send.call_count, 1)
+
+    @patch("fabric_cli.retry.time.sleep")
+    def test_connection_error_raised_when_exhausted(self, mock_sleep):
+        """
+        Test that connection errors are retried and raised after the last attempt.
+        """
+        send = MagicMock(side_effect=requests.exceptions.ConnectionError("reset"))
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            send_with_retry(send, "GET", URL, policy=RetryPolicy(max_attempts=2))
+        self.assertEqual(send.call_count, 2)
+
+    def test_cooldown_shared_across_threads(self):
+        """
+        Test that a throttled response pauses other requests to the same host.
+        """
+        send = MagicMock(return_value=make_response(429, {"Retry-After": "0.3"}))
+        send_with_retry(send, "POST", URL)
+
+        sent_at = []
+        start = time.monotonic()
+        thread = threading.Thread(
+            target=send_with_retry,
+            args=(lambda: sent_at.append(time.monotonic()) or make_response(200), "GET", URL),
+        )
+        thread.start()
+        thread.join()
+
+        self.assertGreaterEqual(sent_at[0] - start, 0.25)
+        self.assertEqual(retry.cooldown.remaining("management.azure.com"), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import threading
+import time
+import unittest
+from fabric_cli.singleflight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """
+    Test cases for the SingleFlight helper in singleflight.py.
+    """
+
+    def run_concurrently(self, flight, fn, count=8):
+        results, errors = [], []
+        start = threading.Barrier(count)
+
+        def worker():
+            start.wait()
+            try:
+                results.append(flight.do("key", fn))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_callers_share_one_call(self):
+        """
+        Test that concurrent callers for the same key run the function once.
+        """
+        calls = []
+
+        def fn():
+            calls.append(1)
+            time.sleep(0.2)
+            return "result"
+
+        results, errors = self.run_concurrently(SingleFlight(), fn)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ["result"] * 8)
+        self.assertEqual(errors, [])
+
+    def test_concurrent_callers_share_exception(self):
+        """
+        Test that waiters get the exception of the call they waited for.
+        """
+
+        def fn():
+            time.sleep(0.2)
+            raise ValueError("failed")
+
+        results, errors = self.run_concurrently(SingleFlight(), fn)
+
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 8)
+        self.assertTrue(all(isinstance(e, ValueError) for e in errors))
+
+    def test_sequential_calls_run_again(self):
+        """
+        Test that a finished call does not cache its result.
+        """
+        flight = SingleFlight()
+        self.assertEqual(flight.do("key", lambda: 1), 1)
+        self.assertEqual(flight.do("key", lambda: 2), 2)
+        self.assertFalse(flight.in_flight("key"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import tempfile
+import unittest
+from pathlib import Path
+from fabric_cli.spec import GitSpec, WorkspaceSpec, load_spec, parse_spec
+
+SPEC = """
+workspaces:
+  - name: sales-dev
+    capacity_id: cap-1
+    provision_identity: true
+    lakehouses: [raw, curated]
+    warehouses: [reporting]
+    git:
+      organization_name: contoso
+      project_name: data
+      git_provider_type: AzureDevOps
+      repository_name: sales
+      branch_name: main
+      directory_name: /fabric
+  - name: sandbox
+"""
+
+
+class TestSpec(unittest.TestCase):
+    """
+    Test cases for reading apply specs in spec.py.
+    """
+
+    def test_load_spec(self):
+        """
+        Test that a YAML spec is read into workspace specs with defaults.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "spec.yaml"
+            path.write_text(SPEC)
+            spec = load_spec(path)
+
+        sales, sandbox = spec.workspaces
+        self.assertEqual(sales.name, "sales-dev")
+        self.assertEqual(sales.capacity_id, "cap-1")
+        self.assertTrue(sales.provision_identity)
+        self.assertEqual(sales.lakehouses, ["raw", "curated"])
+        self.assertEqual(sales.warehouses, ["reporting"])
+        self.assertEqual(sales.git.provider_details["gitProviderType"], "AzureDevOps")
+        self.assertEqual(sales.git.provider_details["directoryName"], "/fabric")
+        self.assertEqual(sandbox, WorkspaceSpec(name="sandbox"))
+
+    def test_load_spec_invalid_yaml(self):
+        """
+        Test that a file that is not YAML raises a ValueError.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "spec.yaml"
+            path.write_text("workspaces: [")
+            with self.assertRaises(ValueError):
+                load_spec(path)
+
+    def test_parse_spec_rejects_invalid_specs(self):
+        """
+        Test that invalid specs raise a ValueError naming the problem.
+        """
+        git = GitSpec("o", "p", "AzureDevOps", "r", "b", "d").__dict__
+        cases = {
+            "mapping": ["not", "a", "mapping"],
+            "Unknown keys": {"workspace": []},
+            "name": {"workspaces": [{"capacity_id": "cap-1"}]},
+            "lakehouses": {"workspaces": [{"name": "a", "lakehouses": "raw"}]},
+            "duplicate": {"workspaces": [{"name": "a", "warehouses": ["w", "w"]}]},
+            "Duplicate workspaces": {"workspaces": [{"name": "a"}, {"name": "a"}]},
+            "git_provider_type": {
+                "workspaces": [{"name": "a", "git": {**git, "git_provider_type": "Svn"}}]
+            },
+            "Invalid 'git'": {"workspaces": [{"name": "a", "git": {"branch_name": "main"}}]},
+        }
+        for message, data in cases.items():
+            with self.subTest(message):
+                with self.assertRaisesRegex(ValueError, message):
+                    parse_spec(data)
+
+
+if __name__ == "__main__":
+    unittest.main()
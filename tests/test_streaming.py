@@ -0,0 +1,90 @@
+import io
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+import requests
+from fabric_cli.auth import Auth
+from fabric_cli.pagination import iter_items
+from fabric_cli.streaming import ListPage, iter_array
+
+
+def make_streamed_response(body, headers=None):
+    response = requests.Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(json.dumps(body).encode())
+    response.headers.update(headers or {})
+    return response
+
+
+class TestStreaming(unittest.TestCase):
+    """
+    Test cases for the incremental JSON decoding in streaming.py.
+    """
+
+    def test_iter_array_any_chunk_size(self):
+        """
+        Test that items and the other members decode the same however the bytes are split.
+        """
+        body = {
+            "value": [{"id": str(i), "displayName": f"Workspace ü {i}"} for i in range(20)],
+            "continuationToken": "token",
+            "count": 12345,
+        }
+        data = json.dumps(body).encode()
+        for size in (1, 3, 64, len(data)):
+            rest = {}
+            chunks = (data[i : i + size] for i in range(0, len(data), size))  # noqa: E203
+            self.assertEqual(list(iter_array(chunks, "value", rest)), body["value"])
+            self.assertEqual(rest, {"continuationToken": "token", "count": 12345})
+
+    def test_iter_array_yields_before_end(self):
+        """
+        Test that the first item is available before the rest of the body has arrived.
+        """
+
+        def chunks():
+            yield b'{"value": [{"id": "1"}, '
+            raise AssertionError("read past the first item")
+
+        self.assertEqual(next(iter_array(chunks(), "value", {})), {"id": "1"})
+
+    def test_iter_array_invalid(self):
+        """
+        Test that a body that is not a JSON object raises ValueError.
+        """
+        with self.assertRaises(ValueError):
+            list(iter_array([b'["not", "an", "object"]'], "value", {}))
+        with self.assertRaises(ValueError):
+            list(iter_array([b'{"value": [1, 2'], "value", {}))
+
+    def test_small_response_decoded_at_once(self):
+        """
+        Test that responses below the threshold use response.json().
+        """
+        response = make_streamed_response({"value": [1]}, {"Content-Length": "13"})
+        page = ListPage(response, threshold=1024)
+        self.assertFalse(page.streamed)
+        self.assertTrue(page.complete)
+        self.assertEqual(list(page), [1])
+
+    @patch("fabric_cli.pagination.transport.get")
+    def test_iter_items_streams_pages(self, mock_get):
+        """
+        Test that streamed pages follow continuation tokens.
+        """
+        mock_get.side_effect = [
+            make_streamed_response({"value": [{"id": "1"}], "continuationToken": "t1"}),
+            make_streamed_response({"value": [{"id": "2"}]}),
+        ]
+        auth = MagicMock(spec=Auth)
+        auth.get_headers.return_value = {"Authorization": "Bearer token"}
+
+        items = list(iter_items("https://first", auth, prefetch=True, stream=True))
+
+        self.assertEqual([item["id"] for item in items], ["1", "2"])
+        self.assertTrue(all(c.kwargs["stream"] for c in mock_get.call_args_list))
+        self.assertEqual(mock_get.call_args.args[0], "https://first?continuationToken=t1")
+
+
+if __name__ == "__main__":
+    unittest.main()
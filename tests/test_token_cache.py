@@ -0,0 +1,114 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import msal
+from fabric_cli import token_cache
+
+
+class TestTokenCache(unittest.TestCase):
+    """
+    Test cases for the persistent MSAL caches in token_cache.py.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        cache_file = Path(self.tmp_dir.name) / "msal_token_cache.json"
+        self.patches = [
+            patch.object(token_cache, "TOKEN_CACHE_FILE", cache_file),
+            patch.object(token_cache, "HTTP_CACHE_FILE", cache_file.with_name("http.bin")),
+            patch.object(token_cache, "_cache", None),
+            patch.object(token_cache, "_http_cache", None),
+            patch.object(token_cache, "_http_cache_snapshot", None),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp_dir.cleanup()
+
+    def test_token_cache_round_trip(self):
+        """
+        Test that a changed token cache is persisted and reloaded by a new process.
+        """
+        cache = token_cache.get_token_cache()
+        cache.add(
+            {
+                "client_id": "client-id",
+                "scope": ["https://api.fabric.microsoft.com/.default"],
+                "token_endpoint": "https://login.microsoftonline.com/tenant-id/oauth2/v2.0/token",
+                "response": {"access_token": "token", "expires_in": 3600, "token_type": "Bearer"},
+            }
+        )
+        token_cache.save_token_cache()
+
+        self.assertTrue(token_cache.TOKEN_CACHE_FILE.exists())
+        if os.name == "posix":
+            self.assertEqual(token_cache.TOKEN_CACHE_FILE.stat().st_mode & 0o777, 0o600)
+
+        # Simulate a new process
+        token_cache._cache = None
+        reloaded = token_cache.get_token_cache()
+        tokens = list(reloaded.search(reloaded.CredentialType.ACCESS_TOKEN))
+        self.assertEqual([t["secret"] for t in tokens], ["token"])
+
+    def test_save_keeps_tokens_of_other_processes(self):
+        """
+        Test that saving merges tokens another process saved since this one loaded.
+        """
+
+        def add_token(cache, client_id, secret):
+            cache.add(
+                {
+                    "client_id": client_id,
+                    "scope": ["https://api.fabric.microsoft.com/.default"],
+                    "token_endpoint": "https://login.microsoftonline.com/tenant/oauth2/v2.0/token",
+                    "response": {"access_token": secret, "expires_in": 3600},
+                }
+            )
+
+        # Both processes load the empty cache
+        cache = token_cache.get_token_cache()
+        other = msal.SerializableTokenCache()
+
+        # The other process saves first
+        add_token(other, "client-b", "token-b")
+        token_cache.TOKEN_CACHE_FILE.write_text(other.serialize())
+
+        add_token(cache, "client-a", "token-a")
+        token_cache.save_token_cache()
+
+        token_cache._cache = None
+        reloaded = token_cache.get_token_cache()
+        tokens = list(reloaded.search(reloaded.CredentialType.ACCESS_TOKEN))
+        self.assertEqual(sorted(t["secret"] for t in tokens), ["token-a", "token-b"])
+
+    def test_unchanged_cache_is_not_written(self):
+        """
+        Test that an unchanged cache does not touch the disk.
+        """
+        token_cache.get_token_cache()
+        token_cache.get_http_cache()
+        token_cache.save_token_cache()
+
+        self.assertFalse(token_cache.TOKEN_CACHE_FILE.exists())
+        self.assertFalse(token_cache.HTTP_CACHE_FILE.exists())
+
+    def test_http_cache_round_trip(self):
+        """
+        Test that MSAL discovery responses survive across processes.
+        """
+        token_cache.get_http_cache()["discovery"] = {"tenant_discovery_endpoint": "x"}
+        token_cache.save_token_cache()
+
+        token_cache._http_cache = None
+        self.assertEqual(
+            token_cache.get_http_cache(), {"discovery": {"tenant_discovery_endpoint": "x"}}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
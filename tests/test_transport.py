@@ -0,0 +1,159 @@
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+import requests
+from fabric_cli import transport
+
+
+class TestTransport(unittest.TestCase):
+    """
+    Test cases for the shared HTTP session in transport.py.
+    """
+
+    def tearDown(self):
+        transport.close()
+
+    def test_session_is_shared(self):
+        """
+        Test that all calls use one session.
+        """
+        self.assertIs(transport.get_session(), transport.get_session())
+
+    def test_configure_pool_size(self):
+        """
+        Test that the pool size applies to the adapter of a new session.
+        """
+        with patch.object(transport, "POOL_SIZE", transport.POOL_SIZE):
+            old_session = transport.get_session()
+            transport.configure(pool_size=32)
+            session = transport.get_session()
+
+            self.assertIsNot(session, old_session)
+            self.assertEqual(
+                session.get_adapter("https://api.fabric.microsoft.com")._pool_maxsize, 32
+            )
+
+    @patch("fabric_cli.rate_limit.ENABLED", False)
+    @patch("requests.Session.request")
+    def test_request_sets_default_timeout(self, mock_request):
+        """
+        Test that requests get the default timeout unless one is given.
+        """
+        mock_request.return_value.status_code = 200
+        transport.get("https://api.fabric.microsoft.com/v1/workspaces", headers={})
+        transport.post("https://api.fabric.microsoft.com/v1/workspaces", timeout=5)
+
+        mock_request.assert_any_call(
+            "GET",
+            "https://api.fabric.microsoft.com/v1/workspaces",
+            headers={},
+            timeout=transport.TIMEOUT,
+        )
+        mock_request.assert_any_call(
+            "POST", "https://api.fabric.microsoft.com/v1/workspaces", timeout=5
+        )
+
+    @patch("fabric_cli.rate_limit.ENABLED", False)
+    @patch("requests.Session.request")
+    def test_concurrent_gets_are_coalesced(self, mock_request):
+        """
+        Test that identical GETs in flight at the same time share one request.
+        """
+        release = threading.Event()
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"value": []}'
+
+        def slow_request(*args, **kwargs):
+            release.wait(5)
+            return response
+
+        mock_request.side_effect = slow_request
+        url = "https://api.fabric.microsoft.com/v1/workspaces"
+        headers = {"Authorization": "Bearer token"}
+
+        key = transport._coalesce_key("GET", url, {"headers": headers})
+        with ThreadPoolExecutor(5) as executor:
+            futures = [executor.submit(transport.get, url, headers=headers) for _ in range(4)]
+            # Another principal gets its own request
+            other = executor.submit(transport.get, url, headers={"Authorization": "Bearer other"})
+            while not transport._in_flight.in_flight(key):
+                time.sleep(0.01)
+            # Give the other callers time to join the request in flight
+            time.sleep(0.2)
+            release.set()
+            results = [f.result() for f in futures]
+            other.result()
+
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertTrue(all(r.json() == {"value": []} for r in results))
+        self.assertEqual(len({id(r) for r in results}), 4)
+
+    @patch("fabric_cli.rate_limit.ENABLED", False)
+    @patch("fabric_cli.transport._in_flight")
+    @patch("requests.Session.request")
+    def test_post_is_not_coalesced(self, mock_request, mock_in_flight):
+        """
+        Test that requests with side effects are always sent.
+        """
+        mock_request.return_value.status_code = 200
+        transport.post("https://api.fabric.microsoft.com/v1/workspaces", json={})
+        transport.get("https://api.fabric.microsoft.com/v1/workspaces", stream=True)
+        mock_in_flight.do.assert_not_called()
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch("requests.Session.request")
+    def test_prewarm_connects_in_background(self, mock_request):
+        """
+        Test that pre-warming sends a HEAD request to each host from its own thread.
+        """
+        urls = ["https://login.microsoftonline.com/", "https://api.fabric.microsoft.com/"]
+        for thread in transport.prewarm(urls):
+            thread.join(5)
+
+        self.assertEqual(
+            sorted(c.args[:2] for c in mock_request.call_args_list),
+            [("HEAD", urls[1]), ("HEAD", urls[0])],
+        )
+
+        with patch.object(transport, "PREWARM", False):
+            self.assertEqual(transport.prewarm(urls), [])
+
+    @patch("requests.Session.request")
+    def test_prewarm_login_host_on_session_with_http2(self, mock_request):
+        """
+        Test that login hosts are warmed on the session MSAL uses, even with HTTP/2 on.
+        """
+        http2_client = MagicMock()
+        with patch.object(transport, "get_client", return_value=http2_client):
+            threads = transport.prewarm(
+                ["https://login.microsoftonline.com/", "https://api.fabric.microsoft.com/"]
+            )
+            for thread in threads:
+                thread.join(5)
+
+        self.assertEqual(
+            [c.args[:2] for c in mock_request.call_args_list],
+            [("HEAD", "https://login.microsoftonline.com/")],
+        )
+        http2_client.request.assert_called_once_with(
+            "HEAD",
+            "https://api.fabric.microsoft.com/",
+            timeout=transport.TIMEOUT,
+            allow_redirects=False,
+        )
+
+    @patch("requests.Session.request", side_effect=requests.exceptions.ConnectionError)
+    def test_prewarm_ignores_failures(self, mock_request):
+        """
+        Test that a host that cannot be reached does not fail the command.
+        """
+        for thread in transport.prewarm(["https://unreachable.example/"]):
+            thread.join(5)
+        mock_request.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
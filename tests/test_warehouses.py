@@ -1,4 +1,6 @@
+import tempfile
 import unittest
+from pathlib import Path
 import requests
 from unittest.mock import patch, MagicMock
 from fabric_cli.warehouses import create_warehouse, get_warehouses
@@ -10,7 +12,17 @@ class TestWarehouses(unittest.TestCase):
     Test cases for the warehouse functions in warehouses.py.
     """
 
-    @patch("fabric_cli.warehouses.requests.post")
+    def setUp(self):
+        # Keep the metadata cache write-through away from the user's home directory
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        patcher = patch(
+            "fabric_cli.metadata_cache.METADATA_CACHE_FILE", Path(tmp_dir.name) / "metadata.db"
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("fabric_cli.warehouses.transport.post")
     def test_create_warehouse_success(self, mock_post):
         """
         Test the successful creation of a warehouse.
@@ -36,7 +48,7 @@ class TestWarehouses(unittest.TestCase):
             headers={"Authorization": "Bearer token"},
         )
 
-    @patch("fabric_cli.warehouses.requests.post")
+    @patch("fabric_cli.warehouses.transport.post")
     def test_create_warehouse_failure(self, mock_post):
         """
         Test the failure case where the API request raises an HTTPError.
@@ -60,7 +72,38 @@ class TestWarehouses(unittest.TestCase):
             headers={"Authorization": "Bearer token"},
         )
 
-    @patch("fabric_cli.warehouses.requests.get")
+    @patch("fabric_cli.warehouses.operations.wait")
+    @patch("fabric_cli.warehouses.transport.post")
+    def test_create_warehouse_accepted(self, mock_post, mock_wait):
+        """
+        Test that an asynchronous creation is followed to the created warehouse.
+        """
+        # Mock the 202 Accepted response
+        mock_response = MagicMock()
+        mock_response.status_code = 202
+        mock_response.headers = {
+            "Location": "https://api.fabric.microsoft.com/v1/operations/op-1",
+            "Retry-After": "20",
+        }
+        mock_post.return_value = mock_response
+        mock_wait.return_value = {"id": "12345", "displayName": "Test Warehouse"}
+
+        # Mock the Auth instance
+        mock_auth = MagicMock(spec=Auth)
+        mock_auth.get_headers.return_value = {"Authorization": "Bearer token"}
+
+        self.assertEqual(create_warehouse("workspace-id", "Test Warehouse", mock_auth), "12345")
+        operation = mock_wait.call_args[0][0]
+        self.assertEqual(operation.url, "https://api.fabric.microsoft.com/v1/operations/op-1")
+        self.assertEqual(operation.interval, 20.0)
+        mock_response.json.assert_not_called()
+
+        # Without waiting the ID is not known yet
+        mock_wait.reset_mock()
+        self.assertIsNone(create_warehouse("workspace-id", "Test Warehouse", mock_auth, wait=False))
+        mock_wait.assert_not_called()
+
+    @patch("fabric_cli.warehouses.transport.get")
     def test_get_warehouses_success(self, mock_get):
         """
         Test the successful retrieval of warehouses.
@@ -90,7 +133,7 @@ class TestWarehouses(unittest.TestCase):
             headers={"Authorization": "Bearer token"},
         )
 
-    @patch("fabric_cli.warehouses.requests.get")
+    @patch("fabric_cli.warehouses.transport.get")
     def test_get_warehouses_failure(self, mock_get):
         """
         Test the failure case where the API request raises an HTTPError.
@@ -1,4 +1,6 @@
+import tempfile
 import unittest
+from pathlib import Path
 import requests
 from unittest.mock import patch, MagicMock
 from fabric_cli.workspaces import create_workspace, get_workspaces
@@ -10,7 +12,17 @@ class TestWorkspaces(unittest.TestCase):
     Test cases for the workspace functions in workspaces.py.
     """
 
-    @patch("fabric_cli.workspaces.requests.post")
+    def setUp(self):
+        # Keep the metadata cache write-through away from the user's home directory
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        patcher = patch(
+            "fabric_cli.metadata_cache.METADATA_CACHE_FILE", Path(tmp_dir.name) / "metadata.db"
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("fabric_cli.workspaces.transport.post")
     def test_create_workspace_success(self, mock_post):
         """
         Test the successful creation of a workspace without a capacity ID.
@@ -36,7 +48,7 @@ class TestWorkspaces(unittest.TestCase):
             headers={"Authorization": "Bearer token"},
         )
 
-    @patch("fabric_cli.workspaces.requests.post")
+    @patch("fabric_cli.workspaces.transport.post")
     def test_create_workspace_with_capacity_success(self, mock_post):
         """
         Test the successful creation of a workspace with a capacity ID.
@@ -62,7 +74,7 @@ class TestWorkspaces(unittest.TestCase):
             headers={"Authorization": "Bearer token"},
         )
 
-    @patch("fabric_cli.workspaces.requests.post")
+    @patch("fabric_cli.workspaces.transport.post")
     def test_create_workspace_failure(self, mock_post):
         """
         Test the failure case where the API request raises an HTTPError.
@@ -86,7 +98,7 @@ class TestWorkspaces(unittest.TestCase):
             headers={"Authorization": "Bearer token"},
         )
 
-    @patch("fabric_cli.workspaces.requests.get")
+    @patch("fabric_cli.workspaces.transport.get")
     def test_get_workspaces_success(self, mock_get):
         """
         Test the successful retrieval of workspaces.
@@ -119,7 +131,40 @@ class TestWorkspaces(unittest.TestCase):
             headers={"Authorization": "Bearer token"},
         )
 
-    @patch("fabric_cli.workspaces.requests.get")
+    @patch("fabric_cli.workspaces.transport.get")
+    def test_get_workspaces_follows_continuation_token(self, mock_get):
+        """
+        Test that workspaces on later pages are returned too.
+        """
+        first_page = MagicMock()
+        first_page.json.return_value = {
+            "value": [{"id": "12345", "displayName": "Workspace 1"}],
+            "continuationToken": "token-2",
+        }
+        second_page = MagicMock()
+        second_page.json.return_value = {
+            "value": [{"id": "67890", "displayName": "Workspace 2", "capacityId": "capacity-2"}]
+        }
+        mock_get.side_effect = [first_page, second_page]
+
+        # Mock the Auth instance
+        mock_auth = MagicMock(spec=Auth)
+        mock_auth.get_headers.return_value = {"Authorization": "Bearer token"}
+
+        # Call the function
+        workspaces = get_workspaces(mock_auth)
+
+        # Assertions
+        self.assertEqual(
+            workspaces,
+            [("12345", "Workspace 1", None), ("67890", "Workspace 2", "capacity-2")],
+        )
+        mock_get.assert_called_with(
+            "https://api.fabric.microsoft.com/v1/workspaces?continuationToken=token-2",
+            headers={"Authorization": "Bearer token"},
+        )
+
+    @patch("fabric_cli.workspaces.transport.get")
     def test_get_workspaces_failure(self, mock_get):
         """
         Test the failure case where the API request raises an HTTPError.